@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+# binary_classifier.py
+
+"""
+Binary/text classification without reading whole files.
+
+A verdict comes from the first of:
+    1. the binary extension table (images, archives, .pyc ... are never opened)
+    2. NUL bytes or a UTF-16/32 byte order mark in the first SNIFF_SIZE bytes,
+       and for extensions not in the text table also magic numbers
+Sniffed verdicts are cached by (path, size, mtime), so unchanged files are
+only ever opened once per process.
+"""
+
+import os
+import stat as stat_module
+import threading
+from typing import Dict, Optional, Tuple
+
+from gui import constants
+
+SNIFF_SIZE = 1024
+
+BINARY_EXTENSIONS = frozenset({
+    # images
+    '.png', '.jpg', '.jpeg', '.gif', '.bmp', '.ico', '.icns', '.tif', '.tiff', '.webp', '.psd', '.heic',
+    # archives and compressed data
+    '.zip', '.gz', '.tgz', '.bz2', '.xz', '.7z', '.rar', '.tar', '.zst', '.lz4', '.jar', '.war', '.whl', '.egg',
+    # compiled code and libraries
+    '.pyc', '.pyo', '.pyd', '.so', '.dll', '.exe', '.dylib', '.lib', '.a', '.o', '.obj', '.class', '.wasm',
+    '.bin', '.dat', '.rlib',
+    # documents and fonts
+    '.pdf', '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx', '.odt', '.ods', '.ttf', '.otf', '.woff', '.woff2',
+    '.eot',
+    # media
+    '.mp3', '.mp4', '.wav', '.flac', '.ogg', '.avi', '.mov', '.mkv', '.webm', '.m4a',
+    # databases and serialized data
+    '.db', '.sqlite', '.sqlite3', '.pkl', '.pickle', '.npy', '.npz', '.parquet', '.h5', '.onnx', '.pt',
+})
+
+TEXT_EXTENSIONS = frozenset({
+    '.py', '.pyi', '.pyw', '.txt', '.md', '.rst', '.toml', '.ini', '.cfg', '.conf', '.json', '.yaml', '.yml',
+    '.xml', '.html', '.htm', '.css', '.scss', '.js', '.jsx', '.ts', '.tsx', '.mjs', '.cjs', '.vue',
+    '.c', '.h', '.cpp', '.hpp', '.cc', '.cs', '.java', '.kt', '.go', '.rs', '.rb', '.php', '.swift',
+    '.sh', '.bash', '.ps1', '.bat', '.cmd', '.sql', '.csv', '.tsv', '.lua', '.pl', '.r', '.dart', '.scala',
+    '.gitignore', '.env', '.lock', '.svg',
+})
+
+# UTF-16/32 text cannot be shown as UTF-8 (UTF-32 LE starts like UTF-16 LE, UTF-32 BE with NULs)
+UTF16_BOMS = (b'\xff\xfe', b'\xfe\xff')
+
+# Leading bytes of common binary formats (short ones like 'MZ' or 'BM' could start
+# a text file; those formats contain NUL bytes early anyway)
+MAGIC_NUMBERS = (
+    b'\x89PNG', b'\xff\xd8\xff', b'GIF8', b'PK\x03\x04', b'PK\x05\x06', b'%PDF', b'\x7fELF',
+    b'\x1f\x8b', b'BZh', b'\xfd7zXZ\x00', b'7z\xbc\xaf\x27\x1c', b'Rar!', b'\x28\xb5\x2f\xfd', b'RIFF',
+    b'OggS', b'ID3', b'fLaC', b'SQLite format 3\x00', b'\xca\xfe\xba\xbe', b'\xcf\xfa\xed\xfe',
+    b'\xfe\xed\xfa', b'\x00asm', b'\xd0\xcf\x11\xe0', b'wOFF', b'wOF2',
+)
+
+
+def classify_by_extension(file_path: str) -> Optional[bool]:
+    """
+    True (binary) / False (text) from the extension alone, None if unknown.
+    Only True is final; text files are still sniffed for NULs and UTF-16/32.
+    """
+    name = os.path.basename(file_path).lower()
+    ext = os.path.splitext(name)[1] or (name if name.startswith('.') else '')
+    if ext in BINARY_EXTENSIONS:
+        return True
+    if ext in TEXT_EXTENSIONS:
+        return False
+    return None
+
+
+def sniff_bytes(head: bytes, magic: bool = True) -> bool:
+    """True if the leading bytes look binary (NUL byte, UTF-16/32 BOM or, with 'magic', a known magic number)."""
+    if not head:
+        return False
+    if b'\0' in head or head.startswith(UTF16_BOMS):
+        return True
+    return magic and head.startswith(MAGIC_NUMBERS)
+
+
+class BinaryClassifier:
+    """Binary extension table, then sniffing; sniffed verdicts cached by (path, size, mtime)"""
+
+    def __init__(self, max_entries: int = constants.BINARY_CACHE_MAX_ENTRIES):
+        self._lock = threading.Lock()
+        self._verdicts: Dict[str, Tuple[int, int, bool]] = {}
+        self.max_entries = max_entries
+        self.by_extension = 0
+        self.cache_hits = 0
+        self.sniffed = 0
+
+    def is_binary(self, file_path: str, stat: Optional[os.stat_result] = None) -> bool:
+        """Classify 'file_path'; pass a stat result the caller already has to save a syscall."""
+        by_extension = classify_by_extension(file_path)
+        if by_extension:
+            self.by_extension += 1
+            return True
+
+        try:
+            stat = stat or os.stat(file_path)
+        except OSError as e:
+            print(f"Error checking if file is binary: {str(e)}")
+            return True
+        if not stat_module.S_ISREG(stat.st_mode):
+            # FIFOs and devices can block open(); never sniff them
+            return True
+        key = os.path.normcase(os.path.abspath(file_path))
+        with self._lock:
+            cached = self._verdicts.get(key)
+        if cached is not None and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            self.cache_hits += 1
+            return cached[2]
+
+        try:
+            with open(file_path, 'rb') as file:
+                # Text extensions skip the magic numbers: a .txt may well start with 'ID3' or 'BZh'
+                verdict = sniff_bytes(file.read(SNIFF_SIZE), magic=by_extension is None)
+        except Exception as e:
+            print(f"Error checking if file is binary: {str(e)}")
+            return True
+        self.sniffed += 1
+        with self._lock:
+            if len(self._verdicts) >= self.max_entries:
+                self._verdicts.clear()
+            self._verdicts[key] = (stat.st_size, stat.st_mtime_ns, verdict)
+        return verdict
+
+    def stats(self) -> str:
+        return f"{self.by_extension} binary by extension, {self.cache_hits} cached, {self.sniffed} sniffed"
+
+
+# Shared by all extractors in the process so verdicts survive between runs
+_default_classifier = BinaryClassifier()
+
+
+def is_binary_file(file_path: str, stat: Optional[os.stat_result] = None) -> bool:
+    return _default_classifier.is_binary(file_path, stat)
+
+
+__all__ = [
+    "BINARY_EXTENSIONS",
+    "TEXT_EXTENSIONS",
+    "classify_by_extension",
+    "sniff_bytes",
+    "BinaryClassifier",
+    "is_binary_file",
+]
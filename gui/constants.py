@@ -72,6 +72,10 @@ PATH_VALUE_PADDING = "5px 10px"  # Padding för sökvägsvisning
 PATH_VALUE_BORDER_RADIUS = 4     # Hörnradie för sökvägsvisning
 
 
+## ------------ ## SettingsManager ## ------------ ##
+SETTINGS_SAVE_DEBOUNCE_MS = 500  # Fördröjning innan ändrade inställningar skrivs till disk (samlar flera ändringar)
+SETTINGS_CACHE_SUFFIX = ".cache" # JSON-cache av tolkade inställningar, sparas bredvid settings.toml
+
 ## ------------ ## Settings Dialog ## ------------ ##
 SETTINGS_DIALOG_WIDTH = 550      # Bredd på inställningsdialogen
 SETTINGS_DIALOG_HEIGHT = 350     # Höjd på inställningsdialogen
@@ -96,6 +100,33 @@ MAX_PRESETS = 20                 # Maxantal presets
 MAX_FILES_PER_PRESET = 5000      # Maxantal filer per preset
 FILE_WARNING_THRESHOLD = 1000    # Visa varning om fler än detta antal filer
 
+# Bakgrundsskanning (Add Folder / Auto Preset)
+SCAN_BATCH_SIZE = 500            # Antal filer per batch som skickas till GUI:t
+SCAN_EMIT_INTERVAL = 0.1         # Max sekunder mellan batcher, så listan fylls på även vid långsam skanning
+WALK_MAX_WORKERS = 8             # Trådar som listar kommande kataloger parallellt
+USE_FILE_CATALOG = True          # Spara kataloglistningar per base_dir i SQLite (directories.use_file_catalog)
+FILE_CATALOG_DIR = "file_catalog"  # Katalog för katalogdatabaserna, bredvid settings.toml
+FILE_CATALOG_FLUSH_SIZE = 2000   # Antal nya listningar som samlas innan de skrivs till databasen
+VALIDATION_LIST_THRESHOLD = 4    # Lista en katalog (i stället för en stat per fil) när minst så många filer kontrolleras där
+LARGE_FILE_THRESHOLD_KB = 5120   # Filer större än så hanteras enligt LARGE_FILE_POLICY (files.large_file_threshold_kb)
+LARGE_FILE_POLICY = "truncate"   # "skip", "truncate" (början + slut) eller "stream" (hela filen i bitar)
+TRUNCATE_HEAD_KB = 256           # Behålls från början av en trunkerad fil
+TRUNCATE_TAIL_KB = 64            # Behålls från slutet av en trunkerad fil
+READ_TIMEOUT_SECONDS = 30        # Max väntetid per läsning, t.ex. på nätverksenheter (0 = ingen gräns)
+READ_CHUNK_SIZE = 1024 * 1024    # Bytes per läsning i "stream"-läget
+READ_SCHEDULER = False           # Läs i förväg i diskordning (st_dev, st_ino) för kall cache, t.ex. på HDD (files.read_scheduler)
+READ_AHEAD_WINDOW_MB = 64        # Max antal MB som läses i förväg före extraktorns egna läsningar
+PASSTHROUGH_OUTPUT = True        # Kopiera giltiga UTF-8-filer direkt till Markdown-filen (copy_file_range/sendfile) (files.passthrough_output)
+BINARY_CACHE_MAX_ENTRIES = 200000  # Max antal cachade binär/text-bedömningar (per process)
+USE_IGNORE_FILES = True          # Följ .gitignore / .ignore i alla kataloger vid skanning (directories.use_ignore_files)
+IGNORE_FILE_NAMES = (".gitignore", ".ignore")  # Ignorefiler som läses per katalog
+DUPLICATE_FILES_POLICY = "reference"  # Samma fysiska fil via flera sökvägar: "reference" (hänvisning) eller "skip" (files.duplicate_files)
+FOLLOW_SYMLINKS = False          # Följ symlänkade kataloger vid skanning; loopar upptäcks via (st_dev, st_ino) (directories.follow_symlinks)
+AUTO_PRESET_IGNORED_DIRECTORIES = [  # Kataloger som alltid hoppas över av Auto Preset
+    ".pytest_cache", "build", "docs", "logs", "env", "venv", ".git",
+    "output", "temp", ".backups", "__pycache__"
+]
+
 ## ------------ ## ExtractionFrame ## ------------ ##
 # Frame heights
 PROGRESS_CONTAINER_HEIGHT = 150  # Höjd på progress container
@@ -111,6 +142,7 @@ TAB_CONTENT_SPACING = 10         # Mellanrum mellan widgets i tabbar
 CHECKBOX_MIN_HEIGHT = 25         # Minsta höjd för checkboxes
 CHECKBOX_MIN_WIDTH = 120         # Minsta bredd för checkboxes
 PROGRESS_BAR_HEIGHT = 18         # Höjd på progressbarer
+PRESET_RUN_LIST_HEIGHT = 90      # Höjd på listan med presets som ska köras
 
 ## ------------ ## SettingsFrame ## ------------ ##
 SETTINGS_GROUP_SPACING = 10      # Mellanrum mellan grupperna i inställningarna
@@ -0,0 +1,337 @@
+# -*- coding: utf-8 -*-
+# diff_patcher.py
+
+"""
+Parsing and fuzzy application of unified diffs returned by LLMs.
+
+Hunks are located against an in-memory copy of the target file using a line
+index, so bundles with thousands of hunks stay fast. Every file is read once,
+all of its patches are applied in memory and the result is written once.
+Hunks that cannot be placed are reported (and written to '<file>.rej').
+Hunks whose result is already in the file (a bundle applied twice) are
+counted as already applied and leave the file untouched.
+"""
+
+import io
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DIFF_LANGUAGES = {'diff', 'patch', 'udiff'}
+DEV_NULL = '/dev/null'
+
+HUNK_HEADER_RE = re.compile(r'^@@\s+-(\d+)(?:,(\d+))?\s+\+(\d+)(?:,(\d+))?\s+@@.*$')
+
+
+@dataclass
+class Hunk:
+    """A single '@@' hunk stored as (tag, text) operations with tag in ' ', '-', '+'"""
+    header: str
+    old_start: int
+    ops: List[Tuple[str, str]] = field(default_factory=list)
+
+    @property
+    def old_lines(self) -> List[str]:
+        return [text for tag, text in self.ops if tag != '+']
+
+    @property
+    def new_lines(self) -> List[str]:
+        return [text for tag, text in self.ops if tag != '-']
+
+    def trimmed(self, fuzz: int) -> Tuple[List[str], List[str], int]:
+        """Drop up to 'fuzz' leading/trailing context lines. Returns (old, new, leading_dropped)."""
+        ops = self.ops
+        lead = 0
+        while lead < fuzz and lead < len(ops) and ops[lead][0] == ' ':
+            lead += 1
+        trail = 0
+        while trail < fuzz and len(ops) - trail > lead and ops[len(ops) - 1 - trail][0] == ' ':
+            trail += 1
+        ops = ops[lead:len(ops) - trail]
+        return ([t for tag, t in ops if tag != '+'], [t for tag, t in ops if tag != '-'], lead)
+
+    def to_text(self) -> str:
+        return '\n'.join([self.header] + [f"{tag}{text}" for tag, text in self.ops])
+
+
+@dataclass
+class FilePatch:
+    """All hunks of one file section inside a diff block"""
+    path: str
+    hunks: List[Hunk] = field(default_factory=list)
+    is_new_file: bool = False
+    is_deleted: bool = False
+
+
+@dataclass
+class PatchReport:
+    """Outcome of applying patches to one file"""
+    file_path: str
+    applied: int = 0
+    fuzzy: int = 0
+    already_applied: int = 0
+    rejected: List[Hunk] = field(default_factory=list)
+    created: bool = False
+    deleted: bool = False
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and not self.rejected
+
+
+def _strip_diff_path(path: str) -> str:
+    """Strip timestamps and the conventional a/ b/ prefixes from a diff header path."""
+    path = path.split('\t')[0].strip()
+    if path.startswith(('a/', 'b/')):
+        path = path[2:]
+    return path
+
+
+def parse_unified_diff(text: str, default_path: Optional[str] = None) -> List[FilePatch]:
+    """
+    Parse unified diff text into FilePatch objects. Hunk line counts are not
+    trusted (LLMs get them wrong); a hunk ends at the next hunk or file header.
+    'default_path' is used for hunks that appear without '---/+++' headers.
+    """
+    patches: List[FilePatch] = []
+    current: Optional[FilePatch] = None
+    hunk: Optional[Hunk] = None
+    lines = text.rstrip('\n').split('\n')
+
+    i = 0
+    while i < len(lines):
+        line = lines[i].rstrip('\r')
+        next_line = lines[i + 1].rstrip('\r') if i + 1 < len(lines) else ''
+
+        if line.startswith('--- ') and next_line.startswith('+++ '):
+            old_path = _strip_diff_path(line[4:])
+            new_path = _strip_diff_path(next_line[4:])
+            current = FilePatch(
+                path=old_path if new_path == DEV_NULL else new_path,
+                is_new_file=old_path == DEV_NULL,
+                is_deleted=new_path == DEV_NULL,
+            )
+            patches.append(current)
+            hunk = None
+            i += 2
+            continue
+
+        if line.startswith(('diff ', 'index ', 'new file mode', 'deleted file mode')):
+            hunk = None
+            i += 1
+            continue
+
+        header = HUNK_HEADER_RE.match(line)
+        if header:
+            if current is None:
+                if not default_path:
+                    i += 1
+                    continue
+                current = FilePatch(path=default_path)
+                patches.append(current)
+            hunk = Hunk(header=line, old_start=int(header.group(1)))
+            current.hunks.append(hunk)
+            i += 1
+            continue
+
+        if hunk is not None:
+            if line.startswith('\\'):
+                pass  # "\ No newline at end of file"
+            elif line[:1] in (' ', '-', '+'):
+                hunk.ops.append((line[0], line[1:]))
+            else:
+                # Editors and LLMs often drop the leading space of blank context lines
+                hunk.ops.append((' ', line))
+        i += 1
+
+    return [patch for patch in patches if patch.hunks or patch.is_deleted]
+
+
+def _loose(line: str) -> str:
+    return ' '.join(line.split())
+
+
+class _LineIndex:
+    """Lazy exact and whitespace-insensitive indexes from line text to positions"""
+
+    def __init__(self, lines: List[str]):
+        self.lines = lines
+        self._exact: Optional[Dict[str, List[int]]] = None
+        self._loose: Optional[Dict[str, List[int]]] = None
+        self._loose_lines: Optional[List[str]] = None
+
+    def _build(self, key_lines: Iterable[str]) -> Dict[str, List[int]]:
+        index: Dict[str, List[int]] = {}
+        for pos, key in enumerate(key_lines):
+            index.setdefault(key, []).append(pos)
+        return index
+
+    def locate(self, old: List[str], expected: int, min_pos: int, loose: bool) -> Optional[int]:
+        """Return the start of the match of 'old' nearest to 'expected', not before 'min_pos'."""
+        if loose:
+            if self._loose is None:
+                self._loose_lines = [_loose(line) for line in self.lines]
+                self._loose = self._build(self._loose_lines)
+            index, haystack, needle = self._loose, self._loose_lines, [_loose(line) for line in old]
+        else:
+            if self._exact is None:
+                self._exact = self._build(self.lines)
+            index, haystack, needle = self._exact, self.lines, old
+
+        # Anchor on the first non-blank line to keep the candidate list short
+        anchor = next((k for k, line in enumerate(needle) if line.strip()), 0)
+        candidates = [pos - anchor for pos in index.get(needle[anchor], ())]
+        size = len(needle)
+        for start in sorted(candidates, key=lambda pos: abs(pos - expected)):
+            if start < min_pos or start + size > len(haystack):
+                continue
+            if haystack[start:start + size] == needle:
+                return start
+        return None
+
+
+def _split_lines(source: str) -> Tuple[List[str], List[str]]:
+    """
+    Lines without their endings, and each line's ending ('' for a last line without one).
+    Only '\\r\\n', '\\r' and '\\n' end a line; str.splitlines() would also break on '\\x0c', '\\u2028' ...
+    """
+    lines: List[str] = []
+    endings: List[str] = []
+    for line in io.StringIO(source, newline='').readlines():
+        text = line.rstrip('\r\n')
+        lines.append(text)
+        endings.append(line[len(text):])
+    return lines, endings
+
+
+def _apply_hunks(lines: List[str], endings: List[str], hunks: List[Hunk], max_fuzz: int, report: PatchReport,
+                 newline: str) -> Tuple[List[str], List[str]]:
+    """Place all hunks against 'lines' and splice them in one pass; untouched lines keep their endings."""
+    index = _LineIndex(lines)
+    placed = []  # (start, end, new_lines)
+    min_pos = 0
+    drift = 0
+
+    for hunk in hunks:
+        expected = max(hunk.old_start - 1, 0) + drift
+        match = None
+        for fuzz in range(max_fuzz + 1):
+            old, new, lead = hunk.trimmed(fuzz) if fuzz else (hunk.old_lines, hunk.new_lines, 0)
+            if fuzz and old == hunk.old_lines:
+                continue  # nothing left to trim
+            if not old:
+                if fuzz:
+                    continue  # trimming must not turn a hunk into a blind insertion
+                # Pure insertion: trust the header position
+                match = (min(max(expected, min_pos), len(lines)), 0, new, fuzz)
+                break
+            for loose in (False, True):
+                start = index.locate(old, expected + lead, min_pos, loose)
+                if start is not None:
+                    match = (start, len(old), new, fuzz or int(loose))
+                    break
+            if match:
+                break
+
+        if match is None:
+            report.rejected.append(hunk)
+            continue
+
+        start, size, new, fuzz = match
+        if not size and new and lines[start:start + len(new)] == new:
+            # Inserted lines already follow the insertion point: the hunk was applied before
+            report.already_applied += 1
+            min_pos = start + len(new)
+            continue
+        placed.append((start, start + size, new))
+        drift = start - (hunk.old_start - 1)
+        min_pos = start + size
+        report.applied += 1
+        if fuzz:
+            report.fuzzy += 1
+
+    if not placed:
+        return lines, endings
+
+    result: List[str] = []
+    result_endings: List[str] = []
+    cursor = 0
+    for start, end, new in placed:
+        result.extend(lines[cursor:start])
+        result_endings.extend(endings[cursor:start])
+        result.extend(new)
+        # New lines take the ending of the lines they replace (the file's usual one for insertions)
+        result_endings.extend([endings[start] if start < end and endings[start] else newline] * len(new))
+        cursor = end
+    result.extend(lines[cursor:])
+    result_endings.extend(endings[cursor:])
+    return result, result_endings
+
+
+def apply_patches_to_file(file_path: str, patches: List[FilePatch], max_fuzz: int = 2,
+                          write_rejects: bool = True) -> PatchReport:
+    """
+    Apply every FilePatch for 'file_path' in order. The file is read once, the
+    patches are applied in memory (each patch sees the result of the previous
+    one) and the file is written once.
+    """
+    report = PatchReport(file_path=file_path)
+    exists = os.path.exists(file_path)
+
+    if patches and patches[-1].is_deleted:
+        if exists:
+            os.remove(file_path)
+            report.deleted = True
+        return report
+
+    try:
+        if exists:
+            with open(file_path, 'r', encoding='utf-8', newline='') as f:
+                source = f.read()
+        else:
+            source = ''
+    except Exception as e:
+        report.error = f"Cannot read {file_path}: {e}"
+        return report
+
+    newline = '\r\n' if '\r\n' in source else '\n'
+    trailing_newline = source.endswith(('\n', '\r')) or not exists
+    lines, endings = _split_lines(source)
+
+    for patch in patches:
+        if patch.is_new_file and lines:
+            # A new-file diff against existing content: done if the content matches, a conflict if not
+            if lines == [text for hunk in patch.hunks for text in hunk.new_lines]:
+                report.already_applied += len(patch.hunks)
+            else:
+                report.rejected.extend(patch.hunks)
+            continue
+        lines, endings = _apply_hunks(lines, endings, patch.hunks, max_fuzz, report, newline)
+
+    if report.applied:
+        # Lines moved off the end of the file need an ending; the last one keeps the file's choice
+        endings = [ending or newline for ending in endings]
+        if endings and not trailing_newline:
+            endings[-1] = ''
+        os.makedirs(os.path.dirname(file_path) or '.', exist_ok=True)
+        with open(file_path, 'w', encoding='utf-8', newline='') as f:
+            f.write(''.join(line + ending for line, ending in zip(lines, endings)))
+        report.created = not exists
+
+    if report.rejected and write_rejects:
+        with open(f"{file_path}.rej", 'w', encoding='utf-8') as f:
+            f.write('\n'.join(hunk.to_text() for hunk in report.rejected) + '\n')
+
+    return report
+
+
+__all__ = [
+    "DIFF_LANGUAGES",
+    "Hunk",
+    "FilePatch",
+    "PatchReport",
+    "parse_unified_diff",
+    "apply_patches_to_file",
+]
@@ -5,7 +5,7 @@ import os
 from PySide6.QtWidgets import (
     QFrame, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, 
     QProgressBar, QCheckBox, QFileDialog, QMessageBox, QTabWidget,
-    QSizePolicy
+    QSizePolicy, QListWidget
 )
 from PySide6.QtCore import Signal, Qt
 from PySide6.QtGui import QCursor
@@ -306,6 +306,18 @@ class ExtractionFrame(QFrame):
         self.select_output_button.setToolTip("Select the directory where extracted files will be saved")
         layout.addWidget(self.select_output_button)
         
+        # Presets to run (nothing selected = the current preset only)
+        presets_label = QLabel("Presets to run (none selected = current preset):")
+        presets_label.setFont(Fonts.get_default(constants.NORMAL_FONT_SIZE))
+        layout.addWidget(presets_label)
+        
+        self.preset_run_list = QListWidget()
+        self.preset_run_list.setSelectionMode(QListWidget.SelectionMode.MultiSelection)
+        self.preset_run_list.setFixedHeight(constants.PRESET_RUN_LIST_HEIGHT)
+        self.preset_run_list.setToolTip("Select the presets to extract; click again to deselect")
+        layout.addWidget(self.preset_run_list)
+        self.refresh_preset_run_list()
+        
         layout.addStretch()
     
     def setup_reverse_tab(self):
@@ -377,6 +389,9 @@ class ExtractionFrame(QFrame):
         # Tab switching
         self.tabs.currentChanged.connect(self.handle_tab_change)
         
+        # Keep the preset run list in step with added/removed presets
+        self.settings_manager.settings_changed.connect(self.refresh_preset_run_list)
+        
         # Listen for preset changes from parent window
         parent = self.parent()
         if parent and hasattr(parent, 'file_specific_frame'):
@@ -388,6 +403,28 @@ class ExtractionFrame(QFrame):
         self.current_preset_files = files.copy()
         print(f"Extraction Frame: Preset changed to '{preset_name}' with {len(files)} files")
     
+    def refresh_preset_run_list(self):
+        """Rebuild the preset run list when the preset names change, keeping the selection"""
+        names = self.settings_manager.preset_names()
+        current = [self.preset_run_list.item(row).text() for row in range(self.preset_run_list.count())]
+        if names == current:
+            return
+        
+        selected = set(self.selected_presets())
+        self.preset_run_list.clear()
+        self.preset_run_list.addItems(names)
+        for row, name in enumerate(names):
+            if name in selected:
+                self.preset_run_list.item(row).setSelected(True)
+    
+    def selected_presets(self):
+        """Preset names selected for the run, in list order"""
+        return [
+            self.preset_run_list.item(row).text()
+            for row in range(self.preset_run_list.count())
+            if self.preset_run_list.item(row).isSelected()
+        ]
+    
     def handle_tab_change(self, index):
         """Handle tab changes and update UI accordingly"""
         # Update checkboxes based on tab
@@ -464,7 +501,7 @@ class ExtractionFrame(QFrame):
             self,
             "Select CSV File",
             self.settings_manager.get_setting("paths", "base_dir", ""),
-            "CSV Files (*.csv);;Excel Files (*.xlsx);;All Files (*)"
+            "CSV Files (*.csv);;Excel Files (*.xlsx *.xlsm *.xls);;JSON Lines (*.jsonl *.ndjson);;All Files (*)"
         )
         
         if file_path:
@@ -516,6 +553,9 @@ class ExtractionFrame(QFrame):
             )
             return
             
+        # Workers get an in-memory snapshot; still persist pending changes before a long run
+        self.settings_manager.flush()
+        
         # Get current tab
         current_tab = self.tabs.currentWidget()
         
@@ -596,6 +636,9 @@ class ExtractionFrame(QFrame):
                 if reply == QMessageBox.StandardButton.No:
                     return
         
+        # Only the selected presets are extracted; default to the current preset
+        presets_to_run = self.selected_presets() or ([self.current_preset] if self.current_preset else None)
+        
         # Show progress UI by swapping frames instead of hiding/showing
         self.placeholder_frame.hide()
         self.progress_frame.show()
@@ -623,7 +666,9 @@ class ExtractionFrame(QFrame):
                     CSVEx,
                     base_dir,
                     output_dir,
-                    self.settings_manager.settings_path
+                    self.settings_manager.settings_path,
+                    self.settings_manager.snapshot(),
+                    presets=presets_to_run
                 )
                 
                 # Set file list if using specific files
@@ -651,7 +696,9 @@ class ExtractionFrame(QFrame):
                     MarkdownEx,
                     base_dir,
                     output_dir,
-                    self.settings_manager.settings_path
+                    self.settings_manager.settings_path,
+                    self.settings_manager.snapshot(),
+                    presets=presets_to_run
                 )
                 
                 # Set file list if using specific files
@@ -722,7 +769,8 @@ class ExtractionFrame(QFrame):
                         ReverseCSVEx,
                         csv_file,
                         csv_output,
-                        self.settings_manager.settings_path
+                        self.settings_manager.settings_path,
+                        self.settings_manager.snapshot()
                     )
                     
                     # Connect signals
@@ -784,7 +832,8 @@ class ExtractionFrame(QFrame):
                         ReverseMarkdownEx,
                         md_file,
                         md_output,
-                        self.settings_manager.settings_path
+                        self.settings_manager.settings_path,
+                        self.settings_manager.snapshot()
                     )
                     
                     # Connect signals
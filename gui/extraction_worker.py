@@ -1,9 +1,10 @@
 # -*- coding: utf-8 -*-
 # extraction_worker.py
 
-import os
 from PySide6.QtCore import QThread, Signal
 
+from gui.path_validation import validate_paths
+
 class ExtractionWorker(QThread):
     """Worker thread for extraction operations with improved file handling"""
     
@@ -13,34 +14,35 @@ class ExtractionWorker(QThread):
     extraction_complete = Signal()
     extraction_error = Signal(str)
     
-    def __init__(self, extractor_class, input_path, output_path, settings_path=None):
+    def __init__(self, extractor_class, input_path, output_path, settings_path=None, settings_snapshot=None,
+                 presets=None):
         super().__init__()
         self.extractor_class = extractor_class
         self.input_path = input_path
         self.output_path = output_path
         self.settings_path = settings_path
+        # Pre-parsed, read-only settings (SettingsManager.snapshot()); saves the worker a TOML parse
+        self.settings_snapshot = settings_snapshot
+        # Preset names to extract (CSVEx/MarkdownEx); None runs the current preset
+        self.presets = presets
         self._stop_requested = False
         
         # Add specific_files attribute (empty by default)
         self.specific_files = []
+        # ValidationReport of specific_files after run() (missing and invalid entries)
+        self.validation_report = None
 
     def run(self):
         """Execute the extraction process with proper file handling"""
         try:
-            # Debug the specific files before processing
-            if hasattr(self, 'specific_files') and self.specific_files:
-                print(f"ExtractionWorker specific_files before processing: {self.specific_files}")
-                # Validate files - skip single character entries which are usually errors
-                self.specific_files = [f for f in self.specific_files if isinstance(f, str) and len(f) > 1]
-                print(f"Filtered to {len(self.specific_files)} valid files")
-            
             # Create extractor instance
-            if self.extractor_class.__name__ in ['CSVEx', 'MarkdownEx', 'ReverseCSVEx', 'ReverseMarkdownEx']:
-                # These classes take settings_path as a parameter
+            if self.extractor_class.__name__ in ['CSVEx', 'MarkdownEx', 'ReverseMarkdownEx']:
+                # These classes take settings_path and an optional settings snapshot
                 extractor = self.extractor_class(
                     self.input_path,
                     self.output_path,
-                    self.settings_path
+                    self.settings_path,
+                    settings=self.settings_snapshot
                 )
             else:
                 # Generic fallback if class doesn't match expected pattern
@@ -58,29 +60,16 @@ class ExtractionWorker(QThread):
                     # Convert to a list with the string as a single item
                     self.specific_files = [self.specific_files]
                 
-                for file_path in self.specific_files:
-                    # Skip if file_path is a single character (likely parsing error)
-                    if isinstance(file_path, str) and len(file_path) <= 1:
-                        print(f"Skipping invalid file path: '{file_path}'")
-                        continue
-                        
-                    # Handle relative vs absolute paths
-                    full_path = file_path
-                    if isinstance(file_path, str) and not os.path.isabs(file_path):
-                        full_path = os.path.join(self.input_path, file_path)
-                        
-                    # Fix potential path separator issues
-                    full_path = os.path.normpath(full_path)
-                    
-                    # Only add file if it exists
-                    if os.path.exists(full_path):
-                        valid_specific_files.append(file_path)  # Keep original relative path
-                        print(f"Added valid file: {file_path}")
-                    else:
-                        print(f"Warning: File does not exist: {full_path}")
+                # One directory listing per parent directory instead of one stat per file;
+                # globs, directory references and negations are resolved by the extractor
+                report = validate_paths(self.specific_files, self.input_path)
+                self.validation_report = report
+                valid_specific_files = report.valid
                 
-                # Log the processed files
-                print(f"Processed {len(valid_specific_files)} valid files out of {len(self.specific_files)} specified")
+                # One summary line instead of a line per file
+                print(f"Validated specific files: {report.summary()} ({report.directories_listed} directories listed)")
+                if report.missing:
+                    self.update_status(f"Warning: {report.summary()}")
                 
                 # Set the validated files to the extractor
                 if valid_specific_files:
@@ -101,7 +90,10 @@ class ExtractionWorker(QThread):
             
             # Run extraction
             if not self._stop_requested:
-                extractor.run()
+                if self.presets is not None and self.extractor_class.__name__ in ['CSVEx', 'MarkdownEx']:
+                    extractor.run(presets=self.presets)
+                else:
+                    extractor.run()
                 
             # Signal completion
             if not self._stop_requested:
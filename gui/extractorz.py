@@ -11,7 +11,6 @@ import pandas as pd
 import os
 import re
 import toml
-from dataclasses import dataclass
 from typing import List, Dict, Optional, Tuple, Any
 
 import os
@@ -28,19 +27,49 @@ import zipfile
 import shutil
 import pandas as pd
 from pathlib import Path
-
+import mmap
+import sys
+import csv
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+from gui import constants
+from gui.binary_classifier import classify_by_extension, is_binary_file
+from gui.file_catalog import FileCatalog
+from gui.file_identity import DUPLICATES_SKIP, duplicate_policy, find_duplicate_files
+from gui.file_reader import (
+    FileReader, ReadPolicy, READ_PASSTHROUGH, READ_SKIPPED_LARGE, READ_STREAMED, READ_TRUNCATED
+)
+from gui.ignore_rules import IgnoreRules
+from gui.markdown_output import MarkdownDocument
+from gui.read_scheduler import ReadScheduler
+from gui.patch_engine import apply_definition_updates_to_file
+from gui.preset_store import resolve_preset_files, select_presets
+from gui.preset_resolver import resolve_entries
+from gui.settings_snapshot import (
+    SettingsSnapshot, TOML_DECODE_ERRORS, normalize_settings_paths, thaw
+)
+from gui.diff_patcher import DIFF_LANGUAGES, FilePatch, parse_unified_diff, apply_patches_to_file
 
 
 class MarkdownEx:
-    def __init__(self, base_dir, output_dir, settings_path):
+    def __init__(self, base_dir, output_dir, settings_path=None, settings: Optional[SettingsSnapshot] = None):
+        """
+        'settings' is a pre-parsed SettingsSnapshot (e.g. from SettingsManager.snapshot());
+        without it the settings are read once from 'settings_path'.
+        """
         self.base_dir = os.path.normpath(base_dir).replace('\\', '/')
         self.output_dir = os.path.normpath(output_dir).replace('\\', '/')
         self.extract_dir = os.path.normpath(os.path.join(base_dir, 'extract')).replace('\\', '/')
+        settings_path = settings_path or (settings.settings_path if settings is not None else None)
         self.settings_path = os.path.normpath(settings_path).replace('\\', '/')
-        self.settings = self.load_settings()
+        self.settings = settings if settings is not None else self.load_settings()
         self.update_progress = None  # For GUI progress
         self.update_status = None    # For GUI status messages
         self._is_running = True
+        self._ignore_rules = None
+        self._file_catalog = None
+        self._file_reader = None
         os.makedirs(self.output_dir, exist_ok=True)
 
     def stop(self):
@@ -48,49 +77,55 @@ class MarkdownEx:
         self._is_running = False
 
     def load_settings(self):
-        """Load TOML settings and normalize paths."""
+        """Load TOML settings once into a normalized, read-only snapshot."""
         try:
-            settings = toml.load(self.settings_path)
-            self.normalize_paths(settings)
-            
-            # Ensure paths section exists
-            if 'paths' not in settings:
-                settings['paths'] = {}
-            
-            # Always set Windows as default path style if not specified
-            settings['paths']['path_style'] = settings['paths'].get('path_style', 'windows')
-            
-            return settings
-        except toml.TomlDecodeError as e:
+            return SettingsSnapshot.from_file(self.settings_path)
+        except TOML_DECODE_ERRORS as e:
             print(f"Error loading settings: {e}")
             raise
 
     def normalize_paths(self, settings_dict):
-        """Recursively normalize all paths in the loaded settings."""
-        for section in settings_dict:
-            for key, value in settings_dict[section].items():
-                if isinstance(value, str) and ('/' in value or '\\' in value):
-                    settings_dict[section][key] = os.path.normpath(value).replace('\\', '/')
-                elif isinstance(value, list):
-                    settings_dict[section][key] = [
-                        os.path.normpath(item).replace('\\', '/') 
-                        if isinstance(item, str) and ('/' in item or '\\' in item) else item
-                        for item in value
-                    ]
-                elif isinstance(value, dict):
-                    self.normalize_paths(value)
+        """Recursively normalize all paths in a settings dict."""
+        normalize_settings_paths(settings_dict)
 
     def save_settings(self):
         """If your app needs to write updated settings, implement here."""
         with open(self.settings_path, 'w') as settings_file:
-            toml.dump(self.settings, settings_file)
+            toml.dump(thaw(self.settings), settings_file)
+
+    @property
+    def ignore_rules(self) -> IgnoreRules:
+        """Ignored files, directories, extensions and skip paths, compiled once per extractor."""
+        if self._ignore_rules is None:
+            self._ignore_rules = IgnoreRules.from_settings(self.settings, base_dir=self.base_dir)
+        return self._ignore_rules
+
+    @property
+    def file_catalog(self) -> Optional[FileCatalog]:
+        """Persistent directory listings of base_dir (None when disabled)."""
+        if self._file_catalog is None:
+            self._file_catalog = FileCatalog.for_settings(self.settings, self.base_dir)
+        return self._file_catalog
+
+    @property
+    def file_reader(self) -> FileReader:
+        """Text reads with the special-file guard, large-file policy and read timeout from settings."""
+        if self._file_reader is None:
+            self._file_reader = FileReader(ReadPolicy.from_settings(self.settings))
+        return self._file_reader
+
+    @property
+    def passthrough_output(self) -> bool:
+        """
+        Whether valid UTF-8 bodies are copied byte for byte (files.passthrough_output).
+        Only where text mode writes '\\n' unchanged, so copied and generated lines match.
+        """
+        enabled = self.settings.get('files', {}).get('passthrough_output', constants.PASSTHROUGH_OUTPUT)
+        return bool(enabled) and os.linesep == '\n'
 
     def should_skip_directory(self, dir_path):
         """Check if directory should be skipped based on 'skip_paths' or ignored dirs."""
-        for skip_path in self.settings['paths'].get('skip_paths', []):
-            if dir_path.startswith(skip_path) or os.path.basename(dir_path) in self.settings['directories']['ignored_directories']:
-                return True
-        return False
+        return self.ignore_rules.skip_dir(dir_path)
 
     def format_path(self, relative_path):
         """Format the path based on the selected path style."""
@@ -103,64 +138,10 @@ class MarkdownEx:
             formatted_path = os.path.join('.', path).replace('\\', '/')
         return formatted_path
 
-    def get_files_in_directory(self, directory):
-        """
-        Collect all eligible files in 'directory' unless
-        'use_file_specific' is True, in which case only use 'specific_files'.
-        """
-        if self.settings['file_specific']['use_file_specific']:
-            return [
-                os.path.normpath(os.path.join(directory, file))
-                for file in self.settings['file_specific']['specific_files']
-            ]
-
-        file_paths = []
-        ignored_extensions = set(self.settings['files']['ignored_extensions'])
-        ignored_files = set(self.settings['files']['ignored_files'])
-
-        for root, dirs, files in os.walk(directory):
-            if not self._is_running:
-                if self.update_status:
-                    self.update_status("Markdown extraction stopped by user.")
-                break
-
-            # Skip directories if needed
-            if self.should_skip_directory(os.path.relpath(root, directory)):
-                dirs[:] = []
-                continue
-
-            # Filter out ignored directories
-            dirs[:] = [d for d in dirs if d not in self.settings['directories']['ignored_directories']]
-
-            for file in files:
-                if not self._is_running:
-                    if self.update_status:
-                        self.update_status("Markdown extraction stopped by user.")
-                    break
-
-                if file in ignored_files:
-                    continue
-                if os.path.splitext(file)[1].lower() in ignored_extensions:
-                    continue
-                file_paths.append(os.path.normpath(os.path.join(root, file)))
-
-        return file_paths
-
     @staticmethod
     def is_binary_file(file_path):
-        """Heuristic check if a file is binary by looking for NULL bytes."""
-        try:
-            file_path = os.path.normpath(file_path)
-            with open(file_path, 'rb') as file:
-                data = file.read(1024)
-            if not data:
-                return False
-            if b'\0' in data:
-                return True
-            return False
-        except Exception as e:
-            print(f"Error checking if file is binary: {str(e)}")
-            return True
+        """Check if a file is binary: extension table first, then cached magic/NUL sniffing."""
+        return is_binary_file(os.path.normpath(file_path))
 
     def create_table_of_contents(self, file_paths):
         """Generate a simple Table of Contents with links referencing local anchors."""
@@ -216,14 +197,31 @@ class MarkdownEx:
             content += f"Line = {start_line}, Starts = {start_line + 2}, Ends = {end_line + 1}\n\n"
         return content
 
-    def create_markdown_for_files(self, file_paths: List[str]) -> Tuple[str, str]:
+    def create_markdown_for_files(self, file_paths: List[str], stats: Optional[Dict[str, Any]] = None,
+                                  duplicates: Optional[Dict[str, str]] = None) -> Tuple[MarkdownDocument, str]:
         """
         Enhanced markdown creation supporting multiple format styles.
+        Returns the document (file bodies are copied or streamed into it on save)
+        and the where-each-file-line-is text.
+        'stats' holds stat results already taken per path (None: not a regular file);
+        paths in 'duplicates' get a reference to the first path of the same file.
         """
+        stats = stats or {}
+        duplicates = duplicates or {}
+        # Optional read-ahead in disk order; sections are still written in list order
+        scheduler = ReadScheduler.from_settings(
+            self.settings, self.file_reader,
+            ((path, stats.get(path)) for path in file_paths
+             if path not in duplicates and stats.get(path, True) is not None
+             and classify_by_extension(path) is not True))
+        scheduler.start()
         toc = self.create_table_of_contents(file_paths) + "\n\n"
         markdown_content = "# Project Details\n\n" + toc
         file_lines_info = {}
         line_counter = markdown_content.count('\n') + 1
+        # Valid UTF-8 bodies are copied into the output file by save_markdown instead of held as text
+        document = MarkdownDocument(markdown_content)
+        passthrough = self.passthrough_output
         
         total_files = len(file_paths)
         for idx, file_path in enumerate(file_paths, 1):
@@ -233,6 +231,10 @@ class MarkdownEx:
                 break
                 
             try:
+                scheduled_path = file_path
+                original = duplicates.get(file_path)
+                known_stat = file_path in stats
+                stat = stats.get(file_path)
                 file_path = os.path.normpath(file_path)
                 relative_path = os.path.relpath(file_path, self.extract_dir)
                 formatted_path = self.format_path(relative_path)
@@ -240,36 +242,69 @@ class MarkdownEx:
                 # Determine comment style based on file type
                 comment_prefix = self._get_comment_prefix(file_path)
                 
-                if self.is_binary_file(file_path):
-                    markdown_content += (
+                # One stat decides everything below: FIFOs, sockets and devices are never opened
+                if not known_stat:
+                    stat = self.file_reader.check(file_path)
+                result = None
+                if original is not None:
+                    original_path = self.format_path(os.path.relpath(os.path.normpath(original), self.extract_dir))
+                    placeholder = f"**Same file as {original_path}; its content is shown there.**"
+                elif stat is None and not os.path.exists(file_path):
+                    placeholder = "**File not found.**"
+                elif stat is None:
+                    placeholder = "**Not a regular file, skipped.**"
+                elif is_binary_file(file_path, stat):
+                    placeholder = "**Binary file cannot be displayed.**"
+                else:
+                    result = self.file_reader.read_text(file_path, stat, passthrough=passthrough, streaming=True)
+                    if result.status == READ_SKIPPED_LARGE:
+                        placeholder = f"**File too large ({result.size / 1024:.0f} KB), skipped.**"
+                    elif not result.has_text and result.status not in (READ_PASSTHROUGH, READ_STREAMED):
+                        placeholder = f"**File could not be read ({result.status}).**"
+                scheduler.consumed(scheduled_path)
+                
+                if result is None or not (result.has_text or result.status in (READ_PASSTHROUGH, READ_STREAMED)):
+                    section_content = (
                         f"# File: {formatted_path}\n\n"
-                        f"**Binary file cannot be displayed.**\n\n"
+                        f"{placeholder}\n\n"
                         "---\n\n"
                     )
-                    line_counter += 5
+                    document.append(section_content)
+                    line_counter += section_content.count('\n')
                 else:
-                    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                        content = f.read()
+                    if result.status == READ_TRUNCATED:
+                        print(f"Truncated large file {file_path} ({result.size} bytes)")
                         
                     file_extension = os.path.splitext(file_path)[1].lower().lstrip('.')
                     
-                    # Create section with multiple reference formats
-                    section_content = (
+                    # Create section with multiple reference formats; the body goes between the fences
+                    header = (
                         f"# {formatted_path}\n"
                         f"## File: {formatted_path}\n\n"
                         f"```{file_extension}\n"
                         f"{comment_prefix} {formatted_path}\n"
-                        f"{content}\n"
+                    )
+                    footer = (
+                        "\n"
                         "```\n\n"
                         "---\n\n"
                     )
                     
                     start_line = line_counter
-                    line_counter += section_content.count('\n')
+                    if result.status in (READ_PASSTHROUGH, READ_STREAMED):
+                        # The body is copied (or streamed) from the file when the document is saved
+                        document.append(header)
+                        document.append_file(file_path, result.size, result.lines,
+                                             text=result.status == READ_STREAMED)
+                        document.append(footer)
+                        line_counter += header.count('\n') + result.lines + footer.count('\n')
+                    else:
+                        section_content = header + result.text + footer
+                        document.append(section_content)
+                        line_counter += section_content.count('\n')
                     end_line = line_counter - 1
                     
                     file_lines_info[formatted_path] = (start_line, end_line)
-                    markdown_content += section_content
                     
             except Exception as e:
                 print(f"Error processing file {file_path}: {str(e)}")
@@ -280,8 +315,10 @@ class MarkdownEx:
             if self.update_progress:
                 self.update_progress(int(idx * 100 / total_files))
                 
+        scheduler.stop()
+        print(f"File reads: {self.file_reader.stats()}")
         where_file_lines = self.create_where_file_lines(file_lines_info)
-        return markdown_content, where_file_lines
+        return document, where_file_lines
 
     def _get_comment_prefix(self, file_path: str) -> str:
         """
@@ -323,7 +360,7 @@ class MarkdownEx:
 
     def save_markdown(self, markdown_content, where_file_lines, output_dir, preset_name=None):
         """
-        Save the generated markdown content and companion file.
+        Save the generated markdown content (a MarkdownDocument or a string) and companion file.
         If preset_name is provided, use it (with slashes replaced by underscores)
         as the prefix. Otherwise, fall back to the settings prefix.
         """
@@ -350,23 +387,26 @@ class MarkdownEx:
             main_output_path = os.path.join(output_dir, f'{prefix}_{next_index:02d}.md')
             where_file_lines_path = os.path.join(output_dir, f'{prefix}_{next_index:02d}_where_each_file_line_is.md')
         
-        with open(main_output_path, 'w', encoding='utf-8') as f:
-            f.write(markdown_content)
+        if isinstance(markdown_content, MarkdownDocument):
+            markdown_content.save(main_output_path, self.file_reader)
+        else:
+            with open(main_output_path, 'w', encoding='utf-8') as f:
+                f.write(markdown_content)
         with open(where_file_lines_path, 'w', encoding='utf-8') as f:
             f.write(where_file_lines)
             
         return main_output_path, where_file_lines_path
 
-    def run(self):
-        """Main entry point for running the Markdown extraction."""
+    def run(self, presets: Optional[List[str]] = None):
+        """
+        Main entry point for running the Markdown extraction.
+        'presets' limits the run to those preset names; by default only the current preset runs.
+        """
         if not os.path.exists(self.settings_path):
             raise FileNotFoundError(f"Settings file not found: {self.settings_path}")
 
         output_dir = self.settings['paths']['output_dir']
-        presets = self.settings.get('presets', {})
-        
-        # Filter out the 'current_preset' key from presets
-        preset_names = [name for name in presets.keys() if name != 'current_preset']
+        preset_names = select_presets(self.settings, presets)
         total_presets = len(preset_names)
 
         if total_presets == 0:
@@ -387,26 +427,40 @@ class MarkdownEx:
                 preset_output_dir = os.path.normpath(os.path.join(output_dir, preset_name)).replace('\\', '/')
                 os.makedirs(preset_output_dir, exist_ok=True)
 
-                specific_files = presets[preset_name]
+                # File lists are loaded from the preset store one preset at a time
+                specific_files = resolve_preset_files(self.settings, self.settings_path, preset_name)
                 # Skip if preset_name is 'current_preset' or specific_files is not a list
                 if preset_name == 'current_preset' or not isinstance(specific_files, list):
                     print(f"Skipping preset '{preset_name}': Not a valid preset or file list")
                     continue
+                # Expand glob, directory and negated entries against the current tree
+                specific_files = resolve_entries(specific_files, self.base_dir, rules=self.ignore_rules,
+                                                 catalog=self.file_catalog)
                     
                 file_paths = [
                     os.path.normpath(os.path.join(self.base_dir, file)).replace('\\', '/')
                     for file in specific_files
                 ]
 
+                # Each physical file (symlinks, hardlinks, repeated entries) is read once
+                dedup = find_duplicate_files(file_paths, self.file_reader.check)
+                file_paths, duplicates = dedup.paths, dedup.duplicates
+                if duplicates:
+                    print(f"{len(duplicates)} duplicate paths of already listed files in preset '{preset_name}'")
+                    if duplicate_policy(self.settings) == DUPLICATES_SKIP:
+                        file_paths = [path for path in file_paths if path not in duplicates]
+                        duplicates = {}
+
                 if not file_paths:
                     if self.update_status:
                         self.update_status(f"No files found for preset: {preset_name}")
                     continue
 
-                markdown_content, where_file_lines = self.create_markdown_for_files(file_paths)
+                document, where_file_lines = self.create_markdown_for_files(
+                    file_paths, stats=dedup.stats, duplicates=duplicates)
                 # Pass preset_name to use its derived prefix
                 main_output_path, where_file_lines_path = self.save_markdown(
-                    markdown_content,
+                    document,
                     where_file_lines,
                     preset_output_dir,
                     preset_name
@@ -431,15 +485,23 @@ class MarkdownEx:
 
 
 class CSVEx:
-    def __init__(self, base_dir, output_dir, settings_path):
+    def __init__(self, base_dir, output_dir, settings_path=None, settings: Optional[SettingsSnapshot] = None):
+        """
+        'settings' is a pre-parsed SettingsSnapshot (e.g. from SettingsManager.snapshot());
+        without it the settings are read once from 'settings_path'.
+        """
         self.base_dir = os.path.normpath(base_dir).replace('\\', '/')
         self.output_dir = os.path.normpath(output_dir).replace('\\', '/')
         self.extracted_dir = os.path.normpath(os.path.join(base_dir, 'extracted')).replace('\\', '/')
+        settings_path = settings_path or (settings.settings_path if settings is not None else None)
         self.settings_path = os.path.normpath(settings_path).replace('\\', '/')
-        self.settings = self.load_settings()
+        self.settings = settings if settings is not None else self.load_settings()
         self.update_progress = None  # For GUI progress
         self.update_status = None    # For GUI status messages
         self._is_running = True
+        self._ignore_rules = None
+        self._file_catalog = None
+        self._file_reader = None
         os.makedirs(self.output_dir, exist_ok=True)
 
     def stop(self):
@@ -447,34 +509,21 @@ class CSVEx:
         self._is_running = False
 
     def load_settings(self):
-        """Load TOML settings for CSV extraction."""
+        """Load TOML settings for CSV extraction into a read-only snapshot."""
         try:
-            settings = toml.load(self.settings_path)
-            self.normalize_paths(settings)
-            return settings
-        except toml.TomlDecodeError as e:
+            return SettingsSnapshot.from_file(self.settings_path)
+        except TOML_DECODE_ERRORS as e:
             print(f"Error loading settings: {e}")
             raise
 
     def normalize_paths(self, settings_dict):
-        """Normalize all string paths in the loaded CSV settings."""
-        for section in settings_dict:
-            for key, value in settings_dict[section].items():
-                if isinstance(value, str) and ('/' in value or '\\' in value):
-                    settings_dict[section][key] = os.path.normpath(value).replace('\\', '/')
-                elif isinstance(value, list):
-                    settings_dict[section][key] = [
-                        os.path.normpath(item).replace('\\', '/') 
-                        if isinstance(item, str) and ('/' in item or '\\' in item) else item
-                        for item in value
-                    ]
-                elif isinstance(value, dict):
-                    self.normalize_paths(value)
+        """Normalize all string paths in a CSV settings dict."""
+        normalize_settings_paths(settings_dict)
 
     def save_settings(self):
         """If your app needs to write updated settings, implement here."""
         with open(self.settings_path, 'w') as settings_file:
-            toml.dump(self.settings, settings_file)
+            toml.dump(thaw(self.settings), settings_file)
 
     @staticmethod
     def extract_zip(zip_path, extract_to):
@@ -485,16 +534,25 @@ class CSVEx:
         with zipfile.ZipFile(zip_path, 'r') as zip_ref:
             zip_ref.extractall(extract_to)
 
+    @staticmethod
+    def text_metrics(content):
+        """Total chars, total words and total lines of already-read text."""
+        return len(content), len(content.split()), content.count("\n") + 1
+
+    @staticmethod
+    def text_classes_functions_variables(content):
+        """Naive counts of 'class', 'def' and simple 'variable = ' patterns in already-read text."""
+        class_count = len(re.findall(r'\bclass\b', content))
+        function_count = len(re.findall(r'\bdef\b', content))
+        variable_count = len(re.findall(r'\b[A-Za-z_][A-Za-z0-9_]*\s*=\s*', content))
+        return class_count, function_count, variable_count
+
     @staticmethod
     def count_file_metrics(file_path):
         """Count basic metrics: total chars, total words, total lines."""
         try:
             with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-                char_count = len(content)
-                word_count = len(content.split())
-                line_count = content.count("\n") + 1
-            return char_count, word_count, line_count
+                return CSVEx.text_metrics(f.read())
         except Exception as e:
             print(f"Error counting metrics for {file_path}: {str(e)}")
             return 0, 0, 0
@@ -506,66 +564,50 @@ class CSVEx:
         """
         try:
             with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-                class_count = len(re.findall(r'\bclass\b', content))
-                function_count = len(re.findall(r'\bdef\b', content))
-                variable_count = len(re.findall(r'\b[A-Za-z_][A-Za-z0-9_]*\s*=\s*', content))
-            return class_count, function_count, variable_count
+                return CSVEx.text_classes_functions_variables(f.read())
         except Exception as e:
             print(f"Error counting code elements for {file_path}: {str(e)}")
             return 0, 0, 0
 
+    @property
+    def ignore_rules(self) -> IgnoreRules:
+        """Ignored files, directories, extensions and skip paths, compiled once per extractor."""
+        if self._ignore_rules is None:
+            self._ignore_rules = IgnoreRules.from_settings(self.settings, base_dir=self.base_dir)
+        return self._ignore_rules
+
+    @property
+    def file_catalog(self) -> Optional[FileCatalog]:
+        """Persistent directory listings of base_dir (None when disabled)."""
+        if self._file_catalog is None:
+            self._file_catalog = FileCatalog.for_settings(self.settings, self.base_dir)
+        return self._file_catalog
+
+    @property
+    def file_reader(self) -> FileReader:
+        """Text reads with the special-file guard, large-file policy and read timeout from settings."""
+        if self._file_reader is None:
+            self._file_reader = FileReader(ReadPolicy.from_settings(self.settings))
+        return self._file_reader
+
     def should_skip_directory(self, dir_path):
         """Check if a directory should be skipped based on settings."""
-        skip_paths = self.settings['paths'].get('skip_paths', [])
-        for skip_path in skip_paths:
-            if dir_path.startswith(skip_path) or os.path.basename(dir_path) in self.settings['directories']['ignored_directories']:
-                return True
-        return False
-
-    def generate_directory_tree_with_detailed_metrics(self):
-        """Traverse files and build a list of [Path, Metrics, Code] for each."""
+        return self.ignore_rules.skip_dir(dir_path)
+
+    def generate_directory_tree_with_detailed_metrics(self, file_paths: List[str]):
+        """Build a list of [Path, Metrics, Code] for each of the (resolved preset) files."""
         if self.update_status:
             self.update_status("Gathering file list...")
 
-        if self.settings['file_specific']['use_file_specific']:
-            # If only using specific files
-            file_paths = [
-                os.path.join(self.base_dir, file)
-                for file in self.settings['file_specific']['specific_files']
-            ]
-        else:
-            file_paths = []
-            ignored_extensions = set(self.settings['files']['ignored_extensions'])
-            ignored_files = set(self.settings['files']['ignored_files'])
-
-            for root_dir, dirs, files in os.walk(self.base_dir):
-                if not self._is_running:
-                    if self.update_status:
-                        self.update_status("CSV extraction stopped by user.")
-                    break
-
-                if self.should_skip_directory(os.path.relpath(root_dir, self.base_dir)):
-                    dirs[:] = []
-                    continue
-
-                dirs[:] = [d for d in dirs if d not in self.settings['directories']['ignored_directories']]
-
-                for file in files:
-                    if not self._is_running:
-                        if self.update_status:
-                            self.update_status("CSV extraction stopped by user.")
-                        break
-
-                    if file in ignored_files:
-                        continue
-
-                    file_ext = os.path.splitext(file)[1].lower()
-                    if file_ext in ignored_extensions:
-                        continue
-
-                    file_path = os.path.join(root_dir, file)
-                    file_paths.append(file_path)
+        # Each physical file (symlinks, hardlinks, repeated entries) is read once;
+        # every file is stat'ed here, before any open()
+        dedup = find_duplicate_files(file_paths, self.file_reader.check)
+        file_paths, duplicates = dedup.paths, dedup.duplicates
+        if duplicates:
+            print(f"{len(duplicates)} duplicate paths of already listed files")
+            if duplicate_policy(self.settings) == DUPLICATES_SKIP:
+                file_paths = [path for path in file_paths if path not in duplicates]
+                duplicates = {}
 
         if not file_paths:
             if self.update_status:
@@ -574,6 +616,13 @@ class CSVEx:
 
         directory_tree = []
         total_files = len(file_paths)
+        # Optional read-ahead in disk order; rows are still produced in list order
+        scheduler = ReadScheduler.from_settings(
+            self.settings, self.file_reader,
+            ((path, dedup.stats[path]) for path in file_paths
+             if path not in duplicates and dedup.stats[path] is not None
+             and classify_by_extension(path) is not True))
+        scheduler.start()
 
         for idx, file_path in enumerate(file_paths, 1):
             if not self._is_running:
@@ -586,19 +635,49 @@ class CSVEx:
 
             try:
                 relative_path = os.path.relpath(file_path, self.base_dir)
-                size_kb = os.path.getsize(file_path) / 1024
+                size_unit = self.settings['metrics']['size_unit']
+                stat = dedup.stats[file_path]
+                if stat is None:
+                    if not os.path.exists(file_path):
+                        directory_tree.append([relative_path, "missing", "File not found."])
+                    else:
+                        directory_tree.append([relative_path, "special", "Not a regular file, skipped."])
+                    continue
+                size_kb = stat.st_size / 1024
+
+                original = duplicates.get(file_path)
+                if original is not None:
+                    metrics = f"{size_kb:.2f}{size_unit},duplicate"
+                    directory_tree.append([relative_path, metrics,
+                                           f"Same file as {os.path.relpath(original, self.base_dir)}."])
+                    continue
 
-                char_count, word_count, line_count = self.count_file_metrics(file_path)
-                class_count, function_count, variable_count = self.count_classes_functions_variables(file_path)
+                if is_binary_file(file_path, stat):
+                    # Binary files are listed with their size but never opened
+                    scheduler.consumed(file_path)
+                    metrics = f"{size_kb:.2f}{size_unit},binary"
+                    directory_tree.append([relative_path, metrics, "Binary file cannot be displayed."])
+                    continue
+
+                # One guarded read feeds both the metrics and the content column
+                result = self.file_reader.read_text(file_path, stat)
+                scheduler.consumed(file_path)
+                if not result.has_text:
+                    metrics = f"{size_kb:.2f}{size_unit},{result.status}"
+                    directory_tree.append([relative_path, metrics, f"File not included ({result.status})."])
+                    continue
+                content = result.text
+
+                char_count, word_count, line_count = self.text_metrics(content)
+                class_count, function_count, variable_count = self.text_classes_functions_variables(content)
 
                 metrics = (
-                    f"{size_kb:.2f}{self.settings['metrics']['size_unit']},"
+                    f"{size_kb:.2f}{size_unit},"
                     f"C{char_count},W{word_count},L{line_count},"
                     f"CL{class_count},F{function_count},V{variable_count}"
                 )
-
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
+                if result.status == READ_TRUNCATED:
+                    metrics += ",truncated"
 
                 directory_tree.append([relative_path, metrics, content])
 
@@ -611,6 +690,8 @@ class CSVEx:
             if self.update_progress:
                 self.update_progress(int(idx * 100 / total_files))
 
+        scheduler.stop()
+        print(f"File reads: {self.file_reader.stats()}")
         return directory_tree
 
     def get_next_output_file_path(self, preset_output_dir, preset_name=None):
@@ -689,8 +770,11 @@ class CSVEx:
                 self.update_status(f"Error saving Excel file: {str(e)}")
             raise
 
-    def run(self):
-        """Main entry point for CSV extraction, saving results to Excel."""
+    def run(self, presets: Optional[List[str]] = None):
+        """
+        Main entry point for CSV extraction, saving results to Excel.
+        'presets' limits the run to those preset names; by default only the current preset runs.
+        """
         if not os.path.exists(self.settings_path):
             raise FileNotFoundError(f"Settings file not found: {self.settings_path}")
 
@@ -698,9 +782,7 @@ class CSVEx:
             if self.update_status:
                 self.update_status("Starting extraction process...")
 
-            presets = self.settings.get('presets', {})
-            # Filter out the 'current_preset' key from presets
-            preset_names = [name for name in presets.keys() if name != 'current_preset']
+            preset_names = select_presets(self.settings, presets)
             total_presets = len(preset_names)
 
             if total_presets == 0:
@@ -721,11 +803,15 @@ class CSVEx:
                     preset_output_dir = os.path.normpath(os.path.join(self.output_dir, preset_name))
                     os.makedirs(preset_output_dir, exist_ok=True)
 
-                    specific_files = presets[preset_name]
+                    # File lists are loaded from the preset store one preset at a time
+                    specific_files = resolve_preset_files(self.settings, self.settings_path, preset_name)
                     # Skip if preset_name is 'current_preset' or specific_files is not a list
                     if preset_name == 'current_preset' or not isinstance(specific_files, list):
                         print(f"Skipping preset '{preset_name}': Not a valid preset or file list")
                         continue
+                    # Expand glob, directory and negated entries against the current tree
+                    specific_files = resolve_entries(specific_files, self.base_dir, rules=self.ignore_rules,
+                                                 catalog=self.file_catalog)
 
                     file_paths = [
                         os.path.normpath(os.path.join(self.base_dir, file))
@@ -740,7 +826,8 @@ class CSVEx:
                     if self.update_status:
                         self.update_status(f"Generating directory tree for preset: {preset_name}")
 
-                    directory_tree_with_detailed_metrics = self.generate_directory_tree_with_detailed_metrics()
+                    directory_tree_with_detailed_metrics = self.generate_directory_tree_with_detailed_metrics(
+                        file_paths)
 
                     if self.update_status:
                         self.update_status(f"Saving to Excel file for preset: {preset_name}")
@@ -772,30 +859,82 @@ class CSVEx:
             raise
 
 
-@dataclass
 class CodeBlock:
-    path: str
-    language: str
-    content: str
-    style: str
-    update_class: Optional[str] = None
+    """
+    A code block parsed from a markdown bundle. Blocks parsed from a buffer
+    (bytes or an mmap of the bundle) only keep the (start, end) byte span of
+    their content and decode it on access, so parsing does not copy the bundle.
+    """
+    __slots__ = ('path', 'language', 'style', 'update_class', '_content', 'source', 'start', 'end')
+
+    def __init__(self, path: str, language: str, content: Optional[str] = None, style: str = 'unix',
+                 update_class: Optional[str] = None, source: Any = None, start: int = 0, end: int = 0):
+        self.path = path
+        self.language = language
+        self.style = style
+        self.update_class = update_class
+        self._content = content
+        self.source = source
+        self.start = start
+        self.end = end
+
+    @property
+    def content(self) -> str:
+        """Block content, decoded from the source buffer when the block is span-backed."""
+        if self._content is not None:
+            return self._content
+        text = self.source[self.start:self.end].decode('utf-8')
+        return text.replace('\r\n', '\n') if '\r' in text else text
+
+    @content.setter
+    def content(self, value: str) -> None:
+        self._content = value
+
+    def write_to(self, out_file) -> None:
+        """Write the stripped content; span-backed content is already stripped at parse time."""
+        out_file.write(self._content.strip() if self._content is not None else self.content)
+
+    @property
+    def size(self) -> int:
+        return len(self._content) if self._content is not None else self.end - self.start
+
+    def __getstate__(self):
+        # The source buffer (usually an mmap) never crosses process boundaries
+        return (self.path, self.language, self.style, self.update_class, self._content, self.start, self.end)
+
+    def __setstate__(self, state):
+        self.path, self.language, self.style, self.update_class, self._content, self.start, self.end = state
+        self.source = None
+
+    def __eq__(self, other):
+        if not isinstance(other, CodeBlock):
+            return NotImplemented
+        return (self.path, self.language, self.style, self.update_class, self.content) == \
+            (other.path, other.language, other.style, other.update_class, other.content)
+
+    def __repr__(self):
+        return (f"CodeBlock(path={self.path!r}, language={self.language!r}, style={self.style!r}, "
+                f"update_class={self.update_class!r}, size={self.size})")
 
 class ReverseMarkdownEx:
-    def __init__(self, markdown_path: str, output_dir: str, settings_path: Optional[str] = None):
+    def __init__(self, markdown_path: str, output_dir: str, settings_path: Optional[str] = None,
+                 settings: Optional[SettingsSnapshot] = None):
         """Initialize the markdown extractor with enhanced update capabilities."""
         self.markdown_path = markdown_path
         self.output_dir = os.path.normpath(output_dir).replace('\\', '/')
         self.settings_path = os.path.normpath(settings_path).replace('\\', '/') if settings_path else None
-        self.settings = self.load_settings() if settings_path else {'paths': {'path_style': 'windows'}}
+        if settings is not None:
+            self.settings = settings
+        else:
+            self.settings = self.load_settings() if settings_path else {'paths': {'path_style': 'windows'}}
         self.update_progress = None  # For GUI progress
         self.update_status = None    # For GUI status messages
         self._is_running = True
-        
-        # Initialize regex patterns for class handling
-        self.class_pattern = re.compile(
-            r'class\s+(?P<class_name>\w+)[\s\(].*?(?=\n\s*(?:class|$))', 
-            re.DOTALL
-        )
+        self.apply_patches = True    # Apply ```diff blocks to existing files in output_dir
+        self.patch_max_fuzz = 2      # Context lines a hunk may drop while being located
+        self.parallel_threshold = 64 * 1024 * 1024  # Bundles at least this large are parsed in worker processes
+        self.max_workers = None      # None = os.cpu_count(); 1 disables parallel parsing
+        self._source_buffer = None   # mmap of the bundle while run() is active
 
     def stop(self):
         """Stop the reverse extraction process gracefully."""
@@ -805,36 +944,15 @@ class ReverseMarkdownEx:
         """Load TOML settings and normalize paths."""
         try:
             if self.settings_path:
-                settings = toml.load(self.settings_path)
-                # Ensure we have the required structure
-                if not isinstance(settings, dict):
-                    settings = {'paths': {'path_style': 'windows'}}
-                elif 'paths' not in settings:
-                    settings['paths'] = {'path_style': 'windows'}
-                elif 'path_style' not in settings['paths']:
-                    settings['paths']['path_style'] = 'windows'
-                
-                self.normalize_paths(settings)
-                return settings
+                return SettingsSnapshot.from_file(self.settings_path)
             return {'paths': {'path_style': 'windows'}}
         except Exception as e:
             print(f"Error loading settings: {e}")
             return {'paths': {'path_style': 'windows'}}
 
     def normalize_paths(self, settings_dict: Dict[str, Any]) -> None:
-        """Recursively normalize all paths in the loaded settings."""
-        for section in settings_dict:
-            for key, value in settings_dict[section].items():
-                if isinstance(value, str) and ('/' in value or '\\' in value):
-                    settings_dict[section][key] = os.path.normpath(value).replace('\\', '/')
-                elif isinstance(value, list):
-                    settings_dict[section][key] = [
-                        os.path.normpath(item).replace('\\', '/') 
-                        if isinstance(item, str) and ('/' in item or '\\' in item) else item
-                        for item in value
-                    ]
-                elif isinstance(value, dict):
-                    self.normalize_paths(value)
+        """Recursively normalize all paths in a settings dict."""
+        normalize_settings_paths(settings_dict)
 
     def format_path(self, relative_path: str) -> str:
         """Format the path based on the selected path style."""
@@ -845,111 +963,180 @@ class ReverseMarkdownEx:
             formatted_path = os.path.join('.', path).replace('\\', '/')
         return formatted_path
 
+    # Pattern sets shared by the buffer parser (bytes patterns, matched line by line)
+    HEADER_PATTERNS = [
+        # Update headers ("## Update: path/to/file.py::ClassName") must be tried first,
+        # since a dotted target name would otherwise look like a plain file path
+        (re.compile(rb'^#+\s*(?:Update|Replace):\s*(.*?\.[\w]+)::([\w.]+)\s*$'), True),
+        (re.compile(rb'^#\s*(?:title\s*=\s*)(.*?\.[\w]+)$'), False),
+        (re.compile(rb'^#+\s*(?:File|Path|Location|Source|Module Path|Container Path):\s*(.*?\.[\w]+)$'), False),
+        (re.compile(rb'^#\s*\[(.*?\.[\w]+)\]$'), False),
+        (re.compile(rb'^#\s*(.*?\.[\w]+)$'), False),
+    ]
+
+    CODE_COMMENT_PATTERNS = [
+        re.compile(rb'^(?://|#)\s*(.*?\.[\w]+)$'),
+        re.compile(rb'^(?://|#)\s*\[(.*?\.[\w]+)\]$'),
+        re.compile(rb'^(?://|#)\s*(?:File|Path|Location|Source):\s*(.*?\.[\w]+)$'),
+    ]
+
+    # Section delimiters: '---', '***', '___' rules and '#' headings, plus fence lines
+    SECTION_MARKER_PATTERN = re.compile(
+        rb'^(?:```|#|[ \t]*(?:---|\*\*\*|___)[ \t]*\r?$)', re.MULTILINE
+    )
+    CODE_BLOCK_PATTERN = re.compile(rb'```(\w+)\r?\n(.*?)```', re.DOTALL)
+    FENCE_PATTERN = re.compile(rb'^```(\w+)[ \t]*\r?\n(.*?)^```', re.DOTALL | re.MULTILINE)
+    HEADING_PATTERN = re.compile(
+        rb'^#+\s*(?:(?:File|Path|Location|Source|Module Path|Container Path):\s*)?(.*?\.[\w]+)\s*$'
+    )
+    WHITESPACE = b' \t\r\n\x0b\x0c'
+
     def extract_code_blocks(self, content: str) -> List[CodeBlock]:
         """
         Enhanced extraction of code blocks supporting multiple formats.
         Handles various path locations and formats.
         """
+        return self.extract_code_blocks_from_buffer(content.encode('utf-8'))
+
+    def extract_code_blocks_from_buffer(self, buffer, start: int = 0, end: Optional[int] = None) -> List[CodeBlock]:
+        """
+        Extract code blocks from 'buffer[start:end]' (bytes or mmap). The returned
+        blocks reference 'buffer' by byte offsets instead of holding copies.
+        """
         code_blocks = []
-        
-        # Define all pattern sets
-        header_patterns = [
-            (r'^#\s*(?:title\s*=\s*)(.*?\.[\w]+)$', False),
-            (r'^#+\s*(?:File|Path|Location|Source|Module Path|Container Path):\s*(.*?\.[\w]+)$', False),
-            (r'^#\s*\[(.*?\.[\w]+)\]$', False),
-            (r'^#\s*(.*?\.[\w]+)$', False),
-        ]
-        
-        code_comment_patterns = [
-            (r'^(?://|#)\s*(.*?\.[\w]+)$', False),
-            (r'^(?://|#)\s*\[(.*?\.[\w]+)\]$', False),
-            (r'^(?://|#)\s*(?:File|Path|Location|Source):\s*(.*?\.[\w]+)$', False),
-        ]
-        
-        section_patterns = [
-            r'^\s*---\s*$',
-            r'^\s*\*\*\*\s*$',
-            r'^\s*___\s*$',
-            r'^#+\s*.*$'
-        ]
-        
-        # Split content into sections using any delimiter
-        sections = self._split_into_sections(content, section_patterns)
-        
-        for section in sections:
+        end = len(buffer) if end is None else end
+
+        for section_start, section_end in self._iter_section_spans(buffer, start, end):
             try:
-                # Extract path from section header or content
-                file_path = None
-                code_content = None
-                language = None
-                
-                # Try header patterns first
-                for pattern, is_update in header_patterns:
-                    matches = re.finditer(pattern, section, re.MULTILINE)
-                    for match in matches:
-                        file_path = match.group(1)
-                        break
-                    if file_path:
-                        break
-                
-                # Look for code blocks
-                code_block_pattern = r'```(\w+)\n(.*?)```'
-                code_matches = list(re.finditer(code_block_pattern, section, re.DOTALL))
-                
-                if code_matches:
-                    for code_match in code_matches:
-                        language = code_match.group(1)
-                        code_content = code_match.group(2).strip()
-                        
-                        # If no path found in header, try code comments
-                        if not file_path:
-                            code_lines = code_content.split('\n')
-                            if code_lines:
-                                for pattern, is_update in code_comment_patterns:
-                                    comment_match = re.match(pattern, code_lines[0])
-                                    if comment_match:
-                                        file_path = comment_match.group(1)
-                                        # Remove the comment line if path was found there
-                                        code_content = '\n'.join(code_lines[1:]).strip()
-                                        break
-                
-                if file_path and code_content:
-                    normalized_path = self._normalize_path(file_path)
-                    code_blocks.append(CodeBlock(
-                        path=normalized_path,
-                        language=language or self._detect_language(normalized_path),
-                        content=code_content,
-                        style='windows' if '\\' in file_path else 'unix'
-                    ))
-                    
+                block = self._parse_section(buffer, section_start, section_end)
+                if block:
+                    code_blocks.append(block)
             except Exception as e:
                 print(f"Error processing section: {str(e)}")
                 continue
-                
+
         return code_blocks
 
-    def _split_into_sections(self, content: str, section_patterns: List[str]) -> List[str]:
+    def _parse_section(self, buffer, section_start: int, section_end: int) -> Optional[CodeBlock]:
+        """Parse one section into a CodeBlock using byte offsets only."""
+        code_matches = list(self.CODE_BLOCK_PATTERN.finditer(buffer, section_start, section_end))
+
+        # Headers are only looked for before the first fence, never inside code
+        header_end = code_matches[0].start() if code_matches else section_end
+        header_lines = [
+            line.rstrip(b'\r') for line in buffer[section_start:header_end].split(b'\n')
+        ]
+
+        file_path = None
+        update_target = None
+        for pattern, is_update in self.HEADER_PATTERNS:
+            for line in header_lines:
+                match = pattern.match(line)
+                if match:
+                    file_path = match.group(1).decode('utf-8')
+                    if is_update:
+                        update_target = match.group(2).decode('utf-8')
+                    break
+            if file_path:
+                break
+
+        language = None
+        span = None
+        for code_match in code_matches:
+            # Diff blocks are handled by extract_diff_blocks, never written as files
+            if code_match.group(1).lower().decode('ascii') in DIFF_LANGUAGES:
+                continue
+            language = code_match.group(1).decode('ascii')
+            span = self._strip_span(buffer, code_match.start(2), code_match.end(2))
+
+            # If no path found in header, try the first line of the code
+            if not file_path and span[0] < span[1]:
+                newline = buffer.find(b'\n', span[0], span[1])
+                first_line_end = span[1] if newline == -1 else newline
+                first_line = buffer[span[0]:first_line_end].rstrip(b'\r')
+                for pattern in self.CODE_COMMENT_PATTERNS:
+                    comment_match = pattern.match(first_line)
+                    if comment_match:
+                        file_path = comment_match.group(1).decode('utf-8')
+                        # Remove the comment line if path was found there
+                        span = self._strip_span(buffer, first_line_end, span[1])
+                        break
+
+        if not (file_path and span and span[0] < span[1]):
+            return None
+
+        normalized_path = self._normalize_path(file_path)
+        return CodeBlock(
+            path=normalized_path,
+            language=language or self._detect_language(normalized_path),
+            style='windows' if '\\' in file_path else 'unix',
+            update_class=update_target,
+            source=buffer,
+            start=span[0],
+            end=span[1],
+        )
+
+    def _strip_span(self, buffer, start: int, end: int) -> Tuple[int, int]:
+        """Equivalent of str.strip() on buffer[start:end], returning offsets."""
+        whitespace = self.WHITESPACE
+        while start < end and buffer[start] in whitespace:
+            start += 1
+        while end > start and buffer[end - 1] in whitespace:
+            end -= 1
+        return start, end
+
+    def _iter_section_spans(self, buffer, start: int, end: int):
         """
-        Split content into sections based on various delimiter patterns.
+        Yield (start, end) byte spans of sections. A section starts at a heading or
+        a '---' / '***' / '___' rule; lines inside code fences never split sections.
         """
-        # Combine all patterns into one
-        combined_pattern = '|'.join(f'({pattern})' for pattern in section_patterns)
-        
-        # Split content
-        sections = []
-        current_section = []
-        
-        for line in content.split('\n'):
-            if any(re.match(pattern, line) for pattern in section_patterns):
-                if current_section:
-                    sections.append('\n'.join(current_section))
-                    current_section = []
-            current_section.append(line)
-            
-        if current_section:
-            sections.append('\n'.join(current_section))
-            
-        return sections if sections else [content]
+        section_start = start
+        in_fence = False
+        for match in self.SECTION_MARKER_PATTERN.finditer(buffer, start, end):
+            if match.group().startswith(b'```'):
+                in_fence = not in_fence
+                continue
+            if in_fence:
+                continue
+            if match.start() > section_start:
+                yield section_start, match.start()
+            section_start = match.start()
+        if end > section_start:
+            yield section_start, end
+
+    def extract_diff_blocks(self, content: str) -> List[FilePatch]:
+        """
+        Extract unified diffs from ```diff / ```patch blocks. Files are keyed by the
+        '--- / +++' headers; headerless hunks fall back to the closest preceding
+        '# File: ...' style heading.
+        """
+        return self.extract_diff_blocks_from_buffer(content.encode('utf-8'))
+
+    def extract_diff_blocks_from_buffer(self, buffer, start: int = 0, end: Optional[int] = None) -> List[FilePatch]:
+        """Buffer variant of extract_diff_blocks; only the diff bodies are decoded."""
+        end = len(buffer) if end is None else end
+        patches = []
+        previous_end = start
+        for match in self.FENCE_PATTERN.finditer(buffer, start, end):
+            if match.group(1).lower().decode('ascii') not in DIFF_LANGUAGES:
+                previous_end = match.end()
+                continue
+
+            default_path = None
+            heading_start = buffer.rfind(b'\n#', previous_end, match.start())
+            if heading_start != -1:
+                heading_end = buffer.find(b'\n', heading_start + 1)
+                heading = self.HEADING_PATTERN.match(buffer[heading_start + 1:heading_end].rstrip(b'\r'))
+                if heading:
+                    default_path = heading.group(1).decode('utf-8')
+
+            try:
+                diff_text = buffer[match.start(2):match.end(2)].decode('utf-8')
+                patches.extend(parse_unified_diff(diff_text.replace('\r\n', '\n'), default_path))
+            except Exception as e:
+                print(f"Error parsing diff block: {str(e)}")
+            previous_end = match.end()
+        return patches
 
     def _detect_language(self, file_path: str) -> str:
         """
@@ -1016,54 +1203,166 @@ class ReverseMarkdownEx:
             
         return path
 
-    def update_class_in_file(self, file_path: str, class_name: str, new_content: str) -> bool:
-        """Update a specific class in a file while preserving all other content."""
-        try:
-            # Read existing file content
-            if not os.path.exists(file_path):
-                print(f"File not found: {file_path}")
-                return False
-
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-
-            # Find the target class using improved pattern
-            class_pattern = re.compile(
-                f'class\\s+{re.escape(class_name)}\\s*(?:\\([^)]*\\))?\\s*:\\s*[^#]*?(?=\\s*class\\s+|$)',
-                re.DOTALL | re.MULTILINE
+    def find_section_boundaries(self, chunk_count: int) -> List[Tuple[int, int]]:
+        """
+        Split the markdown file into at most 'chunk_count' byte ranges. Ranges only
+        start at '---' separator lines outside code fences, so every range parses
+        exactly like the same sections would in a single pass.
+        """
+        file_size = os.path.getsize(self.markdown_path)
+        if chunk_count <= 1 or file_size == 0:
+            return [(0, file_size)]
+
+        marker_pattern = re.compile(rb'^(?:```|---[ \t]*\r?$)', re.MULTILINE)
+        target_size = file_size // chunk_count
+        boundaries = [0]
+        with open(self.markdown_path, 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            in_fence = False
+            for match in marker_pattern.finditer(buffer):
+                if match.group().startswith(b'```'):
+                    in_fence = not in_fence
+                elif not in_fence and match.start() - boundaries[-1] >= target_size:
+                    boundaries.append(match.start())
+                    if len(boundaries) == chunk_count:
+                        break
+        boundaries.append(file_size)
+        return list(zip(boundaries[:-1], boundaries[1:]))
+
+    def parse_parallel(self) -> Tuple[List['CodeBlock'], List[FilePatch]]:
+        """Parse byte ranges of the markdown file in worker processes and merge them in order."""
+        workers = self.max_workers or os.cpu_count() or 1
+        ranges = self.find_section_boundaries(workers * 4)
+        print(f"Parsing {len(ranges)} ranges with {workers} worker processes")
+
+        code_blocks: List[CodeBlock] = []
+        file_patches: List[FilePatch] = []
+        path_style = self.settings['paths'].get('path_style', 'windows')
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(
+                _parse_markdown_range,
+                [self.markdown_path] * len(ranges),
+                [start for start, _ in ranges],
+                [end for _, end in ranges],
+                [path_style] * len(ranges),
+                [self.apply_patches] * len(ranges),
             )
+            # executor.map yields in submission order, which keeps document order
+            for idx, (blocks, patches) in enumerate(results, 1):
+                code_blocks.extend(blocks)
+                file_patches.extend(patches)
+                if self.update_progress:
+                    self.update_progress(int(idx * 100 / len(ranges)))
+                if not self._is_running:
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    break
+        return code_blocks, file_patches
 
-            match = class_pattern.search(content)
-            if not match:
-                print(f"Class {class_name} not found in {file_path}")
-                return False
+    def resolve_write_conflicts(self, code_blocks: List['CodeBlock']) -> List['CodeBlock']:
+        """
+        Keep only the last full-file block per output path (document order wins),
+        so each file is written once. Class/function update blocks are kept as-is.
+        """
+        last_index: Dict[str, int] = {}
+        for idx, block in enumerate(code_blocks):
+            if not block.update_class:
+                last_index[self._output_path(block.path)] = idx
+
+        resolved = []
+        for idx, block in enumerate(code_blocks):
+            if block.update_class or last_index[self._output_path(block.path)] == idx:
+                resolved.append(block)
+            else:
+                print(f"Superseded by a later block: {block.path}")
+        return resolved
+
+    def _output_path(self, block_path: str) -> str:
+        """Map a path from the markdown onto the output directory."""
+        relative_path = block_path.replace('\\', '/').replace('../', '').replace('./', '')
+        return os.path.join(self.output_dir, relative_path).replace('\\', '/')
+
+    def _is_inside_output_dir(self, full_path: str) -> bool:
+        """True if 'full_path', with links resolved, stays below the output directory."""
+        root = os.path.realpath(self.output_dir)
+        try:
+            return os.path.commonpath([root, os.path.realpath(full_path)]) == root
+        except ValueError:
+            # Different drives
+            return False
 
-            # Get the full match and its position
-            start = match.start()
-            end = match.end()
+    def _refuse_outside_output_dir(self, full_path: str) -> None:
+        print(f"Refused to touch {full_path}: outside the output directory {self.output_dir}")
+        if self.update_status:
+            self.update_status(f"Refused path outside the output directory: {full_path}")
+
+    def apply_file_patches(self, patches: List[FilePatch]) -> Tuple[int, int]:
+        """
+        Group diff patches per target file and apply each group with one read and
+        one write. Returns (patched_files, rejected_hunks). Targets that resolve
+        outside the output directory are refused and never read, written or deleted.
+        """
+        patches_by_file: Dict[str, List[FilePatch]] = {}
+        for patch in patches:
+            full_path = self._output_path(self._normalize_path(patch.path))
+            if not self._is_inside_output_dir(full_path):
+                self._refuse_outside_output_dir(full_path)
+                continue
+            patches_by_file.setdefault(full_path, []).append(patch)
+
+        patched_files = 0
+        rejected_hunks = 0
+        total_files = len(patches_by_file)
+        for idx, (full_path, file_patches) in enumerate(patches_by_file.items(), 1):
+            if not self._is_running:
+                break
+            try:
+                report = apply_patches_to_file(full_path, file_patches, max_fuzz=self.patch_max_fuzz)
+            except Exception as e:
+                print(f"Error applying patch to {full_path}: {str(e)}")
+                continue
 
-            # Print debug info
-            print(f"Found class {class_name} at position {start}-{end}")
-            print("Original content around match:")
-            context_before = content[max(0, start-50):start]
-            context_after = content[end:min(len(content), end+50)]
-            print(f"Before: {context_before}")
-            print(f"After: {context_after}")
+            if report.error:
+                print(report.error)
+            if report.applied or report.deleted:
+                patched_files += 1
+            if report.rejected:
+                rejected_hunks += len(report.rejected)
+                print(f"{len(report.rejected)} hunk(s) rejected for {full_path}, see {full_path}.rej")
+                if self.update_status:
+                    self.update_status(f"{len(report.rejected)} hunk(s) rejected for {os.path.basename(full_path)}")
+            print(f"Patched {full_path}: {report.applied} applied ({report.fuzzy} fuzzy), "
+                  f"{report.already_applied} already applied, {len(report.rejected)} rejected")
 
-            # Construct updated content
-            updated = content[:start] + new_content + content[end:]
+            if self.update_progress:
+                self.update_progress(int(idx * 100 / total_files))
 
-            # Write the updated content
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(updated)
+        return patched_files, rejected_hunks
 
-            print(f"Successfully updated class {class_name} in {file_path}")
-            return True
+    def update_class_in_file(self, file_path: str, class_name: str, new_content: str) -> bool:
+        """Update a specific class or function in a file while preserving all other content."""
+        return self.update_definitions_in_file(file_path, {class_name: new_content})
 
+    def update_definitions_in_file(self, file_path: str, updates: Dict[str, str]) -> bool:
+        """
+        Replace several classes/functions in one file. The file is parsed once with
+        'ast', every replacement is applied by exact line span and the file is written once.
+        """
+        try:
+            result = apply_definition_updates_to_file(file_path, updates)
         except Exception as e:
-            print(f"Error updating class {class_name} in {file_path}: {str(e)}")
+            print(f"Error updating definitions in {file_path}: {str(e)}")
             return False
 
+        if result.error:
+            print(result.error)
+        for name in result.missing:
+            print(f"Definition {name} not found in {file_path}")
+        for name in result.conflicts:
+            print(f"Skipped {name} in {file_path}: overlaps another update in the same batch")
+        if result.applied:
+            print(f"Successfully updated {', '.join(result.applied)} in {file_path}")
+        return result.ok
+
     def run(self) -> None:
         """Process the markdown content and create/update files."""
         try:
@@ -1077,23 +1376,37 @@ class ReverseMarkdownEx:
             if self.update_status:
                 self.update_status("Loading Markdown file...")
 
-            with open(self.markdown_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                print(f"3. Read {len(content)} bytes from file")
-
-            # Extract all code blocks
-            print("4. Extracting code blocks...")
-            code_blocks = self.extract_code_blocks(content)
-            print(f"5. Found {len(code_blocks)} code blocks")
+            # Blocks reference spans of this mapping and are decoded only when written
+            buffer = self._open_source_buffer()
+            file_size = len(buffer)
+            if file_size >= self.parallel_threshold and self.max_workers != 1:
+                print(f"3. Large bundle ({file_size} bytes), parsing in parallel")
+                if self.update_status:
+                    self.update_status("Parsing Markdown file in parallel...")
+                code_blocks, file_patches = self.parse_parallel()
+                for block in code_blocks:
+                    block.source = buffer
+            else:
+                print(f"3. Mapped {file_size} bytes from file")
+
+                # Extract all code blocks
+                print("4. Extracting code blocks...")
+                code_blocks = self.extract_code_blocks_from_buffer(buffer)
+                file_patches = self.extract_diff_blocks_from_buffer(buffer) if self.apply_patches else []
+
+            code_blocks = self.resolve_write_conflicts(code_blocks)
+            print(f"5. Found {len(code_blocks)} code blocks and {len(file_patches)} file patches")
             total_blocks = len(code_blocks)
 
-            if total_blocks == 0:
+            if total_blocks == 0 and not file_patches:
                 print("6. No code blocks found")
                 if self.update_status:
                     self.update_status("No valid code blocks found to extract.")
                 return
 
             processed_count = 0
+            # Class/function updates are collected per file and applied in one pass at the end
+            pending_updates: Dict[str, Dict[str, str]] = {}
             for idx, block in enumerate(code_blocks, 1):
                 if not self._is_running:
                     print("Process stopped by user")
@@ -1104,25 +1417,23 @@ class ReverseMarkdownEx:
                 try:
                     print(f"7. Processing block {idx}/{total_blocks}: {block.path}")
                     file_path = block.path
-                    relative_path = file_path.replace('\\', '/').replace('../', '').replace('./', '')
-                    full_path = os.path.join(self.output_dir, relative_path).replace('\\', '/')
+                    full_path = self._output_path(file_path)
+                    if not self._is_inside_output_dir(full_path):
+                        self._refuse_outside_output_dir(full_path)
+                        continue
                     
                     # Create directory
                     os.makedirs(os.path.dirname(full_path), exist_ok=True)
                     print(f"8. Created directory: {os.path.dirname(full_path)}")
 
                     if block.update_class:
-                        # Handle class update
-                        if os.path.exists(full_path):
-                            success = self.update_class_in_file(full_path, block.update_class, block.content)
-                            if success:
-                                processed_count += 1
+                        # Queue class/function update for the batched pass
+                        pending_updates.setdefault(full_path, {})[block.update_class] = block.content
                     else:
                         # Handle full file creation/update
                         print(f"9. Writing to file: {full_path}")
                         with open(full_path, 'w', encoding='utf-8') as out_file:
-                            cleaned_content = block.content.strip()
-                            out_file.write(cleaned_content)
+                            block.write_to(out_file)
                             processed_count += 1
                             print(f"10. Successfully wrote file {processed_count}")
 
@@ -1135,9 +1446,32 @@ class ReverseMarkdownEx:
                     print(f"Error processing file {file_path}: {str(e)}")
                     continue
 
+            rejected_hunks = 0
+            if file_patches and self._is_running:
+                if self.update_status:
+                    self.update_status(f"Applying {len(file_patches)} file patches...")
+                patched_files, rejected_hunks = self.apply_file_patches(file_patches)
+                processed_count += patched_files
+
+            for full_path, updates in pending_updates.items():
+                if not self._is_running:
+                    break
+                if not os.path.exists(full_path):
+                    print(f"File not found for update: {full_path}")
+                    continue
+                if self.update_status:
+                    self.update_status(f"Updating {len(updates)} definitions in {os.path.basename(full_path)}")
+                if self.update_definitions_in_file(full_path, updates):
+                    processed_count += 1
+
             print(f"12. Extraction complete. Processed {processed_count} files")
             if self.update_status and self._is_running:
-                if processed_count > 0:
+                if processed_count > 0 and rejected_hunks:
+                    self.update_status(
+                        f"Processed {processed_count} files in: {self.output_dir} "
+                        f"({rejected_hunks} rejected hunks written to .rej files)"
+                    )
+                elif processed_count > 0:
                     self.update_status(f"Successfully processed {processed_count} files in: {self.output_dir}")
                 else:
                     self.update_status("No files were processed.")
@@ -1147,14 +1481,54 @@ class ReverseMarkdownEx:
             if self.update_status:
                 self.update_status(f"Error during extraction: {str(e)}")
             raise
-
-
-def reverse_markdown_extraction(markdown_path: str, output_dir: str, settings_path: Optional[str] = None) -> None:
+        finally:
+            self._close_source_buffer()
+
+    def _open_source_buffer(self):
+        """Memory-map the markdown file read-only (empty files map to b'')."""
+        self._close_source_buffer()
+        with open(self.markdown_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                self._source_buffer = b''
+            else:
+                self._source_buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._source_buffer
+
+    def _close_source_buffer(self) -> None:
+        buffer = getattr(self, '_source_buffer', None)
+        if isinstance(buffer, mmap.mmap):
+            buffer.close()
+        self._source_buffer = None
+
+
+def _parse_markdown_range(markdown_path: str, start: int, end: int, path_style: str,
+                          apply_patches: bool) -> Tuple[List[CodeBlock], List[FilePatch]]:
+    """
+    Worker-process entry point: parse one byte range of a markdown bundle.
+    Blocks come back as absolute byte spans; the parent re-attaches its own mapping.
+    """
+    parser = ReverseMarkdownEx(markdown_path, os.path.dirname(markdown_path) or '.')
+    parser.settings['paths']['path_style'] = path_style
+    with open(markdown_path, 'rb') as f, \
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        code_blocks = parser.extract_code_blocks_from_buffer(buffer, start, end)
+        file_patches = parser.extract_diff_blocks_from_buffer(buffer, start, end) if apply_patches else []
+        for block in code_blocks:
+            block.source = None
+    return code_blocks, file_patches
+
+
+def reverse_markdown_extraction(markdown_path: str, output_dir: str, settings_path: Optional[str] = None,
+                                settings: Optional[SettingsSnapshot] = None) -> None:
     """Convenience function for reversing markdown -> files."""
-    extractor = ReverseMarkdownEx(markdown_path, output_dir, settings_path)
+    extractor = ReverseMarkdownEx(markdown_path, output_dir, settings_path, settings)
     extractor.run()
 
 class ReverseCSVEx:
+    # Column names written by CSVEx.save_to_excel
+    PATH_COLUMN = 'Path'
+    CODE_COLUMN = 'Code'
+
     def __init__(self, file_path, output_dir):
         self.file_path = file_path
         self.output_dir = os.path.normpath(output_dir).replace('\\', '/')
@@ -1166,42 +1540,143 @@ class ReverseCSVEx:
         """Stop the reverse extraction process gracefully."""
         self._is_running = False
 
-    def run(self):
-        """Reverse the CSV extraction process by recreating files from an Excel sheet."""
+    def iter_rows(self):
+        """
+        Stream (path, code, progress) tuples from the input file without loading it
+        whole. Supports .xlsx/.xlsm (read-only openpyxl), .csv and .jsonl/.ndjson;
+        other formats (e.g. legacy .xls) fall back to pandas. 'progress' is 0-100.
+        """
+        ext = os.path.splitext(self.file_path)[1].lower()
+        if ext in ('.xlsx', '.xlsm'):
+            try:
+                from openpyxl import load_workbook
+            except ImportError:
+                print("openpyxl not available, falling back to pandas")
+                return self._iter_pandas_rows()
+            return self._iter_xlsx_rows(load_workbook)
+        if ext == '.csv':
+            return self._iter_csv_rows()
+        if ext in ('.jsonl', '.ndjson'):
+            return self._iter_jsonl_rows()
+        return self._iter_pandas_rows()
+
+    def _column_indexes(self, header):
+        """Find the Path and Code columns in a header row."""
+        names = [str(name).strip() if name is not None else '' for name in header]
         try:
-            if self.update_status:
-                self.update_status("Loading Excel file...")
+            return names.index(self.PATH_COLUMN), names.index(self.CODE_COLUMN)
+        except ValueError:
+            raise ValueError(f"Expected '{self.PATH_COLUMN}' and '{self.CODE_COLUMN}' columns, found: {names}")
 
-            df = pd.read_excel(self.file_path)
-            total_files = len(df)
-
-            if total_files == 0:
-                if self.update_status:
-                    self.update_status("No records found in the Excel file.")
+    def _iter_xlsx_rows(self, load_workbook):
+        workbook = load_workbook(self.file_path, read_only=True, data_only=True)
+        try:
+            worksheet = workbook.worksheets[0]
+            rows = worksheet.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
                 return
+            path_idx, code_idx = self._column_indexes(header)
+            # max_row comes from the sheet's dimension record and may be missing
+            total_rows = (worksheet.max_row or 0) - 1
+            for row_number, row in enumerate(rows, 1):
+                progress = int(row_number * 100 / total_rows) if total_rows > 0 else None
+                yield row[path_idx], row[code_idx], progress
+        finally:
+            workbook.close()
+
+    def _iter_lines_with_progress(self):
+        """Yield (decoded_line, progress) from the input file read in binary mode."""
+        total_bytes = os.path.getsize(self.file_path) or 1
+        consumed = 0
+        with open(self.file_path, 'rb') as f:
+            for raw_line in f:
+                consumed += len(raw_line)
+                if consumed == len(raw_line) and raw_line.startswith(b'\xef\xbb\xbf'):
+                    raw_line = raw_line[3:]
+                yield raw_line.decode('utf-8'), int(consumed * 100 / total_bytes)
+
+    def _iter_csv_rows(self):
+        # Code cells can be far larger than the csv module's default field limit
+        field_limit = sys.maxsize
+        while True:
+            try:
+                csv.field_size_limit(field_limit)
+                break
+            except OverflowError:
+                field_limit //= 10
+
+        state = {'progress': 0}
+
+        def lines():
+            for line, progress in self._iter_lines_with_progress():
+                state['progress'] = progress
+                yield line
+
+        reader = csv.reader(lines())
+        header = next(reader, None)
+        if header is None:
+            return
+        path_idx, code_idx = self._column_indexes(header)
+        for row in reader:
+            if len(row) <= max(path_idx, code_idx):
+                continue
+            yield row[path_idx], row[code_idx], state['progress']
+
+    def _iter_jsonl_rows(self):
+        for line, progress in self._iter_lines_with_progress():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            yield record.get(self.PATH_COLUMN), record.get(self.CODE_COLUMN), progress
+
+    def _iter_pandas_rows(self):
+        df = pd.read_excel(self.file_path)
+        total_rows = len(df)
+        columns = list(df.columns)
+        path_idx, code_idx = self._column_indexes(columns)
+        for row_number, row in enumerate(df.itertuples(index=False, name=None), 1):
+            code = row[code_idx]
+            yield row[path_idx], None if pd.isna(code) else code, int(row_number * 100 / total_rows)
+
+    def run(self):
+        """Reverse the CSV extraction process by recreating files as rows are streamed in."""
+        try:
+            if self.update_status:
+                self.update_status("Reading input file...")
 
-            for idx, row in df.iterrows():
+            written = 0
+            for rel_path, code, progress in self.iter_rows():
                 if not self._is_running:
                     if self.update_status:
                         self.update_status("Reverse CSV extraction stopped by user.")
                     break
 
+                if not rel_path:
+                    continue
+
                 try:
-                    out_path = os.path.join(self.output_dir, row['Path'])
+                    out_path = os.path.join(self.output_dir, str(rel_path))
                     os.makedirs(os.path.dirname(out_path), exist_ok=True)
 
                     with open(out_path, 'w', encoding='utf-8') as f:
-                        f.write(row['Code'])
+                        f.write('' if code is None else str(code))
+                    written += 1
 
-                    if self.update_progress:
-                        self.update_progress(int((idx + 1) * 100 / total_files))
+                    if self.update_progress and progress is not None:
+                        self.update_progress(progress)
 
                 except Exception as e:
-                    print(f"Error processing file {row['Path']}: {str(e)}")
+                    print(f"Error processing file {rel_path}: {str(e)}")
                     if self.update_status:
-                        self.update_status(f"Error processing {row['Path']}: {str(e)}")
+                        self.update_status(f"Error processing {rel_path}: {str(e)}")
                     continue
 
+            if written == 0:
+                if self.update_status and self._is_running:
+                    self.update_status("No records found in the input file.")
+                return
+
             if self.update_status and self._is_running:
                 self.update_status(f"Files have been recreated in: {self.output_dir}")
 
@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+# file_catalog.py
+
+"""
+Persistent catalog of directory listings for one base directory.
+
+Every directory a walker lists is stored in SQLite together with its mtime.
+The next walk (in this session or a later one) stats the directory and reuses
+the stored names while the mtime is unchanged, so only directories that gained,
+lost or renamed entries are listed again. Only names and types are cached;
+file sizes and mtimes change without touching the directory and are always
+read from the file itself.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from gui import constants
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS directories (
+    rel_dir TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    files TEXT NOT NULL,
+    subdirs TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+# File names never contain NUL, so a directory's names are stored as one joined string
+_SEPARATOR = '\0'
+
+
+def _join(names: List[str]) -> str:
+    return _SEPARATOR.join(names)
+
+
+def _split(joined: str) -> List[str]:
+    return joined.split(_SEPARATOR) if joined else []
+
+
+class FileCatalog:
+    """Directory listings of one base directory, revalidated by directory mtime"""
+
+    # One catalog per database file and process, shared by all walkers
+    _instances: Dict[str, "FileCatalog"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, base_dir: str, db_path: str):
+        self.base_dir = os.path.abspath(base_dir)
+        self.db_path = os.path.abspath(db_path)
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        # rel_dir -> (mtime_ns, files, subdirs) listed since the last flush
+        self._pending: Dict[str, Tuple[int, List[str], List[str]]] = {}
+        self.hits = 0
+        self.misses = 0
+
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'base_dir'").fetchone()
+        if row is None:
+            self._conn.execute("INSERT INTO meta (key, value) VALUES ('base_dir', ?)", (self.base_dir,))
+        elif row[0] != self.base_dir:
+            # Digest collision or a moved database: never mix two trees
+            self._conn.execute("DELETE FROM directories")
+            self._conn.execute("UPDATE meta SET value = ? WHERE key = 'base_dir'", (self.base_dir,))
+
+    @classmethod
+    def open(cls, base_dir: str, catalog_dir: str) -> "FileCatalog":
+        """Return the shared catalog of 'base_dir', stored in 'catalog_dir'."""
+        base_dir = os.path.abspath(base_dir)
+        digest = hashlib.blake2b(os.path.normcase(base_dir).encode('utf-8'), digest_size=12).hexdigest()
+        db_path = os.path.join(catalog_dir, f"{digest}.db")
+        key = os.path.normcase(os.path.abspath(db_path))
+        with cls._instances_lock:
+            catalog = cls._instances.get(key)
+            if catalog is None:
+                catalog = cls(base_dir, db_path)
+                cls._instances[key] = catalog
+            return catalog
+
+    @classmethod
+    def for_settings(cls, settings, base_dir: str) -> Optional["FileCatalog"]:
+        """
+        The catalog for 'base_dir' next to the settings file, or None if the
+        catalog is disabled (directories.use_file_catalog) or the settings have no path.
+        """
+        settings_path = getattr(settings, 'settings_path', None)
+        directories = settings.get('directories', {}) or {}
+        if not base_dir or not settings_path or not directories.get('use_file_catalog', constants.USE_FILE_CATALOG):
+            return None
+        catalog_dir = os.path.join(os.path.dirname(os.path.abspath(settings_path)), constants.FILE_CATALOG_DIR)
+        try:
+            return cls.open(base_dir, catalog_dir)
+        except (OSError, sqlite3.Error) as e:
+            print(f"Error opening file catalog: {e}")
+            return None
+
+    def relative(self, directory: str) -> Optional[str]:
+        """'directory' relative to the base directory ('/' separated), None if outside it."""
+        try:
+            rel_dir = os.path.relpath(os.path.abspath(directory), self.base_dir)
+        except ValueError:
+            return None
+        if rel_dir == '.':
+            return ''
+        if rel_dir.startswith('..'):
+            return None
+        return rel_dir.replace('\\', '/')
+
+    def listdir(self, directory: str) -> Tuple[List[str], List[str]]:
+        """Return (file names, subdirectory names) of 'directory', sorted; [] if unreadable."""
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+        except OSError:
+            return [], []
+        rel_dir = self.relative(directory)
+        row = None
+
+        if rel_dir is not None:
+            with self._lock:
+                pending = self._pending.get(rel_dir)
+                if pending is not None and pending[0] == mtime:
+                    self.hits += 1
+                    return pending[1], pending[2]
+                row = self._conn.execute(
+                    "SELECT mtime_ns, files, subdirs FROM directories WHERE rel_dir = ?", (rel_dir,)
+                ).fetchone()
+            if row is not None and row[0] == mtime:
+                self.hits += 1
+                return _split(row[1]), _split(row[2])
+
+        files, dirs = [], []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            dirs.append(entry.name)
+                        elif entry.is_file():
+                            files.append(entry.name)
+                    except OSError:
+                        continue
+        except OSError:
+            return [], []
+        files.sort()
+        dirs.sort()
+        if rel_dir is not None:
+            # Subdirectories that disappeared take their stored listings with them
+            for name in set(_split(row[2]) if row is not None else ()) - set(dirs):
+                self.forget(f"{rel_dir}/{name}" if rel_dir else name)
+            with self._lock:
+                self.misses += 1
+                self._pending[rel_dir] = (mtime, files, dirs)
+                if len(self._pending) >= constants.FILE_CATALOG_FLUSH_SIZE:
+                    self._flush_locked()
+        return files, dirs
+
+    def flush(self) -> None:
+        """Write listings gathered since the last flush in one transaction."""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        try:
+            # The connection autocommits, so one explicit transaction for the batch
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO directories (rel_dir, mtime_ns, files, subdirs) VALUES (?, ?, ?, ?)",
+                    [(rel_dir, mtime, _join(files), _join(dirs)) for rel_dir, (mtime, files, dirs) in pending.items()]
+                )
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            print(f"Error writing file catalog: {e}")
+
+    def forget(self, rel_dir: str) -> None:
+        """Drop 'rel_dir' and everything below it (e.g. after deleting a folder)."""
+        rel_dir = rel_dir.strip('/')
+        with self._lock:
+            for key in [key for key in self._pending if key == rel_dir or key.startswith(f"{rel_dir}/") or not rel_dir]:
+                del self._pending[key]
+            if rel_dir:
+                # Children sort between 'dir/' and 'dir0' ('0' follows '/')
+                self._conn.execute(
+                    "DELETE FROM directories WHERE rel_dir = ? OR (rel_dir >= ? AND rel_dir < ?)",
+                    (rel_dir, f"{rel_dir}/", f"{rel_dir}0")
+                )
+            else:
+                self._conn.execute("DELETE FROM directories")
+
+    def stats(self) -> str:
+        return f"{self.hits} directories from catalog, {self.misses} listed"
+
+
+__all__ = [
+    "FileCatalog",
+]
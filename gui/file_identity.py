@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+# file_identity.py
+
+"""
+Physical file identity for de-duplicating collected paths.
+
+The same file can be reached through a symlinked directory, a hardlink or an
+absolute and a relative spelling of one preset entry. Paths are keyed by
+(st_dev, st_ino) from the stat the extractor needs anyway, so each physical
+file is read once; later paths are reported as duplicates of the first one.
+"""
+
+import os
+from typing import Callable, Dict, Hashable, Iterable, List, NamedTuple, Optional
+
+from gui import constants
+
+DUPLICATES_SKIP = "skip"
+DUPLICATES_REFERENCE = "reference"
+DUPLICATE_POLICIES = (DUPLICATES_SKIP, DUPLICATES_REFERENCE)
+
+
+def file_key(path: str, stat: os.stat_result) -> Hashable:
+    """(st_dev, st_ino), or the resolved path where the filesystem reports no inode numbers."""
+    if stat.st_ino:
+        return stat.st_dev, stat.st_ino
+    return os.path.normcase(os.path.realpath(path))
+
+
+class DedupResult(NamedTuple):
+    paths: List[str]                            # input order, repeated identical strings dropped
+    duplicates: Dict[str, str]                  # later path -> first path of the same file
+    stats: Dict[str, Optional[os.stat_result]]  # stat per path (None: missing or not a regular file)
+
+
+def find_duplicate_files(paths: Iterable[str],
+                         stat_func: Callable[[str], Optional[os.stat_result]]) -> DedupResult:
+    """
+    Stat every path once with 'stat_func' (which returns None for anything not
+    to be read) and map paths of an already-seen file to their first path.
+    """
+    ordered: List[str] = []
+    duplicates: Dict[str, str] = {}
+    stats: Dict[str, Optional[os.stat_result]] = {}
+    first_by_key: Dict[Hashable, str] = {}
+    for path in paths:
+        if path in stats:
+            continue
+        stat = stat_func(path)
+        stats[path] = stat
+        ordered.append(path)
+        if stat is None:
+            continue
+        key = file_key(path, stat)
+        first = first_by_key.setdefault(key, path)
+        if first != path:
+            duplicates[path] = first
+    return DedupResult(ordered, duplicates, stats)
+
+
+def duplicate_policy(settings) -> str:
+    """files.duplicate_files from a settings mapping ('reference' or 'skip')."""
+    files = settings.get('files', {}) or {}
+    policy = str(files.get('duplicate_files', constants.DUPLICATE_FILES_POLICY)).lower()
+    if policy not in DUPLICATE_POLICIES:
+        print(f"Unknown duplicate_files '{policy}', using '{constants.DUPLICATE_FILES_POLICY}'")
+        policy = constants.DUPLICATE_FILES_POLICY
+    return policy
+
+
+__all__ = [
+    "DUPLICATES_SKIP",
+    "DUPLICATES_REFERENCE",
+    "file_key",
+    "DedupResult",
+    "find_duplicate_files",
+    "duplicate_policy",
+]
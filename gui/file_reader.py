@@ -0,0 +1,371 @@
+# -*- coding: utf-8 -*-
+# file_reader.py
+
+"""
+Guarded text reads for the extractors.
+
+Before a file is opened it is stat'ed: anything that is not a regular file
+(FIFO, socket, device) is skipped, because open() on it can block forever.
+Files above the size threshold follow the large-file policy:
+    skip        leave the body out
+    truncate    keep the first and last part with an omission marker
+    stream      emit the whole file in chunks (never held in memory at once);
+                callers that need one string get the truncated form instead
+With a read timeout, reads run on daemon reader threads so a hung network
+share costs at most the timeout per read instead of stalling the run.
+
+Text is decoded as UTF-8 with undecodable bytes dropped and newlines
+translated, the same as open(path, 'r', encoding='utf-8', errors='ignore').
+With passthrough, a file that is valid UTF-8 without '\r' (so decoding would
+not change a byte) is only validated; copy_to() later copies its bytes into
+the output file with copy_file_range/sendfile instead of decoding them.
+"""
+
+import codecs
+import errno
+import io
+import os
+import queue
+import stat as stat_module
+import sys
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator, List, Mapping, NamedTuple, Optional, Tuple
+
+from gui import constants
+
+POLICY_SKIP = "skip"
+POLICY_TRUNCATE = "truncate"
+POLICY_STREAM = "stream"
+LARGE_FILE_POLICIES = (POLICY_SKIP, POLICY_TRUNCATE, POLICY_STREAM)
+
+# ReadResult.status values
+READ_OK = "ok"
+READ_TRUNCATED = "truncated"
+READ_PASSTHROUGH = "passthrough"
+READ_STREAMED = "streamed"
+READ_SKIPPED_LARGE = "skipped_large"
+READ_SKIPPED_SPECIAL = "skipped_special"
+READ_TIMEOUT = "timeout"
+READ_ERROR = "error"
+
+
+class ReadTimeout(Exception):
+    pass
+
+
+class ReadResult(NamedTuple):
+    text: str
+    status: str
+    size: int
+    lines: int = -1  # newline count of a READ_PASSTHROUGH / READ_STREAMED body (which has no text)
+
+    @property
+    def has_text(self) -> bool:
+        return self.status in (READ_OK, READ_TRUNCATED)
+
+
+@dataclass(frozen=True)
+class ReadPolicy:
+    max_size: int = constants.LARGE_FILE_THRESHOLD_KB * 1024
+    large_file_policy: str = constants.LARGE_FILE_POLICY
+    head_size: int = constants.TRUNCATE_HEAD_KB * 1024
+    tail_size: int = constants.TRUNCATE_TAIL_KB * 1024
+    read_timeout: float = constants.READ_TIMEOUT_SECONDS
+    chunk_size: int = constants.READ_CHUNK_SIZE
+
+    @classmethod
+    def from_settings(cls, settings: Mapping[str, Any]) -> "ReadPolicy":
+        """Policy from the [files] section (large_file_threshold_kb, large_file_policy, read_timeout)."""
+        files = settings.get('files', {}) or {}
+        policy = str(files.get('large_file_policy', constants.LARGE_FILE_POLICY)).lower()
+        if policy not in LARGE_FILE_POLICIES:
+            print(f"Unknown large_file_policy '{policy}', using '{constants.LARGE_FILE_POLICY}'")
+            policy = constants.LARGE_FILE_POLICY
+        return cls(
+            max_size=int(files.get('large_file_threshold_kb', constants.LARGE_FILE_THRESHOLD_KB)) * 1024,
+            large_file_policy=policy,
+            read_timeout=float(files.get('read_timeout', constants.READ_TIMEOUT_SECONDS)),
+        )
+
+
+class _ReaderThreads:
+    """Daemon threads that run blocking reads; a read stuck past its timeout keeps its thread"""
+
+    def __init__(self):
+        self._tasks: "queue.Queue" = queue.Queue()
+        self._lock = threading.Lock()
+        self._threads = 0
+        self._busy = 0
+
+    def _worker(self):
+        while True:
+            func, box, done = self._tasks.get()
+            try:
+                box.append((True, func()))
+            except BaseException as e:
+                box.append((False, e))
+            with self._lock:
+                self._busy -= 1
+            done.set()
+
+    def run(self, func: Callable[[], Any], timeout: float) -> Any:
+        box: list = []
+        done = threading.Event()
+        with self._lock:
+            self._busy += 1
+            # Never queue behind a stuck read: add a thread whenever all are busy
+            if self._busy > self._threads:
+                self._threads += 1
+                threading.Thread(target=self._worker, name="file-reader", daemon=True).start()
+        self._tasks.put((func, box, done))
+        if not done.wait(timeout):
+            raise ReadTimeout(f"read timed out after {timeout:g}s")
+        ok, value = box[0]
+        if not ok:
+            raise value
+        return value
+
+
+_reader_threads = _ReaderThreads()
+
+
+def _decode(data: bytes) -> str:
+    text = data.decode('utf-8', errors='ignore')
+    return text.replace('\r\n', '\n').replace('\r', '\n') if '\r' in text else text
+
+
+# copy_file_range/sendfile errors meaning "not for these files", not a failed read
+_COPY_UNSUPPORTED = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EBADF,
+                     getattr(errno, 'EOPNOTSUPP', errno.EINVAL), getattr(errno, 'ENOTSUP', errno.EINVAL)}
+
+
+def _copy_fd(src_fd: int, out_fd: int, size: int, chunk_size: int) -> int:
+    """Copy 'size' bytes from the start of src_fd to out_fd's position; returns the bytes copied."""
+    copied = 0
+    if hasattr(os, 'copy_file_range'):
+        try:
+            while copied < size:
+                n = os.copy_file_range(src_fd, out_fd, size - copied, copied)
+                if not n:
+                    return copied
+                copied += n
+            return copied
+        except OSError as e:
+            if e.errno not in _COPY_UNSUPPORTED:
+                raise
+    if hasattr(os, 'sendfile') and sys.platform.startswith('linux'):
+        try:
+            while copied < size:
+                n = os.sendfile(out_fd, src_fd, copied, size - copied)
+                if not n:
+                    return copied
+                copied += n
+            return copied
+        except OSError as e:
+            if e.errno not in _COPY_UNSUPPORTED:
+                raise
+    os.lseek(src_fd, copied, os.SEEK_SET)
+    while copied < size:
+        chunk = os.read(src_fd, min(chunk_size, size - copied))
+        if not chunk:
+            break
+        view = memoryview(chunk)
+        while view:
+            view = view[os.write(out_fd, view):]
+        copied += len(chunk)
+    return copied
+
+
+class FileReader:
+    """Reads text files under a ReadPolicy; counts outcomes for the run summary"""
+
+    def __init__(self, policy: Optional[ReadPolicy] = None):
+        self.policy = policy or ReadPolicy()
+        self.counts = {}
+
+    def _count(self, status: str) -> None:
+        self.counts[status] = self.counts.get(status, 0) + 1
+
+    def _call(self, func: Callable[[], Any]) -> Any:
+        if self.policy.read_timeout > 0:
+            return _reader_threads.run(func, self.policy.read_timeout)
+        return func()
+
+    def check(self, file_path: str, stat: Optional[os.stat_result] = None) -> Optional[os.stat_result]:
+        """Stat 'file_path' (with the timeout); None unless it is a regular file."""
+        try:
+            stat = stat or self._call(lambda: os.stat(file_path))
+        except (OSError, ReadTimeout) as e:
+            print(f"Error reading file {file_path}: {e}")
+            return None
+        return stat if stat_module.S_ISREG(stat.st_mode) else None
+
+    def read_text(self, file_path: str, stat: Optional[os.stat_result] = None,
+                  size: Optional[int] = None, passthrough: bool = False,
+                  streaming: bool = False) -> ReadResult:
+        """
+        Read 'file_path' as text under the policy; the status says what happened.
+        Pass 'size' only for files already known to be regular (e.g. from a walk).
+        With 'passthrough', files that decode to exactly their bytes come back as
+        READ_PASSTHROUGH with a line count instead of text; see copy_to().
+        With 'streaming', large files under the "stream" policy come back as
+        READ_STREAMED with a line count; the caller writes them with iter_text().
+        Without it they are truncated, since the whole text would not fit the policy.
+        """
+        if stat is None and size is not None:
+            return self._read_regular(file_path, size, passthrough, streaming)
+        try:
+            stat = stat or self._call(lambda: os.stat(file_path))
+        except ReadTimeout as e:
+            print(f"Error reading file {file_path}: {e}")
+            self._count(READ_TIMEOUT)
+            return ReadResult("", READ_TIMEOUT, 0)
+        except OSError as e:
+            print(f"Error reading file {file_path}: {e}")
+            self._count(READ_ERROR)
+            return ReadResult("", READ_ERROR, 0)
+        if not stat_module.S_ISREG(stat.st_mode):
+            self._count(READ_SKIPPED_SPECIAL)
+            return ReadResult("", READ_SKIPPED_SPECIAL, 0)
+        return self._read_regular(file_path, stat.st_size, passthrough, streaming)
+
+    def _read_regular(self, file_path: str, size: int, passthrough: bool = False,
+                      streaming: bool = False) -> ReadResult:
+        policy = self.policy
+        try:
+            lines = None
+            if passthrough and (size <= policy.max_size or streaming and policy.large_file_policy == POLICY_STREAM):
+                lines = self._scan_passthrough(file_path)
+            if lines is not None:
+                result = ReadResult("", READ_PASSTHROUGH, size, lines)
+            elif size <= policy.max_size:
+                result = ReadResult(self._read_all(file_path), READ_OK, size)
+            elif policy.large_file_policy == POLICY_SKIP:
+                result = ReadResult("", READ_SKIPPED_LARGE, size)
+            elif policy.large_file_policy == POLICY_STREAM and streaming:
+                lines = sum(chunk.count('\n') for chunk in self.iter_text(file_path))
+                result = ReadResult("", READ_STREAMED, size, lines)
+            else:
+                result = ReadResult(self._read_head_tail(file_path, size), READ_TRUNCATED, size)
+        except ReadTimeout as e:
+            print(f"Error reading file {file_path}: {e}")
+            result = ReadResult("", READ_TIMEOUT, size)
+        except OSError as e:
+            print(f"Error reading file {file_path}: {e}")
+            result = ReadResult("", READ_ERROR, size)
+        self._count(result.status)
+        return result
+
+    def _scan_passthrough(self, file_path: str) -> Optional[int]:
+        """Newline count if the file is strict UTF-8 without '\\r', else None."""
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        lines = 0
+        with self._call(lambda: open(file_path, 'rb')) as f:
+            while True:
+                chunk = self._call(lambda: f.read(self.policy.chunk_size))
+                if not chunk:
+                    break
+                if b'\r' in chunk:
+                    return None
+                try:
+                    # ASCII needs no decoding unless a multi-byte character spans the chunk boundary
+                    if not chunk.isascii() or decoder.getstate()[0]:
+                        decoder.decode(chunk)
+                except UnicodeDecodeError:
+                    return None
+                lines += chunk.count(b'\n')
+        try:
+            decoder.decode(b'', final=True)
+        except UnicodeDecodeError:
+            return None
+        return lines
+
+    def copy_to(self, file_path: str, size: int, out_fd: int) -> int:
+        """
+        Copy the first 'size' bytes of a READ_PASSTHROUGH file to the current
+        position of 'out_fd' (kernel-side where possible); returns bytes copied.
+        There is no timeout: a copy abandoned midway would keep writing into the
+        output, and the bytes were just read for validation, so they are cached.
+        """
+        src_fd = os.open(file_path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+        try:
+            return _copy_fd(src_fd, out_fd, size, self.policy.chunk_size)
+        finally:
+            os.close(src_fd)
+
+    def _read_all(self, file_path: str) -> str:
+        def read():
+            with open(file_path, 'rb') as f:
+                return f.read()
+        return _decode(self._call(read))
+
+    def head_tail_sizes(self) -> Tuple[int, int]:
+        """Bytes kept from the start and the end of a truncated file."""
+        head_size, tail_size = self.policy.head_size, self.policy.tail_size
+        keep = head_size + tail_size
+        if keep > self.policy.max_size:
+            # Never keep more than the threshold itself; split it in the same proportion
+            head_size = self.policy.max_size * head_size // keep
+            tail_size = self.policy.max_size - head_size
+        return head_size, tail_size
+
+    def read_ranges(self, size: int) -> List[Tuple[int, int]]:
+        """(offset, length) ranges read_text will read from a regular file of 'size' bytes."""
+        if size <= self.policy.max_size or self.policy.large_file_policy == POLICY_STREAM:
+            return [(0, size)] if size else []
+        if self.policy.large_file_policy == POLICY_SKIP:
+            return []
+        head_size, tail_size = self.head_tail_sizes()
+        tail_start = max(size - tail_size, head_size)
+        return [(0, head_size), (tail_start, size - tail_start)]
+
+    def _read_head_tail(self, file_path: str, size: int) -> str:
+        head_size, tail_size = self.head_tail_sizes()
+
+        def read():
+            with open(file_path, 'rb') as f:
+                head = f.read(head_size)
+                f.seek(max(size - tail_size, head_size))
+                return head, f.read(tail_size)
+
+        head, tail = self._call(read)
+        omitted = size - len(head) - len(tail)
+        return (f"{_decode(head)}\n\n... [{omitted} bytes omitted from a {size} byte file] ...\n\n"
+                f"{_decode(tail)}")
+
+    def iter_text(self, file_path: str) -> Iterator[str]:
+        """Decoded text of the whole file, one chunk at a time (each read under the timeout)."""
+        # Incremental decoding keeps multi-byte characters and '\r\n' intact across chunks
+        decoder = io.IncrementalNewlineDecoder(codecs.getincrementaldecoder('utf-8')(errors='ignore'), True)
+        with self._call(lambda: open(file_path, 'rb')) as f:
+            while True:
+                chunk = self._call(lambda: f.read(self.policy.chunk_size))
+                if not chunk:
+                    break
+                text = decoder.decode(chunk)
+                if text:
+                    yield text
+        text = decoder.decode(b'', final=True)
+        if text:
+            yield text
+
+    def stats(self) -> str:
+        return ", ".join(f"{count} {status}" for status, count in sorted(self.counts.items())) or "no reads"
+
+
+__all__ = [
+    "LARGE_FILE_POLICIES",
+    "READ_OK",
+    "READ_TRUNCATED",
+    "READ_PASSTHROUGH",
+    "READ_STREAMED",
+    "READ_SKIPPED_LARGE",
+    "READ_SKIPPED_SPECIAL",
+    "READ_TIMEOUT",
+    "READ_ERROR",
+    "ReadTimeout",
+    "ReadResult",
+    "ReadPolicy",
+    "FileReader",
+]
@@ -4,12 +4,16 @@
 import os
 from PySide6.QtWidgets import (
     QFrame, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, 
-    QListWidget, QComboBox, QMessageBox, QFileDialog,
+    QListView, QLineEdit, QComboBox, QMessageBox, QFileDialog,
     QInputDialog
 )
 from PySide6.QtCore import Signal, Qt
 
 from gui.theme_manager import ThemeManager, Fonts, ThemeColors
+from gui.preset_list_model import PresetListModel
+from gui.file_catalog import FileCatalog
+from gui.ignore_rules import IgnoreRules
+from gui.scan_worker import ScanWorker
 from gui import constants
 
 class FileSpecificFrame(QFrame):
@@ -21,6 +25,12 @@ class FileSpecificFrame(QFrame):
     
     def __init__(self, settings_manager, parent=None):
         super().__init__(parent)
+        # Background scan for Add Folder / Auto Preset (one at a time)
+        self.scan_worker = None
+        self._scan_button = None
+        self._scan_button_text = ""
+        self._scan_preset = ""
+        self._scan_presets = {}
         self.settings_manager = settings_manager
         self.setup_ui()
         self.setup_connections()
@@ -43,8 +53,18 @@ class FileSpecificFrame(QFrame):
         
         # File List
         self.layout.addWidget(QLabel("File List:"))
-        self.file_listbox = QListWidget()
-        self.file_listbox.setSelectionMode(QListWidget.SelectionMode.ExtendedSelection)
+        self.file_filter = QLineEdit()
+        self.file_filter.setPlaceholderText("Filter files...")
+        self.file_filter.setClearButtonEnabled(True)
+        self.layout.addWidget(self.file_filter)
+        
+        # Model/view list: rows are fetched lazily, no widget item per file
+        self.file_model = PresetListModel(self)
+        self.file_listbox = QListView()
+        self.file_listbox.setModel(self.file_model)
+        self.file_listbox.setUniformItemSizes(True)
+        self.file_listbox.setLayoutMode(QListView.LayoutMode.Batched)
+        self.file_listbox.setSelectionMode(QListView.SelectionMode.ExtendedSelection)
         # Set a minimum height to prevent excessive squeezing
         self.file_listbox.setMinimumHeight(constants.FILE_LIST_MIN_HEIGHT)
         self.layout.addWidget(self.file_listbox)
@@ -58,11 +78,23 @@ class FileSpecificFrame(QFrame):
         self.add_folder_button = QPushButton("Add Folder")
         self.add_folder_button.setStyleSheet(ThemeManager.get_secondary_button_stylesheet())
         
+        self.remove_folder_button = QPushButton("Remove Folder")
+        self.remove_folder_button.setStyleSheet(ThemeManager.get_secondary_button_stylesheet())
+        
+        self.add_pattern_button = QPushButton("Add Pattern")
+        self.add_pattern_button.setToolTip(
+            "Glob (src/**/*.py), directory (gui/) or exclusion (!**/test_*.py),\n"
+            "resolved against the working directory at extraction time"
+        )
+        self.add_pattern_button.setStyleSheet(ThemeManager.get_secondary_button_stylesheet())
+        
         self.choose_output_button = QPushButton("Choose Output Directory")
         self.choose_output_button.setStyleSheet(ThemeManager.get_secondary_button_stylesheet())
         
         self.file_buttons_layout.addWidget(self.add_file_button)
         self.file_buttons_layout.addWidget(self.add_folder_button)
+        self.file_buttons_layout.addWidget(self.remove_folder_button)
+        self.file_buttons_layout.addWidget(self.add_pattern_button)
         
         self.layout.addLayout(self.file_buttons_layout)
         self.layout.addWidget(self.choose_output_button)
@@ -99,6 +131,8 @@ class FileSpecificFrame(QFrame):
         # File buttons
         self.add_file_button.clicked.connect(self.add_files)
         self.add_folder_button.clicked.connect(self.add_folder)
+        self.remove_folder_button.clicked.connect(self.remove_folder)
+        self.add_pattern_button.clicked.connect(self.add_pattern)
         self.choose_output_button.clicked.connect(self.choose_output_directory)
         
         # Preset controls
@@ -109,6 +143,7 @@ class FileSpecificFrame(QFrame):
         
         # File list events
         self.file_listbox.keyPressEvent = self.handle_key_press
+        self.file_filter.textChanged.connect(self.file_model.set_filter)
     
     def load_presets(self):
         """Load presets from settings with improved error handling"""
@@ -148,12 +183,9 @@ class FileSpecificFrame(QFrame):
             return
         
         try:
-            # Clear existing items
-            self.file_listbox.clear()
-            
             # Get files for preset
             preset_files = self.settings_manager.get_setting("presets", preset_name, [])
-            print(f"Loaded preset '{preset_name}' files: {preset_files}")
+            print(f"Loaded preset '{preset_name}': {len(preset_files)} files")
             
             # Check if preset_files is actually the preset name split into characters
             if preset_files == list(preset_name):
@@ -168,8 +200,8 @@ class FileSpecificFrame(QFrame):
                 else:
                     preset_files = []
             
-            # Add files to list
-            self.file_listbox.addItems(preset_files)
+            # Replace the list in one model reset
+            self.file_model.set_files(preset_files)
             
             # Emit signal with preset files
             self.preset_changed.emit(preset_name, preset_files)
@@ -203,7 +235,10 @@ class FileSpecificFrame(QFrame):
             self._add_files_to_preset(files)
     
     def add_folder(self):
-        """Open directory dialog to add all files in a folder to the preset"""
+        """Open directory dialog to add all files in a folder to the preset (scanned in the background)"""
+        if self._cancel_running_scan():
+            return
+        
         preset_name = self.preset_combo.currentText()
         if not preset_name:
             QMessageBox.warning(
@@ -222,30 +257,141 @@ class FileSpecificFrame(QFrame):
         )
         
         if folder:
-            files = []
-            for root, _, filenames in os.walk(folder):
-                for filename in filenames:
-                    files.append(os.path.join(root, filename))
-            
-            if files:
-                self._add_files_to_preset(files)
+            self._scan_preset = preset_name
+            worker = self._create_scan_worker(folder, base_dir or folder, ScanWorker.MODE_FILES)
+            worker.files_found.connect(self._handle_scanned_files)
+            worker.scan_finished.connect(self._handle_folder_scan_finished)
+            self._start_scan(worker, self.add_folder_button)
     
-    def _add_files_to_preset(self, files):
-        """Helper method to add files to the current preset with better path handling"""
+    def _create_scan_worker(self, root, base_dir, mode, extra_ignored_directories=(), skip_hidden_files=False):
+        """Scan worker honoring the ignore rules from settings"""
+        settings = self.settings_manager.snapshot()
+        # Rules are anchored at the project base, like in the extractors, even when a subfolder is scanned
+        rules_base = base_dir if base_dir and self._is_below(root, base_dir) else root
+        rules = IgnoreRules.from_settings(
+            settings,
+            base_dir=rules_base,
+            extra_directories=extra_ignored_directories,
+            skip_hidden_files=skip_hidden_files
+        )
+        catalog = FileCatalog.for_settings(settings, base_dir)
+        follow_symlinks = settings.get('directories', {}).get('follow_symlinks', constants.FOLLOW_SYMLINKS)
+        return ScanWorker(root, base_dir, mode, rules=rules, catalog=catalog,
+                          follow_symlinks=bool(follow_symlinks))
+    
+    @staticmethod
+    def _is_below(path, directory):
+        """True if 'path' is 'directory' or inside it"""
+        try:
+            rel = os.path.relpath(path, directory)
+        except ValueError:
+            # Different drives
+            return False
+        return not (rel == '..' or rel.startswith('..' + os.sep) or os.path.isabs(rel))
+
+    def _start_scan(self, worker, button):
+        """Run a scan worker; its button turns into a cancel button until the scan ends"""
+        self.scan_worker = worker
+        self._scan_button = button
+        self._scan_button_text = button.text()
+        button.setText("Cancel Scan")
+        worker.scan_error.connect(self._handle_scan_error)
+        worker.start()
+    
+    def _cancel_running_scan(self):
+        """Cancel a running scan. Returns True if one was running."""
+        if self.scan_worker and self.scan_worker.isRunning():
+            self.scan_worker.stop()
+            return True
+        return False
+    
+    def _end_scan(self):
+        if self._scan_button:
+            self._scan_button.setText(self._scan_button_text)
+        self._scan_button = None
+        self.scan_worker = None
+    
+    def _handle_scanned_files(self, files):
+        """Add one streamed batch of scanned files to the preset being scanned into"""
+        added = self.settings_manager.add_preset_files(self._scan_preset, files)
+        if added and self.preset_combo.currentText() == self._scan_preset:
+            self.file_model.append_files(added)
+        if added:
+            self.files_added.emit(added)
+    
+    def _handle_folder_scan_finished(self, cancelled):
+        self._end_scan()
+        preset_name = self._scan_preset
+        if self.preset_combo.currentText() == preset_name:
+            self.preset_changed.emit(preset_name, self.settings_manager.get_preset_files(preset_name))
+        if cancelled:
+            print(f"Folder scan cancelled; files found so far were added to '{preset_name}'")
+    
+    def _handle_scan_error(self, error_message):
+        self._end_scan()
+        QMessageBox.critical(
+            self,
+            "Scan Error",
+            f"An error occurred while scanning: {error_message}"
+        )
+    
+    def remove_folder(self):
+        """Remove every file below a chosen folder from the current preset"""
         preset_name = self.preset_combo.currentText()
+        if not preset_name:
+            return
+        
         base_dir = self.settings_manager.get_setting("paths", "base_dir", "")
-        preset_files = self.settings_manager.get_setting("presets", preset_name, [])
+        folder = QFileDialog.getExistingDirectory(
+            self,
+            "Select Folder to Remove",
+            base_dir
+        )
+        if not folder:
+            return
         
-        # Ensure preset_files is a list
-        if not isinstance(preset_files, list):
-            preset_files = []
+        folder = os.path.normpath(folder)
+        if base_dir and os.path.commonpath([os.path.normpath(base_dir), folder]) == os.path.normpath(base_dir):
+            folder = os.path.relpath(folder, base_dir)
+        folder = folder.replace('\\', '/')
         
-        # Check if preset_files equals the preset name split into characters
-        if preset_files == list(preset_name):
-            print(f"ERROR: preset_files equals preset name characters: {preset_files}")
-            preset_files = []
+        # One prefix removal in the preset trie and the store
+        if self.settings_manager.remove_preset_folder(preset_name, folder):
+            self.load_preset_files(preset_name)
+    
+    def add_pattern(self):
+        """Add a glob, directory reference or exclusion entry to the current preset"""
+        preset_name = self.preset_combo.currentText()
+        if not preset_name:
+            QMessageBox.warning(
+                self,
+                "No Preset Selected",
+                "Please select a preset to add files to."
+            )
+            return
+        
+        pattern, ok = QInputDialog.getText(
+            self,
+            "Add Pattern",
+            "Pattern relative to the working directory\n"
+            "(e.g. src/**/*.py, gui/ or !**/test_*.py):"
+        )
+        pattern = pattern.strip().replace('\\', '/') if ok else ""
+        if not pattern:
+            return
+        
+        added = self.settings_manager.add_preset_files(preset_name, [pattern])
+        if added:
+            self.file_model.append_files(added)
+            self.preset_changed.emit(preset_name, self.settings_manager.get_preset_files(preset_name))
+    
+    def _add_files_to_preset(self, files):
+        """Helper method to add files to the current preset with better path handling"""
+        preset_name = self.preset_combo.currentText()
+        base_dir = self.settings_manager.get_setting("paths", "base_dir", "")
+        base_dir = os.path.normpath(base_dir) if base_dir else ""
         
-        added_files = []
+        relative_paths = []
         
         for file_path in files:
             try:
@@ -261,20 +407,19 @@ class FileSpecificFrame(QFrame):
                 
                 # Normalize for platform consistency
                 relative_path = relative_path.replace('\\', '/')
-                
-                # Add if not already in preset
-                if relative_path not in preset_files:
-                    preset_files.append(relative_path)
-                    added_files.append(relative_path)
+                relative_paths.append(relative_path)
             except Exception as e:
                 print(f"Error adding file {file_path}: {e}")
                 # Continue with other files even if one fails
                 continue
         
+        # One bulk add; the preset's ordered set skips files already present
+        added_files = self.settings_manager.add_preset_files(preset_name, relative_paths)
+        
         if added_files:
-            # Update settings
-            self.settings_manager.update_setting("presets", preset_name, preset_files)
-            self.load_preset_files(preset_name)
+            # Append only the new rows instead of reloading the whole list
+            self.file_model.append_files(added_files)
+            self.preset_changed.emit(preset_name, self.settings_manager.get_preset_files(preset_name))
             self.files_added.emit(added_files)
     
     def choose_output_directory(self):
@@ -318,7 +463,10 @@ class FileSpecificFrame(QFrame):
             self.settings_manager.update_setting("presets", "current_preset", name)
     
     def auto_preset(self):
-        """Automatically create presets based on directory structure"""
+        """Automatically create presets based on directory structure (scanned in the background)"""
+        if self._cancel_running_scan():
+            return
+        
         base_dir = self.settings_manager.get_setting("paths", "base_dir", "")
         if not base_dir:
             QMessageBox.warning(
@@ -329,47 +477,30 @@ class FileSpecificFrame(QFrame):
             return
 
         base_path = os.path.abspath(base_dir)
-        new_presets = {}
-        
-        # Define directories to ignore
-        IGNORED = {".pytest_cache", "build", "docs", "logs", "env", "venv", ".git",
-                 "output", "temp", ".backups", "__pycache__"}
+        self._scan_presets = {}
+        worker = self._create_scan_worker(
+            base_path,
+            base_path,
+            ScanWorker.MODE_PRESETS,
+            extra_ignored_directories=constants.AUTO_PRESET_IGNORED_DIRECTORIES,
+            skip_hidden_files=True
+        )
+        worker.preset_found.connect(self._handle_scanned_preset)
+        worker.scan_finished.connect(self._handle_auto_preset_finished)
+        self._start_scan(worker, self.auto_preset_button)
+    
+    def _handle_scanned_preset(self, preset_name, files):
+        self._scan_presets[preset_name] = files
+        self.auto_preset_button.setText(f"Cancel Scan ({len(self._scan_presets)} presets)")
+    
+    def _handle_auto_preset_finished(self, cancelled):
+        """Confirm the scanned presets and commit them in one settings write"""
+        self._end_scan()
+        new_presets, self._scan_presets = self._scan_presets, {}
+        if cancelled:
+            return
         
         try:
-            for root, dirs, files in os.walk(base_path):
-                # Skip ignored directories
-                dirs[:] = [d for d in dirs if d not in IGNORED]
-                
-                # Skip base directory itself
-                if root == base_path:
-                    continue
-                    
-                # Get relative path for preset name
-                try:
-                    rel_path = os.path.relpath(root, base_path)
-                    if rel_path == '.':
-                        continue
-                        
-                    # Collect files in this directory
-                    preset_files = []
-                    for file in files:
-                        if not file.startswith('.'):  # Skip hidden files
-                            file_path = os.path.join(root, file)
-                            try:
-                                rel_file = os.path.relpath(file_path, base_path)
-                                # Normalize path separators
-                                rel_file = rel_file.replace('\\', '/')
-                                preset_files.append(rel_file)
-                            except ValueError:
-                                continue
-                    
-                    if preset_files:
-                        preset_name = rel_path.replace('\\', '/')
-                        new_presets[preset_name] = preset_files
-                        
-                except ValueError:
-                    continue
-            
             if not new_presets:
                 QMessageBox.information(
                     self,
@@ -407,9 +538,8 @@ class FileSpecificFrame(QFrame):
                         f"Preset '{name}' contains {len(files)} files, which may affect performance."
                     )
                 
-            # Update settings with new presets
-            for name, files in new_presets.items():
-                self.settings_manager.update_setting("presets", name, files)
+            # All presets in one store transaction and one settings write
+            self.settings_manager.add_presets(new_presets)
             
             # Update UI
             self.load_presets()
@@ -426,6 +556,13 @@ class FileSpecificFrame(QFrame):
                 f"An error occurred while generating presets: {str(e)}"
             )
     
+    def cleanup(self):
+        """Stop a running background scan"""
+        if self.scan_worker and self.scan_worker.isRunning():
+            self.scan_worker.stop()
+            self.scan_worker.wait()
+        self.scan_worker = None
+    
     def remove_preset(self):
         """Remove the currently selected preset"""
         preset_name = self.preset_combo.currentText()
@@ -450,7 +587,7 @@ class FileSpecificFrame(QFrame):
                 self.preset_combo.removeItem(index)
             
             # Clear file list
-            self.file_listbox.clear()
+            self.file_model.clear()
             
             # Notify other components
             self.preset_changed.emit(preset_name, [])
@@ -462,7 +599,7 @@ class FileSpecificFrame(QFrame):
             self.remove_selected_files()
         else:
             # Call the parent implementation for other keys
-            QListWidget.keyPressEvent(self.file_listbox, event)
+            QListView.keyPressEvent(self.file_listbox, event)
     
     def remove_selected_files(self):
         """Remove selected files from the current preset"""
@@ -470,36 +607,21 @@ class FileSpecificFrame(QFrame):
         if not preset_name:
             return
         
-        # Get selected items
-        selected_items = self.file_listbox.selectedItems()
-        if not selected_items:
+        # Get selected rows (mapped through the filter)
+        selected_rows = self.file_listbox.selectionModel().selectedRows()
+        if not selected_rows:
             return
         
-        # Get current preset files
-        preset_files = self.settings_manager.get_setting("presets", preset_name, [])
-        
-        # Validate preset files
-        if not isinstance(preset_files, list):
-            print(f"Warning: preset '{preset_name}' files is not a list: {type(preset_files)}")
-            if isinstance(preset_files, str):
-                preset_files = [preset_files]
-            else:
-                preset_files = []
-        
-        # Check if preset_files equals the preset name split into characters
-        if preset_files == list(preset_name):
-            print(f"ERROR: preset_files equals preset name characters: {preset_files}")
-            preset_files = []
-        
-        # Remove selected files
-        for item in selected_items:
-            file_path = item.text()
-            if file_path in preset_files:
-                preset_files.remove(file_path)
+        # Remove all selected files in one batch
+        removed = self.settings_manager.remove_preset_files(
+            preset_name, [self.file_model.file_at(index.row()) for index in selected_rows]
+        )
+        if not removed:
+            return
         
-        # Update settings and UI
-        self.settings_manager.update_setting("presets", preset_name, preset_files)
+        # Refresh the list from the preset's in-memory ordered set
         self.load_preset_files(preset_name)
+        preset_files = self.settings_manager.get_preset_files(preset_name)
         
         # Notify other components
         self.preset_changed.emit(preset_name, preset_files)
\ No newline at end of file
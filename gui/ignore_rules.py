@@ -0,0 +1,334 @@
+# -*- coding: utf-8 -*-
+# ignore_rules.py
+
+"""
+Compiled ignore rules shared by every directory walker.
+
+The [files], [directories] and paths.skip_paths settings are compiled once per
+run into exact-name sets plus at most one combined regex for name globs and one
+for path globs. Checking a path therefore costs a couple of set lookups and, only
+when glob rules exist, one regex match, independent of the number of rules.
+
+Rule syntax:
+    name            exact file or directory name ('__pycache__', 'file_to_ignore.txt')
+    *.log, test_?   glob on the name ('*' and '?' never cross '/')
+    gui/generated   path relative to the walk root, matches the path and everything below it
+    **/fixtures/*   path glob ('**' spans directories)
+
+With use_ignore_files, nested .gitignore / .ignore files below base_dir are
+honored as well. Each directory's file is compiled once and chained onto its
+parent's rules, so a directory is checked (and pruned) before it is entered.
+"""
+
+import os
+import re
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from gui import constants
+
+_GLOB_CHAR_RE = re.compile(r'[*?\[]')
+
+
+def is_glob(entry: str) -> bool:
+    return _GLOB_CHAR_RE.search(entry) is not None
+
+
+def _translate_segment(segment: str) -> str:
+    """Translate one path segment of a glob into a regex (no '/' crossing)."""
+    out = []
+    i = 0
+    while i < len(segment):
+        char = segment[i]
+        if char == '*':
+            out.append('[^/]*')
+        elif char == '?':
+            out.append('[^/]')
+        elif char == '[':
+            end = segment.find(']', i + 1)
+            if end == -1:
+                out.append(re.escape(char))
+            else:
+                body = segment[i + 1:end]
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                out.append(f'[{body}]')
+                i = end
+        else:
+            out.append(re.escape(char))
+        i += 1
+    return ''.join(out)
+
+
+def glob_to_regex(pattern: str) -> str:
+    """Regex source (without anchors) for a '/'-separated glob with '**' support."""
+    parts = []
+    segments = pattern.strip('/').split('/')
+    for index, segment in enumerate(segments):
+        last = index == len(segments) - 1
+        if segment == '**':
+            parts.append('.*' if last else '(?:[^/]+/)*')
+        else:
+            parts.append(_translate_segment(segment) + ('' if last else '/'))
+    return ''.join(parts)
+
+
+def compile_glob(pattern: str) -> "re.Pattern[str]":
+    """Compile a '/'-separated glob with '**' support into a full-match regex."""
+    return re.compile(glob_to_regex(pattern) + r'\Z')
+
+
+def static_prefix(pattern: str) -> str:
+    """The leading directory part of a glob that contains no wildcards ('' for none)."""
+    prefix = []
+    for segment in pattern.strip('/').split('/')[:-1]:
+        if is_glob(segment):
+            break
+        prefix.append(segment)
+    return '/'.join(prefix)
+
+
+def _alternation(sources: List[str], suffix: str = r'\Z') -> Optional["re.Pattern[str]"]:
+    if not sources:
+        return None
+    return re.compile('(?:' + '|'.join(f'(?:{source})' for source in sources) + ')' + suffix)
+
+
+class IgnoreFile:
+    """Compiled rules of one .gitignore-style file, matched relative to its directory"""
+
+    def __init__(self, lines: Iterable[str]):
+        # (regex, negated, directory only), in file order
+        self.rules: List[Tuple["re.Pattern[str]", bool, bool]] = []
+        sources: List[Tuple[str, bool]] = []
+        for line in lines:
+            parsed = self._parse(line)
+            if parsed is not None:
+                source, negated, dir_only = parsed
+                self.rules.append((re.compile(source + r'\Z'), negated, dir_only))
+                sources.append((source, dir_only))
+
+        # Without negations the last-match-wins order does not matter, so every
+        # rule collapses into one regex for files and one for directories
+        self._any_re = self._dir_re = None
+        self.has_negations = any(negated for _, negated, _ in self.rules)
+        if not self.has_negations:
+            self._any_re = _alternation([source for source, dir_only in sources if not dir_only])
+            self._dir_re = _alternation([source for source, _ in sources])
+
+    @staticmethod
+    def _parse(line: str) -> Optional[Tuple[str, bool, bool]]:
+        """(regex source, negated, directory only) for one line, None for blanks and comments."""
+        line = line.rstrip('\n\r')
+        if line.endswith('\\ '):
+            line = line[:-2] + ' '  # escaped trailing space
+        else:
+            line = line.rstrip(' ')
+        if not line or line.startswith('#'):
+            return None
+        negated = line.startswith('!')
+        if negated:
+            line = line[1:]
+        elif line.startswith('\\'):
+            line = line[1:]  # '\#name' and '\!name'
+        dir_only = line.endswith('/')
+        line = line.rstrip('/')
+        if not line:
+            return None
+        # A slash anywhere but the end anchors the pattern to the file's directory
+        anchored = '/' in line
+        source = glob_to_regex(line.lstrip('/'))
+        if not anchored:
+            source = '(?:.*/)?' + source
+        return source, negated, dir_only
+
+    @classmethod
+    def load(cls, path: str) -> Optional["IgnoreFile"]:
+        try:
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                return cls(f)
+        except OSError:
+            return None
+
+    def match(self, rel_path: str, is_dir: bool) -> Optional[bool]:
+        """True if ignored, False if re-included by a negation, None if no rule matches."""
+        if not self.has_negations:
+            regex = self._dir_re if is_dir else self._any_re
+            return True if regex is not None and regex.match(rel_path) else None
+        for regex, negated, dir_only in reversed(self.rules):
+            if (is_dir or not dir_only) and regex.match(rel_path):
+                return not negated
+        return None
+
+
+class IgnoreRules:
+    """Ignore rules compiled into sets and combined regexes; build once per walk"""
+
+    def __init__(self, ignored_directories: Iterable[str] = (), ignored_files: Iterable[str] = (),
+                 ignored_extensions: Iterable[str] = (), skip_paths: Iterable[str] = (),
+                 base_dir: Optional[str] = None, skip_hidden_files: bool = False,
+                 use_ignore_files: bool = False):
+        self.skip_hidden_files = skip_hidden_files
+        self.base_dir = base_dir
+        self.use_ignore_files = bool(use_ignore_files and base_dir)
+        self.key = (
+            tuple(ignored_directories), tuple(ignored_files), tuple(ignored_extensions),
+            tuple(skip_paths), base_dir, skip_hidden_files, self.use_ignore_files,
+        )
+        # relative directory -> ((path prefix, IgnoreFile), ...) from the root down
+        self._chains: Dict[str, Tuple[Tuple[str, IgnoreFile], ...]] = {}
+        self.ignore_files: Dict[str, Optional[int]] = {}  # loaded file path -> mtime_ns
+
+        self.dir_names = set()
+        self.file_names = set()
+        self.extensions = {ext.lower() if ext.startswith('.') else f'.{ext.lower()}'
+                           for ext in ignored_extensions if ext}
+        dir_name_globs, file_name_globs = [], []
+        dir_path_globs, file_path_globs = [], []
+
+        def add_rule(rule: str, names: set, name_globs: List[str], path_globs: List[str]) -> None:
+            rule = rule.replace('\\', '/').strip()
+            if not rule:
+                return
+            if '/' in rule.strip('/'):
+                # Path rule: the path itself and everything below it
+                path_globs.append(glob_to_regex(rule) + '(?:/.*)?')
+            elif is_glob(rule):
+                name_globs.append(_translate_segment(rule.strip('/')))
+            else:
+                names.add(rule.strip('/'))
+
+        for rule in ignored_directories:
+            add_rule(rule, self.dir_names, dir_name_globs, dir_path_globs)
+        for rule in ignored_files:
+            add_rule(rule, self.file_names, file_name_globs, file_path_globs)
+
+        # skip_paths are directory prefixes (absolute paths are made relative to base_dir)
+        for skip_path in skip_paths:
+            skip_path = (skip_path or '').replace('\\', '/').strip()
+            if not skip_path or skip_path in ('.', './'):
+                continue
+            if base_dir and os.path.isabs(skip_path):
+                try:
+                    skip_path = os.path.relpath(skip_path, base_dir).replace('\\', '/')
+                except ValueError:
+                    continue
+                if skip_path.startswith('..'):
+                    continue
+            dir_path_globs.append(glob_to_regex(skip_path) + '(?:/.*)?')
+
+        self._dir_name_re = _alternation(dir_name_globs)
+        self._file_name_re = _alternation(file_name_globs)
+        self._dir_path_re = _alternation(dir_path_globs)
+        self._file_path_re = _alternation(file_path_globs)
+
+        self.dirs_checked = 0
+        self.files_checked = 0
+        self.dirs_skipped = 0
+        self.files_skipped = 0
+
+    @classmethod
+    def from_settings(cls, settings: Mapping[str, Any], base_dir: Optional[str] = None,
+                      extra_directories: Iterable[str] = (), skip_hidden_files: bool = False) -> "IgnoreRules":
+        """Compile the ignore lists of a settings mapping (dict, SettingsData sections or SettingsSnapshot)."""
+        directories = settings.get('directories', {}) or {}
+        files = settings.get('files', {}) or {}
+        paths = settings.get('paths', {}) or {}
+        return cls(
+            ignored_directories=list(directories.get('ignored_directories', ()) or ()) + list(extra_directories),
+            ignored_files=files.get('ignored_files', ()) or (),
+            ignored_extensions=files.get('ignored_extensions', ()) or (),
+            skip_paths=paths.get('skip_paths', ()) or (),
+            base_dir=base_dir,
+            skip_hidden_files=skip_hidden_files,
+            use_ignore_files=directories.get('use_ignore_files', constants.USE_IGNORE_FILES),
+        )
+
+    @staticmethod
+    def _split(rel_path: str) -> Tuple[str, str]:
+        rel_path = rel_path.replace('\\', '/')
+        if rel_path.startswith('./'):
+            rel_path = rel_path[2:]
+        return rel_path, rel_path.rsplit('/', 1)[-1]
+
+    def _chain(self, rel_dir: str) -> Tuple[Tuple[str, IgnoreFile], ...]:
+        """Ignore files that apply inside 'rel_dir', loading each directory's file once."""
+        chain = self._chains.get(rel_dir)
+        if chain is not None:
+            return chain
+        if rel_dir:
+            parent = rel_dir.rpartition('/')[0]
+            chain = self._chain(parent)
+            directory = os.path.join(self.base_dir, rel_dir)
+            prefix = rel_dir + '/'
+        else:
+            chain = ()
+            directory = self.base_dir
+            prefix = ''
+        for file_name in constants.IGNORE_FILE_NAMES:
+            path = os.path.join(directory, file_name)
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                continue
+            ignore_file = IgnoreFile.load(path)
+            self.ignore_files[path] = mtime
+            if ignore_file is not None and ignore_file.rules:
+                chain = chain + ((prefix, ignore_file),)
+        self._chains[rel_dir] = chain
+        return chain
+
+    def _ignored_by_files(self, rel_path: str, is_dir: bool) -> bool:
+        # Deeper files win over their parents, like git
+        for prefix, ignore_file in reversed(self._chain(rel_path.rpartition('/')[0])):
+            matched = ignore_file.match(rel_path[len(prefix):], is_dir)
+            if matched is not None:
+                return matched
+        return False
+
+    def skip_dir(self, rel_dir: str) -> bool:
+        """True if the directory (relative to the walk root, '/' or os.sep separated) is ignored."""
+        rel_dir, name = self._split(rel_dir)
+        if rel_dir in ('', '.'):
+            return False
+        self.dirs_checked += 1
+        if (name in self.dir_names
+                or (self._dir_name_re is not None and self._dir_name_re.match(name))
+                or (self._dir_path_re is not None and self._dir_path_re.match(rel_dir))
+                or (self.use_ignore_files and self._ignored_by_files(rel_dir, True))):
+            self.dirs_skipped += 1
+            return True
+        return False
+
+    def skip_file(self, rel_path: str) -> bool:
+        """True if the file (relative to the walk root) is ignored."""
+        rel_path, name = self._split(rel_path)
+        self.files_checked += 1
+        if ((self.skip_hidden_files and name.startswith('.'))
+                or name in self.file_names
+                or os.path.splitext(name)[1].lower() in self.extensions
+                or (self._file_name_re is not None and self._file_name_re.match(name))
+                or (self._file_path_re is not None and self._file_path_re.match(rel_path))
+                or (self._dir_path_re is not None and self._dir_path_re.match(rel_path))
+                or (self.use_ignore_files and self._ignored_by_files(rel_path, False))):
+            self.files_skipped += 1
+            return True
+        return False
+
+    def prune_dirs(self, rel_root: str, dirs: List[str]) -> None:
+        """Drop ignored subdirectories in place (for os.walk), so they are never descended into."""
+        prefix = '' if rel_root in ('', '.') else rel_root.replace('\\', '/') + '/'
+        dirs[:] = [d for d in dirs if not self.skip_dir(prefix + d)]
+
+    def stats(self) -> str:
+        return (f"{self.dirs_checked} dirs checked ({self.dirs_skipped} skipped), "
+                f"{self.files_checked} files checked ({self.files_skipped} skipped), "
+                f"{len(self.ignore_files)} ignore files")
+
+
+__all__ = [
+    "is_glob",
+    "compile_glob",
+    "static_prefix",
+    "IgnoreFile",
+    "IgnoreRules",
+]
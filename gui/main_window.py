@@ -291,5 +291,10 @@ class MainWindow(QMainWindow):
         # Clean up any resources
         if hasattr(self.extraction_frame, 'cleanup'):
             self.extraction_frame.cleanup()
+        if hasattr(self.file_specific_frame, 'cleanup'):
+            self.file_specific_frame.cleanup()
+        
+        # Write any debounced settings changes before exiting
+        self.settings_manager.flush()
         
         event.accept()
\ No newline at end of file
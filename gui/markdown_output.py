@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+# markdown_output.py
+
+"""
+Markdown bundle output that does not hold file bodies in memory.
+
+A MarkdownDocument is a list of generated text pieces (headers, fences,
+placeholders) and FileBody references. Bodies that FileReader validated for
+passthrough are copied from the source file into the output file descriptor
+at save time, so they are never decoded, concatenated or re-encoded. Large
+files under the "stream" policy are decoded and written chunk by chunk.
+"""
+
+from typing import List, NamedTuple, Union
+
+from gui.file_reader import FileReader, ReadTimeout
+
+
+class FileBody(NamedTuple):
+    path: str
+    size: int   # bytes validated (and copied)
+    lines: int  # newlines in those bytes
+    text: bool = False  # decode and write in chunks (READ_STREAMED) instead of copying bytes
+
+
+class MarkdownDocument:
+    """Generated text and file-body references, in output order"""
+
+    def __init__(self, text: str = ""):
+        self._parts: List[Union[str, FileBody]] = [text] if text else []
+        self.bodies = 0
+
+    def append(self, text: str) -> None:
+        self._parts.append(text)
+
+    def append_file(self, path: str, size: int, lines: int, text: bool = False) -> None:
+        self._parts.append(FileBody(path, size, lines, text))
+        self.bodies += 1
+
+    def save(self, output_path: str, reader: FileReader) -> None:
+        """Write the document to 'output_path' as UTF-8; bodies are copied or streamed file to file."""
+        with open(output_path, 'w', encoding='utf-8') as f:
+            for part in self._parts:
+                if isinstance(part, str):
+                    f.write(part)
+                    continue
+                if part.text:
+                    try:
+                        for chunk in reader.iter_text(part.path):
+                            f.write(chunk)
+                    except (OSError, ReadTimeout) as e:
+                        print(f"Error streaming file {part.path}: {e}")
+                    continue
+                # Generated text must reach the descriptor before the copied bytes
+                f.flush()
+                try:
+                    copied = reader.copy_to(part.path, part.size, f.fileno())
+                except OSError as e:
+                    print(f"Error copying file {part.path}: {e}")
+                    continue
+                if copied != part.size:
+                    print(f"File {part.path} changed during extraction ({copied} of {part.size} bytes copied)")
+
+    def __str__(self) -> str:
+        """The whole document as text; bodies are read back from their files."""
+        pieces = []
+        for part in self._parts:
+            if isinstance(part, str):
+                pieces.append(part)
+                continue
+            if part.text:
+                with open(part.path, 'r', encoding='utf-8', errors='ignore') as f:
+                    pieces.append(f.read())
+                continue
+            with open(part.path, 'rb') as f:
+                pieces.append(f.read(part.size).decode('utf-8', errors='ignore'))
+        return ''.join(pieces)
+
+
+__all__ = [
+    "FileBody",
+    "MarkdownDocument",
+]
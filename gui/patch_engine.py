@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+# patch_engine.py
+
+"""
+AST-based replacement of classes and functions inside Python source files.
+
+Each target file is parsed once, every requested definition is located by its
+exact line span (decorators included) and all replacements are applied in a
+single pass before the file is written back once.
+"""
+
+import ast
+import codecs
+import io
+import os
+import textwrap
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+DefinitionNode = (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)
+
+
+@dataclass
+class PatchResult:
+    """Outcome of applying a batch of definition updates to one file"""
+    file_path: str
+    applied: List[str] = field(default_factory=list)
+    missing: List[str] = field(default_factory=list)
+    conflicts: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and not self.missing and not self.conflicts
+
+
+def index_definitions(tree: ast.AST) -> Dict[str, ast.AST]:
+    """Map qualified names (e.g. 'Outer.method') to class/function nodes in document order."""
+    index: Dict[str, ast.AST] = {}
+
+    def visit(body, prefix):
+        for node in body:
+            if isinstance(node, DefinitionNode):
+                name = f"{prefix}{node.name}"
+                index.setdefault(name, node)
+                visit(node.body, f"{name}.")
+
+    visit(tree.body, "")
+    return index
+
+
+def find_definition(index: Dict[str, ast.AST], name: str) -> Optional[ast.AST]:
+    """Find a definition by qualified name, falling back to the first bare-name match."""
+    if name in index:
+        return index[name]
+    suffix = f".{name}"
+    for qualified_name, node in index.items():
+        if qualified_name.endswith(suffix):
+            return node
+    return None
+
+
+def definition_span(node: ast.AST) -> Tuple[int, int]:
+    """Return the 0-based [start, end) line span of a definition, including decorators."""
+    start = node.lineno
+    for decorator in getattr(node, 'decorator_list', []):
+        start = min(start, decorator.lineno)
+    return start - 1, node.end_lineno
+
+
+def _reindent(new_content: str, col_offset: int, newline: str) -> List[str]:
+    """Dedent the replacement and indent it to the column of the replaced definition."""
+    body = textwrap.dedent(new_content.strip('\n'))
+    if col_offset:
+        body = textwrap.indent(body, ' ' * col_offset)
+    return [line + newline for line in body.split('\n')]
+
+
+def apply_definition_updates(source: str, updates: Dict[str, str], file_path: str = "") -> Tuple[str, PatchResult]:
+    """
+    Apply all class/function replacements to 'source' in one pass.
+    Returns the updated source and a PatchResult describing what was applied.
+    """
+    result = PatchResult(file_path=file_path)
+    try:
+        tree = ast.parse(source)
+    except SyntaxError as e:
+        result.error = f"Cannot parse {file_path or 'source'}: {e}"
+        return source, result
+
+    # Only real line endings: str.splitlines() also breaks on '\x0c', '\x85', '\u2028' ...,
+    # which ast does not count as lines
+    lines = io.StringIO(source, newline='').readlines()
+    newline = '\r\n' if lines and lines[0].endswith('\r\n') else '\n'
+    index = index_definitions(tree)
+
+    # Resolve every target to a span before touching any lines
+    spans = []
+    for name, new_content in updates.items():
+        node = find_definition(index, name)
+        if node is None:
+            result.missing.append(name)
+            continue
+        start, end = definition_span(node)
+        spans.append((start, end, name, node.col_offset, new_content))
+
+    # Reject overlapping targets (e.g. a class and one of its methods in the same batch)
+    spans.sort(key=lambda span: (span[0], -span[1]))
+    accepted = []
+    last_end = -1
+    for span in spans:
+        if span[0] < last_end:
+            result.conflicts.append(span[2])
+            continue
+        accepted.append(span)
+        last_end = span[1]
+
+    # Splice bottom-up so earlier spans keep their line numbers
+    for start, end, name, col_offset, new_content in reversed(accepted):
+        replacement = _reindent(new_content, col_offset, newline)
+        if end < len(lines) or lines[-1].endswith(('\n', '\r')):
+            lines[start:end] = replacement
+        else:
+            # The file had no trailing newline after this definition
+            replacement[-1] = replacement[-1].rstrip('\r\n')
+            lines[start:end] = replacement
+        result.applied.append(name)
+
+    result.applied.reverse()
+    return ''.join(lines), result
+
+
+def apply_definition_updates_to_file(file_path: str, updates: Dict[str, str]) -> PatchResult:
+    """Read 'file_path' once, apply all updates and write it back once if anything changed."""
+    if not os.path.exists(file_path):
+        return PatchResult(file_path=file_path, missing=list(updates), error=f"File not found: {file_path}")
+
+    with open(file_path, 'rb') as f:
+        has_bom = f.read(len(codecs.BOM_UTF8)) == codecs.BOM_UTF8
+    # 'utf-8-sig' drops the BOM, which ast.parse would reject; it is written back if it was there
+    encoding = 'utf-8-sig' if has_bom else 'utf-8'
+    with open(file_path, 'r', encoding=encoding, newline='') as f:
+        source = f.read()
+
+    updated, result = apply_definition_updates(source, updates, file_path)
+    if result.applied and updated != source:
+        with open(file_path, 'w', encoding=encoding, newline='') as f:
+            f.write(updated)
+    return result
+
+
+__all__ = [
+    "PatchResult",
+    "index_definitions",
+    "find_definition",
+    "definition_span",
+    "apply_definition_updates",
+    "apply_definition_updates_to_file",
+]
@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+# path_trie.py
+
+"""
+Compact set of '/'-separated paths stored as a trie of interned segments.
+
+Long shared prefixes ('E:/_Development_/project/gui/...') are stored once per
+directory instead of once per file, and directory names are interned so every
+trie in the process shares them. An insertion-ordered index from sequence
+number to (parent node, segment) keeps iteration in the order paths were added
+(preset entries such as '!src/tests/**' depend on it) without sorting.
+Removing a folder removes its literal paths; pattern entries below it
+('src/**/*.py', 'src/gen/') stay.
+"""
+
+import sys
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from gui.ignore_rules import is_glob
+
+
+class _Node:
+    __slots__ = ('children', 'seq', 'size', 'parent', 'name')
+
+    def __init__(self, parent: Optional["_Node"] = None, name: str = "", seq: int = -1):
+        # segment -> child node, or the sequence number of a plain file (a leaf costs one dict slot)
+        self.children: Optional[Dict[str, Union["_Node", int]]] = None
+        self.seq = seq                     # sequence number if this directory is itself a path, else -1
+        self.size = int(seq >= 0)          # number of paths at or below this node
+        self.parent = parent               # None for the root
+        self.name = name
+
+    @property
+    def terminal(self) -> bool:
+        return self.seq >= 0
+
+
+def _split(path: str) -> List[str]:
+    # Directory names repeat across paths and presets, so share them; file names
+    # are mostly unique and interning them would only grow the intern table
+    segments = path.split('/')
+    for index in range(len(segments) - 1):
+        segments[index] = sys.intern(segments[index])
+    return segments
+
+
+def _size(child: Union[_Node, int]) -> int:
+    return child.size if isinstance(child, _Node) else 1
+
+
+def _prefix(node: _Node, cache: Dict[int, str]) -> str:
+    """'dir/sub/' for a node ('' for the root); 'cache' (by node id) shares the work between siblings."""
+    if node.parent is None:
+        return ""
+    prefix = cache.get(id(node))
+    if prefix is None:
+        prefix = cache[id(node)] = _prefix(node.parent, cache) + node.name + '/'
+    return prefix
+
+
+def _is_literal(path: str) -> bool:
+    """False for pattern entries (globs and 'dir/' references)."""
+    return not path.endswith('/') and not is_glob(path)
+
+
+class PathTrie:
+    """Ordered set of paths with O(depth) membership and cheap prefix removal"""
+
+    __slots__ = ('_root', '_next_seq', '_order')
+
+    def __init__(self, paths: Iterable[str] = ()):
+        self._root = _Node()
+        self._next_seq = 0
+        self._order: Dict[int, Tuple[_Node, str]] = {}  # sequence number -> (parent, segment), in insertion order
+        self.add_many(paths)
+
+    def __len__(self) -> int:
+        return self._root.size
+
+    def __contains__(self, path: object) -> bool:
+        if not isinstance(path, str):
+            return False
+        found, child = self._find(_split(path))
+        return found and (not isinstance(child, _Node) or child.terminal)
+
+    def __iter__(self) -> Iterator[str]:
+        # Snapshot the index (which also keeps the cached nodes alive) so the trie may change while iterating
+        prefixes: Dict[int, str] = {}
+        for parent, segment in list(self._order.values()):
+            yield _prefix(parent, prefixes) + segment
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({len(self)} paths)"
+
+    def _find(self, segments: List[str]) -> Tuple[bool, Union[_Node, int, None]]:
+        """Return (found, node); node is the sequence number for a leaf file."""
+        node: Union[_Node, int, None] = self._root
+        for segment in segments:
+            if not isinstance(node, _Node) or not node.children or segment not in node.children:
+                return False, None
+            node = node.children[segment]
+        return True, node
+
+    def _trail(self, segments: List[str]) -> Optional[List[Tuple[_Node, str]]]:
+        """(parent, segment) pairs down to the path, or None if it is not in the trie."""
+        trail: List[Tuple[_Node, str]] = []
+        node: Union[_Node, int] = self._root
+        for segment in segments:
+            if not isinstance(node, _Node) or not node.children or segment not in node.children:
+                return None
+            trail.append((node, segment))
+            node = node.children[segment]
+        return trail
+
+    def add(self, path: str) -> bool:
+        """Add one path. Returns False if it was already present."""
+        segments = _split(path)
+        trail = [self._root]
+        node = self._root
+        last = len(segments) - 1
+        for index, segment in enumerate(segments):
+            if node.children is None:
+                node.children = {}
+            children = node.children
+            if segment not in children:
+                if index == last:
+                    children[segment] = self._next_seq
+                    break
+                child = children[segment] = _Node(node, segment)
+            else:
+                child = children[segment]
+                if not isinstance(child, _Node):
+                    if index == last:
+                        return False
+                    # A file path that is also a directory prefix
+                    child = children[segment] = _Node(node, segment, seq=child)
+                elif index == last:
+                    if child.terminal:
+                        return False
+                    child.seq = self._next_seq
+                    trail.append(child)
+                    break
+            node = child
+            trail.append(node)
+        for visited in trail:
+            visited.size += 1
+        self._order[self._next_seq] = (node, segments[-1])
+        self._next_seq += 1
+        return True
+
+    def discard(self, path: str) -> bool:
+        """Remove one path. Returns False if it was not present."""
+        trail = self._trail(_split(path))
+        if not trail:
+            return False
+        parent, segment = trail[-1]
+        child = parent.children[segment]
+        if isinstance(child, _Node):
+            if not child.terminal:
+                return False
+            del self._order[child.seq]
+            child.seq = -1
+        else:
+            del self._order[child]
+        self._root.size -= 1
+        self._shrink(trail, 1)
+        return True
+
+    def _shrink(self, trail: List[Tuple[_Node, str]], removed: int) -> None:
+        """Subtract 'removed' along the trail (root excluded) and prune empty nodes."""
+        for parent, segment in reversed(trail):
+            child = parent.children[segment]
+            if isinstance(child, _Node):
+                child.size -= removed
+            if not isinstance(child, _Node) or child.size == 0:
+                del parent.children[segment]
+                if not parent.children:
+                    parent.children = None
+
+    def add_many(self, paths: Iterable[str]) -> List[str]:
+        """Add paths not yet present. Returns the paths actually added, in order."""
+        return [path for path in paths if self.add(path)]
+
+    def remove_many(self, paths: Iterable[str]) -> List[str]:
+        """Remove paths that are present. Returns the paths actually removed."""
+        return [path for path in paths if self.discard(path)]
+
+    def remove_prefix(self, folder: str) -> int:
+        """
+        Remove 'folder' and the literal paths below it; pattern entries stay.
+        Returns the number of paths removed.
+        """
+        folder = folder.rstrip('/')
+        trail = self._trail(_split(folder))
+        if not trail:
+            return 0
+        parent, segment = trail[-1]
+        entries = self._entries(folder, parent.children[segment])
+        if any(not _is_literal(path) for _, path in entries):
+            return len(self.remove_many(path for _, path in entries if _is_literal(path)))
+        # Only literal paths: detach the whole folder
+        for seq, _ in entries:
+            del self._order[seq]
+        self._root.size -= len(entries)
+        self._shrink(trail, len(entries))
+        return len(entries)
+
+    def _entries(self, path: str, node: Union[_Node, int]) -> List[Tuple[int, str]]:
+        """(sequence number, path) of every path at or below 'node', in no particular order."""
+        entries: List[Tuple[int, str]] = []
+        stack: List[Tuple[str, Union[_Node, int]]] = [(path, node)]
+        while stack:
+            path, node = stack.pop()
+            if not isinstance(node, _Node):
+                entries.append((node, path))
+                continue
+            if node.terminal:
+                entries.append((node.seq, path))
+            if node.children:
+                prefix = f"{path}/" if path else ""
+                stack.extend((prefix + segment, child) for segment, child in node.children.items())
+        return entries
+
+    def iter_prefix(self, folder: str) -> Iterator[str]:
+        """Yield every path at or below 'folder' ('' for all), in the order they were added."""
+        folder = folder.rstrip('/')
+        if not folder:
+            yield from self
+            return
+        found, node = self._find(_split(folder))
+        if not found:
+            return
+        # Sorting only touches the folder's own paths
+        for _, path in sorted(self._entries(folder, node)):
+            yield path
+
+    def count_prefix(self, folder: str) -> int:
+        """Number of paths at or below 'folder'."""
+        folder = folder.rstrip('/')
+        if not folder:
+            return self._root.size
+        found, node = self._find(_split(folder))
+        return _size(node) if found else 0
+
+    def to_list(self) -> List[str]:
+        return list(self)
+
+    def clear(self) -> None:
+        self._root = _Node()
+        self._next_seq = 0
+        self._order = {}
+
+
+__all__ = [
+    "PathTrie",
+]
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+# path_validation.py
+
+"""
+Batched existence checks for preset file lists.
+
+Paths are grouped by parent directory and every directory holding several of
+them is listed once; membership is then a set lookup. For large presets on
+slow or network storage this replaces one stat per file with one listing per
+directory.
+"""
+
+import os
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from gui import constants
+from gui.preset_resolver import is_dynamic_entry
+
+
+@dataclass
+class ValidationReport:
+    """Outcome of validate_paths; 'valid' keeps the entries as written, in order"""
+    valid: List[str] = field(default_factory=list)
+    missing: List[Tuple[str, str]] = field(default_factory=list)  # (entry, full path)
+    invalid: List[str] = field(default_factory=list)              # malformed entries
+    dynamic: int = 0                                              # globs etc., passed through
+    directories_listed: int = 0
+
+    @property
+    def total(self) -> int:
+        return len(self.valid) + len(self.missing) + len(self.invalid)
+
+    def missing_by_directory(self) -> Dict[str, List[str]]:
+        """Missing file names grouped by parent directory."""
+        grouped: Dict[str, List[str]] = {}
+        for _, full_path in self.missing:
+            parent, name = os.path.split(full_path)
+            grouped.setdefault(parent, []).append(name)
+        return grouped
+
+    def summary(self, max_examples: int = 5) -> str:
+        text = f"{len(self.valid)} of {self.total} files valid"
+        if self.missing:
+            examples = ", ".join(entry for entry, _ in self.missing[:max_examples])
+            more = f" and {len(self.missing) - max_examples} more" if len(self.missing) > max_examples else ""
+            text += f"; {len(self.missing)} missing ({examples}{more})"
+        if self.invalid:
+            text += f"; {len(self.invalid)} invalid entries skipped"
+        return text
+
+
+def _list_names(directory: str) -> Optional[Set[str]]:
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return None
+    # Windows file names are case-insensitive, like os.path.exists there
+    return {os.path.normcase(name) for name in names} if os.name == 'nt' else set(names)
+
+
+def validate_paths(entries: Iterable[str], base_dir: str) -> ValidationReport:
+    """
+    Check which preset entries exist below 'base_dir'. Relative entries are
+    joined to base_dir; glob, directory and negated entries pass through unchecked.
+    """
+    report = ValidationReport()
+    # Entries in input order: (entry, full path, parent, normcased name); no full path for pass-throughs
+    checks: List[Tuple[str, str, str, str]] = []
+    for entry in entries:
+        # Single characters are almost always a string split into a list by mistake
+        if not isinstance(entry, str) or len(entry) <= 1:
+            report.invalid.append(entry)
+            continue
+        if is_dynamic_entry(entry):
+            report.dynamic += 1
+            checks.append((entry, "", "", ""))
+            continue
+        full_path = os.path.normpath(entry if os.path.isabs(entry) else os.path.join(base_dir, entry))
+        parent, name = os.path.split(full_path)
+        checks.append((entry, full_path, parent, os.path.normcase(name)))
+
+    # A listing only pays off for directories holding several of the entries
+    per_parent: Dict[str, int] = {}
+    for _, full_path, parent, _ in checks:
+        if full_path:
+            per_parent[parent] = per_parent.get(parent, 0) + 1
+
+    listings: Dict[str, Optional[Set[str]]] = {}
+    for entry, full_path, parent, name in checks:
+        if not full_path:
+            report.valid.append(entry)
+            continue
+        if per_parent[parent] < constants.VALIDATION_LIST_THRESHOLD:
+            exists = os.path.exists(full_path)
+        else:
+            if parent not in listings:
+                listings[parent] = _list_names(parent)
+                report.directories_listed += 1
+            names = listings[parent]
+            exists = names is not None and name in names
+        if exists:
+            report.valid.append(entry)
+        else:
+            report.missing.append((entry, full_path))
+    return report
+
+
+__all__ = [
+    "ValidationReport",
+    "validate_paths",
+]
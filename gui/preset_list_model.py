@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+# preset_list_model.py
+
+"""
+List model for the preset file list.
+
+The view asks for rows on demand, so only visible paths are ever turned into
+display data; there is no widget item per file. Filtering searches one joined,
+lower-cased copy of all paths with str.find and maps hits back to rows through
+an offset table, and refining a query only rechecks the previous matches.
+"""
+
+from array import array
+from bisect import bisect_right
+from typing import Iterable, List, Optional
+
+from PySide6.QtCore import QAbstractListModel, QModelIndex, Qt
+
+
+class PathFilterIndex:
+    """Case-insensitive substring filter over a growing list of paths"""
+
+    def __init__(self):
+        self._lower: List[str] = []
+        self._haystack: Optional[str] = None  # built lazily on the first query
+        self._starts = array('Q')
+        self._last_query = ""
+        self._last_rows: Optional[List[int]] = None
+
+    def reset(self, paths: Iterable[str]) -> None:
+        self._lower = [path.lower() for path in paths]
+        self._haystack = None
+        self._last_query, self._last_rows = "", None
+
+    def extend(self, paths: Iterable[str]) -> None:
+        self._lower.extend(path.lower() for path in paths)
+        self._haystack = None
+        self._last_query, self._last_rows = "", None
+
+    def _build(self) -> None:
+        starts = array('Q')
+        offset = 0
+        for text in self._lower:
+            starts.append(offset)
+            offset += len(text) + 1
+        self._starts = starts
+        self._haystack = '\n'.join(self._lower)
+
+    def query(self, text: str) -> Optional[List[int]]:
+        """Rows whose path contains 'text' (case-insensitive), ascending; None for no filter."""
+        needle = text.strip().lower()
+        if not needle:
+            return None
+
+        if self._last_rows is not None and self._last_query and self._last_query in needle:
+            # Typing more characters only narrows the previous result
+            lower = self._lower
+            result = [row for row in self._last_rows if needle in lower[row]]
+        elif len(needle) < 3:
+            # Very short needles match most rows; a plain scan is cheaper than many finds
+            lower = self._lower
+            result = [row for row in range(len(lower)) if needle in lower[row]]
+        else:
+            if self._haystack is None:
+                self._build()
+            # str.find over one joined string runs in C; offsets map hits back to rows
+            haystack, starts = self._haystack, self._starts
+            total = len(starts)
+            result = []
+            pos = haystack.find(needle)
+            while pos != -1:
+                row = bisect_right(starts, pos) - 1
+                result.append(row)
+                if row + 1 >= total:
+                    break
+                pos = haystack.find(needle, starts[row + 1])
+
+        self._last_query, self._last_rows = needle, result
+        return result
+
+
+class PresetListModel(QAbstractListModel):
+    """Read-only model of one preset's files with an optional filter"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._files: List[str] = []
+        self._rows: Optional[List[int]] = None  # visible rows when filtered
+        self._filter_text = ""
+        self._index = PathFilterIndex()
+
+    # ---- Qt model interface ----
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self._files) if self._rows is None else len(self._rows)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.ToolTipRole):
+            return self.file_at(index.row())
+        return None
+
+    # ---- Content ----
+
+    def file_at(self, row: int) -> str:
+        """Path shown in a (possibly filtered) row"""
+        return self._files[row if self._rows is None else self._rows[row]]
+
+    def files(self) -> List[str]:
+        return list(self._files)
+
+    def total_count(self) -> int:
+        return len(self._files)
+
+    def set_files(self, files: Iterable[str]) -> None:
+        """Replace the whole list (one model reset instead of one item per path)."""
+        self.beginResetModel()
+        self._files = list(files)
+        self._index.reset(self._files)
+        self._rows = self._index.query(self._filter_text)
+        self.endResetModel()
+
+    def append_files(self, files: Iterable[str]) -> None:
+        """Append new paths; only the rows that become visible are inserted."""
+        files = list(files)
+        if not files:
+            return
+        start = len(self._files)
+        self._index.extend(files)
+        if self._rows is None:
+            self.beginInsertRows(QModelIndex(), start, start + len(files) - 1)
+            self._files.extend(files)
+            self.endInsertRows()
+            return
+
+        self._files.extend(files)
+        needle = self._filter_text.strip().lower()
+        matches = [start + offset for offset, path in enumerate(files) if needle in path.lower()]
+        if matches:
+            first = len(self._rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(matches) - 1)
+            self._rows.extend(matches)
+            self.endInsertRows()
+
+    def clear(self) -> None:
+        self.set_files(())
+
+    def set_filter(self, text: str) -> None:
+        """Show only paths containing 'text' (case-insensitive); empty shows all."""
+        if text == self._filter_text:
+            return
+        self.beginResetModel()
+        self._filter_text = text
+        self._rows = self._index.query(text)
+        self.endResetModel()
+
+
+__all__ = [
+    "PathFilterIndex",
+    "PresetListModel",
+]
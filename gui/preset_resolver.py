@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+# preset_resolver.py
+
+"""
+Dynamic preset entries, resolved at extraction time.
+
+Besides plain file paths a preset may contain:
+    src/**/*.py     glob pattern ('*' and '?' stay within one path segment, '**' spans directories)
+    gui/            directory reference (every file below it)
+    !**/test_*.py   negated entry, removes earlier matches
+
+Entries are applied in order, like .gitignore. Directory listings are cached per
+directory and reused while the directory's mtime is unchanged; a whole resolution
+is reused while every directory it listed still has the same mtime.
+"""
+
+import os
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from gui.file_catalog import FileCatalog
+from gui.ignore_rules import IgnoreRules, compile_glob, is_glob, static_prefix
+from gui.preset_store import PresetFiles
+
+NEGATION_PREFIX = '!'
+
+
+def is_dynamic_entry(entry: str) -> bool:
+    """True for glob patterns, negations and explicit directory references ('dir/')."""
+    return entry.startswith(NEGATION_PREFIX) or entry.endswith('/') or is_glob(entry)
+
+
+class DirectoryCache:
+    """Per-directory (files, subdirs) listings, revalidated by directory mtime"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._listings: Dict[str, Tuple[int, List[str], List[str]]] = {}
+
+    def mtime(self, directory: str) -> Optional[int]:
+        try:
+            return os.stat(directory).st_mtime_ns
+        except OSError:
+            return None
+
+    def listdir(self, directory: str) -> Tuple[List[str], List[str]]:
+        """Return (file names, subdirectory names) of 'directory', sorted."""
+        mtime = self.mtime(directory)
+        if mtime is None:
+            return [], []
+        with self._lock:
+            cached = self._listings.get(directory)
+        if cached is not None and cached[0] == mtime:
+            return cached[1], cached[2]
+
+        files, dirs = [], []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            dirs.append(entry.name)
+                        elif entry.is_file():
+                            files.append(entry.name)
+                    except OSError:
+                        continue
+        except OSError:
+            return [], []
+        files.sort()
+        dirs.sort()
+        with self._lock:
+            self._listings[directory] = (mtime, files, dirs)
+        return files, dirs
+
+    def clear(self) -> None:
+        with self._lock:
+            self._listings.clear()
+
+
+class PresetResolver:
+    """Expands dynamic preset entries against a base directory"""
+
+    def __init__(self, cache: Optional[DirectoryCache] = None):
+        self.cache = cache or DirectoryCache()
+        self._lock = threading.Lock()
+        # (base_dir, entries, ignore rules) -> (resolved files, {directory: mtime})
+        self._resolved: Dict[tuple, Tuple[List[str], Dict[str, Optional[int]]]] = {}
+
+    def walk(self, base_dir: str, relative_dir: str, rules: IgnoreRules,
+             visited: Dict[str, Optional[int]], catalog: Optional[FileCatalog] = None) -> Iterator[str]:
+        """Yield files below 'relative_dir' as base-relative '/' paths, depth first, sorted."""
+        listdir = catalog.listdir if catalog is not None else self.cache.listdir
+        stack = [relative_dir.strip('/')]
+        while stack:
+            current = stack.pop()
+            directory = os.path.join(base_dir, current) if current else base_dir
+            visited[directory] = self.cache.mtime(directory)
+            files, dirs = listdir(directory)
+            prefix = f"{current}/" if current else ""
+            for name in files:
+                yield prefix + name
+            stack.extend(prefix + name for name in reversed(dirs) if not rules.skip_dir(prefix + name))
+
+    def _expand(self, base_dir: str, entry: str, rules: IgnoreRules,
+                visited: Dict[str, Optional[int]], catalog: Optional[FileCatalog]) -> Iterable[str]:
+        if is_glob(entry):
+            regex = compile_glob(entry)
+            root = static_prefix(entry)
+            return (path for path in self.walk(base_dir, root, rules, visited, catalog) if regex.match(path))
+        return self.walk(base_dir, entry, rules, visited, catalog)
+
+    def resolve(self, entries: Iterable[str], base_dir: str, rules: Optional[IgnoreRules] = None,
+                catalog: Optional[FileCatalog] = None) -> List[str]:
+        """
+        Resolve preset entries to an ordered, de-duplicated file list. Plain file
+        entries are kept as written; files found through globs or directory
+        references are filtered through the ignore rules. Directory listings
+        come from the persistent 'catalog' when given.
+        """
+        entries = tuple(entries)
+        if not any(is_dynamic_entry(entry) for entry in entries):
+            return PresetFiles(entries).to_list()
+
+        rules = rules or IgnoreRules()
+        key = (base_dir, entries, rules.key)
+
+        with self._lock:
+            cached = self._resolved.get(key)
+        if cached is not None and all(self.cache.mtime(d) == m for d, m in cached[1].items()):
+            return list(cached[0])
+
+        visited: Dict[str, Optional[int]] = {}
+        result = PresetFiles()
+        for entry in entries:
+            if entry.startswith(NEGATION_PREFIX):
+                pattern = entry[len(NEGATION_PREFIX):]
+                if is_glob(pattern):
+                    regex = compile_glob(pattern)
+                    result.remove_many([path for path in result if regex.match(path)])
+                else:
+                    prefix = pattern.strip('/') + '/'
+                    result.remove_many([path for path in result if path == pattern or path.startswith(prefix)])
+            elif is_glob(entry) or entry.endswith('/'):
+                result.add_many(path for path in self._expand(base_dir, entry, rules, visited, catalog)
+                                if not rules.skip_file(path))
+            else:
+                result.add_many((entry,))
+
+        resolved = result.to_list()
+        if catalog is not None:
+            catalog.flush()
+        # An edited .gitignore invalidates the result just like a changed directory
+        visited.update(rules.ignore_files)
+        with self._lock:
+            self._resolved[key] = (resolved, visited)
+        return list(resolved)
+
+
+# Shared by all extractors in the process so repeated runs reuse directory listings
+_default_resolver = PresetResolver()
+
+
+def resolve_entries(entries: Iterable[str], base_dir: str, settings=None,
+                    rules: Optional[IgnoreRules] = None, catalog: Optional[FileCatalog] = None) -> List[str]:
+    """Resolve preset entries with precompiled rules, or rules compiled from a settings mapping."""
+    if rules is None and settings is not None:
+        rules = IgnoreRules.from_settings(settings, base_dir=base_dir)
+    return _default_resolver.resolve(entries, base_dir, rules, catalog)
+
+
+__all__ = [
+    "is_glob",
+    "is_dynamic_entry",
+    "compile_glob",
+    "DirectoryCache",
+    "PresetResolver",
+    "resolve_entries",
+]
@@ -0,0 +1,272 @@
+# -*- coding: utf-8 -*-
+# preset_store.py
+
+"""
+SQLite-backed storage for preset file lists.
+
+settings.toml only keeps a reference per preset (PRESET_REFERENCE) plus the
+[preset_store] section pointing at the database. File lists are loaded lazily,
+one preset at a time, and membership checks use the (preset, path) index.
+"""
+
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from gui.path_trie import PathTrie
+
+PRESET_REFERENCE = "@preset_store"
+DEFAULT_STORE_PATH = "presets.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS presets (
+    name TEXT PRIMARY KEY,
+    next_position INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS preset_files (
+    preset TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    path TEXT NOT NULL,
+    PRIMARY KEY (preset, path)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_preset_files_order ON preset_files (preset, position);
+"""
+
+
+class PresetFiles(PathTrie):
+    """
+    In-memory preset contents: an ordered set with O(depth) membership, bulk
+    add/remove and cheap folder removal, sharing interned path segments.
+    Files are kept in the order they were added.
+    """
+
+    __slots__ = ()
+
+
+class PresetStore:
+    """Preset file lists in a SQLite database, safe to share between threads"""
+
+    # One store per database file and process, shared by the GUI and extractors
+    _instances: Dict[str, "PresetStore"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, db_path: str):
+        self.db_path = os.path.abspath(db_path)
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    @classmethod
+    def open(cls, db_path: str) -> "PresetStore":
+        """Return the shared store for 'db_path', opening it on first use."""
+        key = os.path.normcase(os.path.abspath(db_path))
+        with cls._instances_lock:
+            store = cls._instances.get(key)
+            if store is None:
+                store = cls(db_path)
+                cls._instances[key] = store
+            return store
+
+    @classmethod
+    def for_settings(cls, settings: Dict[str, Any], settings_path: str) -> "PresetStore":
+        """Open the store configured in a settings dict ([preset_store] path, relative to settings.toml)."""
+        store_path = settings.get('preset_store', {}).get('path') or DEFAULT_STORE_PATH
+        if not os.path.isabs(store_path):
+            store_path = os.path.join(os.path.dirname(os.path.abspath(settings_path)), store_path)
+        return cls.open(store_path)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+        with self._instances_lock:
+            self._instances.pop(os.path.normcase(self.db_path), None)
+
+    # ---- Presets ----
+
+    def names(self) -> List[str]:
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT name FROM presets ORDER BY rowid")]
+
+    def exists(self, name: str) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM presets WHERE name = ?", (name,)).fetchone() is not None
+
+    def create(self, name: str) -> None:
+        with self._lock:
+            self._conn.execute("INSERT OR IGNORE INTO presets (name) VALUES (?)", (name,))
+
+    def delete(self, name: str) -> None:
+        with self._lock, self._transaction():
+            self._conn.execute("DELETE FROM preset_files WHERE preset = ?", (name,))
+            self._conn.execute("DELETE FROM presets WHERE name = ?", (name,))
+
+    def count(self, name: str) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM preset_files WHERE preset = ?", (name,)).fetchone()[0]
+
+    # ---- Files ----
+
+    def iter_files(self, name: str, batch_size: int = 5000) -> Iterator[str]:
+        """Yield a preset's files in insertion order without materialising the list."""
+        position = -1
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT position, path FROM preset_files WHERE preset = ? AND position > ? "
+                    "ORDER BY position LIMIT ?",
+                    (name, position, batch_size),
+                ).fetchall()
+            if not rows:
+                return
+            for position, path in rows:
+                yield path
+
+    def get_files(self, name: str) -> List[str]:
+        with self._lock:
+            return [
+                row[0] for row in self._conn.execute(
+                    "SELECT path FROM preset_files WHERE preset = ? ORDER BY position", (name,)
+                )
+            ]
+
+    def contains(self, name: str, path: str) -> bool:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM preset_files WHERE preset = ? AND path = ?", (name, path)
+            ).fetchone() is not None
+
+    def set_files(self, name: str, files: Iterable[str]) -> None:
+        """Replace the preset's file list (duplicates keep their first position)."""
+        with self._lock, self._transaction():
+            self._conn.execute("INSERT OR IGNORE INTO presets (name) VALUES (?)", (name,))
+            self._conn.execute("DELETE FROM preset_files WHERE preset = ?", (name,))
+            self._conn.execute("UPDATE presets SET next_position = 0 WHERE name = ?", (name,))
+            self._insert(name, files)
+
+    def add_files(self, name: str, files: Iterable[str]) -> List[str]:
+        """Append files that are not yet in the preset. Returns the files actually added."""
+        with self._lock, self._transaction():
+            self._conn.execute("INSERT OR IGNORE INTO presets (name) VALUES (?)", (name,))
+            return self._insert(name, files)
+
+    def add_presets(self, presets: Dict[str, Iterable[str]]) -> Dict[str, List[str]]:
+        """Create or extend several presets in one transaction. Returns the files added per preset."""
+        added = {}
+        with self._lock, self._transaction():
+            for name, files in presets.items():
+                self._conn.execute("INSERT OR IGNORE INTO presets (name) VALUES (?)", (name,))
+                added[name] = self._insert(name, files)
+        return added
+
+    def remove_files(self, name: str, files: Iterable[str]) -> int:
+        """Remove files from the preset. Returns the number of files removed."""
+        with self._lock, self._transaction():
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "DELETE FROM preset_files WHERE preset = ? AND path = ?", ((name, path) for path in files)
+            )
+            return self._conn.total_changes - before
+
+    def remove_folder(self, name: str, folder: str) -> int:
+        """
+        Remove 'folder' and the literal paths below it (a range scan on the primary key).
+        Pattern entries ('src/**/*.py', 'src/gen/') stay, as in PresetFiles.remove_prefix.
+        """
+        folder = folder.rstrip('/')
+        with self._lock, self._transaction():
+            before = self._conn.total_changes
+            # '0' is the character after '/', so the range covers exactly 'folder/...'
+            self._conn.execute(
+                "DELETE FROM preset_files WHERE preset = ? AND (path = ? OR (path >= ? AND path < ?))"
+                " AND instr(path, '*') = 0 AND instr(path, '?') = 0 AND instr(path, '[') = 0"
+                " AND substr(path, -1) != '/'",
+                (name, folder, folder + '/', folder + '0'),
+            )
+            return self._conn.total_changes - before
+
+    def _insert(self, name: str, files: Iterable[str]) -> List[str]:
+        position = self._conn.execute(
+            "SELECT next_position FROM presets WHERE name = ?", (name,)
+        ).fetchone()[0]
+        added = []
+        cursor = self._conn.cursor()
+        for path in files:
+            cursor.execute(
+                "INSERT OR IGNORE INTO preset_files (preset, position, path) VALUES (?, ?, ?)",
+                (name, position, path),
+            )
+            if cursor.rowcount:
+                added.append(path)
+                position += 1
+        self._conn.execute("UPDATE presets SET next_position = ? WHERE name = ?", (position, name))
+        return added
+
+    def _transaction(self):
+        return _Transaction(self._conn)
+
+
+class _Transaction:
+    """BEGIN/COMMIT around a block for an autocommit connection (ROLLBACK on error)"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+
+    def __enter__(self):
+        self._conn.execute("BEGIN")
+        return self._conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self._conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
+
+
+def is_preset_reference(value: Any) -> bool:
+    return isinstance(value, str) and value == PRESET_REFERENCE
+
+
+def resolve_preset_files(settings: Dict[str, Any], settings_path: str, preset_name: str) -> Optional[List[str]]:
+    """
+    Return the file list of 'preset_name' from a plain settings dict, following
+    store references. Inline lists (older settings files) are de-duplicated in order.
+    """
+    value = settings.get('presets', {}).get(preset_name)
+    if isinstance(value, (list, tuple)):
+        return PresetFiles(value).to_list()
+    if is_preset_reference(value):
+        # Same de-duplication and order as the GUI's in-memory PresetFiles
+        return PresetFiles(PresetStore.for_settings(settings, settings_path).iter_files(preset_name)).to_list()
+    return None
+
+
+def select_presets(settings: Dict[str, Any], presets: Optional[Iterable[str]] = None) -> List[str]:
+    """
+    Names of the presets to extract. 'presets' is an explicit subset; without it
+    only the current preset runs (all presets if no valid current preset is set).
+    """
+    available = [name for name in settings.get('presets', {}) if name != 'current_preset']
+    if presets is None:
+        current = settings.get('presets', {}).get('current_preset')
+        return [current] if current in available else available
+    known = set(available)
+    selected = []
+    for name in dict.fromkeys(presets):
+        if name in known:
+            selected.append(name)
+        else:
+            print(f"Skipping unknown preset '{name}'")
+    return selected
+
+
+__all__ = [
+    "PRESET_REFERENCE",
+    "DEFAULT_STORE_PATH",
+    "PresetFiles",
+    "PresetStore",
+    "is_preset_reference",
+    "resolve_preset_files",
+    "select_presets",
+]
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+# read_scheduler.py
+
+"""
+Read-ahead in on-disk order for cold-cache extractions.
+
+Extractors read files in preset order, which on spinning disks and some
+network filesystems is a random seek per file. A ReadScheduler walks the same
+files in (st_dev, st_ino) order on a background thread, which on ext4/XFS/NTFS
+roughly follows where the files were allocated, and asks the kernel to read
+them ahead (posix_fadvise WILLNEED, or a plain read where that is missing).
+The extractor still reads and emits in its own order, now mostly from the
+page cache. At most 'window' bytes are hinted ahead of the reads.
+"""
+
+import os
+import stat as stat_module
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from gui import constants
+from gui.file_reader import FileReader
+
+
+def locality_key(path: str, stat: os.stat_result) -> Tuple:
+    """Sort key approximating on-disk position: device, then inode number, then path."""
+    return stat.st_dev, stat.st_ino, path
+
+
+def _prefetch(path: str, ranges: List[Tuple[int, int]]) -> None:
+    if hasattr(os, 'posix_fadvise'):
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            for offset, length in ranges:
+                os.posix_fadvise(fd, offset, length, os.POSIX_FADV_WILLNEED)
+        finally:
+            os.close(fd)
+        return
+    # No read-ahead hint here (Windows, macOS): read and drop, which fills the OS cache the same way
+    with open(path, 'rb', buffering=0) as f:
+        for offset, length in ranges:
+            f.seek(offset)
+            while length > 0:
+                chunk = f.read(min(length, constants.READ_CHUNK_SIZE))
+                if not chunk:
+                    break
+                length -= len(chunk)
+
+
+class ReadScheduler:
+    """Background read-ahead of the files an extractor is about to read; call consumed() after each read"""
+
+    def __init__(self, reader: FileReader, files: Iterable[Tuple[str, Optional[os.stat_result]]],
+                 enabled: bool = True, window: int = constants.READ_AHEAD_WINDOW_MB * 1024 * 1024):
+        """'files' pairs paths with a stat result where the caller has one; the rest are stat'ed on the thread."""
+        self.reader = reader
+        self.enabled = enabled
+        self.window = window
+        self._files = list(files) if enabled else []
+        self._cond = threading.Condition()
+        self._pending: Dict[str, int] = {}  # hinted but not read yet: path -> bytes
+        self._outstanding = 0
+        self._consumed: Set[str] = set()
+        self._stopped = False
+        self.hinted = 0
+        self.failed = 0
+
+    @classmethod
+    def from_settings(cls, settings, reader: FileReader,
+                      files: Iterable[Tuple[str, Optional[os.stat_result]]]) -> "ReadScheduler":
+        """Scheduler enabled by files.read_scheduler."""
+        enabled = bool(settings.get('files', {}).get('read_scheduler', constants.READ_SCHEDULER))
+        return cls(reader, files, enabled=enabled)
+
+    def start(self) -> None:
+        if self._files:
+            threading.Thread(target=self._run, name="read-scheduler", daemon=True).start()
+
+    def stop(self) -> None:
+        """Stop issuing hints; a hint stuck on slow storage is left to its daemon thread."""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if self._files:
+            print(f"Read scheduler: {self.hinted} of {len(self._files)} files read ahead in disk order"
+                  + (f", {self.failed} failed" if self.failed else ""))
+
+    def consumed(self, path: str) -> None:
+        """Report that 'path' has been read (or will not be), freeing its share of the window."""
+        if not self.enabled:
+            return
+        with self._cond:
+            self._consumed.add(path)
+            self._outstanding -= self._pending.pop(path, 0)
+            self._cond.notify_all()
+
+    def _ordered(self) -> List[Tuple[str, os.stat_result]]:
+        files = []
+        for path, stat in self._files:
+            if stat is None:
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+            if stat_module.S_ISREG(stat.st_mode):
+                files.append((path, stat))
+        files.sort(key=lambda item: locality_key(*item))
+        return files
+
+    def _run(self) -> None:
+        for path, stat in self._ordered():
+            ranges = self.reader.read_ranges(stat.st_size)
+            size = sum(length for _, length in ranges)
+            if not size:
+                continue
+            with self._cond:
+                # A single file larger than the window is still hinted once nothing else is pending
+                while not self._stopped and self._outstanding and self._outstanding + size > self.window:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                if path in self._consumed:
+                    continue
+                self._pending[path] = size
+                self._outstanding += size
+            try:
+                _prefetch(path, ranges)
+                self.hinted += 1
+            except OSError:
+                self.failed += 1
+
+
+__all__ = [
+    "locality_key",
+    "ReadScheduler",
+]
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+# scan_worker.py
+
+import os
+import time
+from typing import Iterable, List, Optional
+
+from PySide6.QtCore import QThread, Signal
+
+from gui import constants
+from gui.file_catalog import FileCatalog
+from gui.ignore_rules import IgnoreRules
+from gui.tree_walker import walk_tree
+
+
+class ScanWorker(QThread):
+    """
+    Background directory scan for "Add Folder" and "Auto Preset".
+
+    In 'files' mode paths below 'root' are streamed in batches through
+    files_found; in 'presets' mode every directory with files is reported
+    through preset_found. Paths are relative to 'base_dir' with '/' separators.
+    The worker never touches settings; the GUI thread commits the results.
+    Pass precompiled 'rules' to share them with other walkers; otherwise they
+    are compiled from the ignore lists. Rules compiled for a directory above
+    'root' (the project base) are matched relative to that directory. With a
+    'catalog', unchanged directories are read from the persistent file catalog
+    instead of being listed.
+    With follow_symlinks, symlinked directories are scanned too (each once).
+    """
+
+    MODE_FILES = "files"
+    MODE_PRESETS = "presets"
+
+    # Signals
+    files_found = Signal(list)          # batch of relative file paths
+    preset_found = Signal(str, list)    # preset name, relative file paths
+    progress_updated = Signal(int)      # directories scanned so far
+    scan_finished = Signal(bool)        # True if the scan was cancelled
+    scan_error = Signal(str)
+
+    def __init__(self, root: str, base_dir: str, mode: str = MODE_FILES,
+                 ignored_directories: Iterable[str] = (), ignored_files: Iterable[str] = (),
+                 ignored_extensions: Iterable[str] = (), skip_hidden_files: bool = False,
+                 batch_size: int = constants.SCAN_BATCH_SIZE, rules: Optional[IgnoreRules] = None,
+                 catalog: Optional[FileCatalog] = None, follow_symlinks: bool = False):
+        super().__init__()
+        self.root = os.path.abspath(root)
+        self.base_dir = os.path.abspath(base_dir) if base_dir else self.root
+        self.mode = mode
+        self.rules = rules or IgnoreRules(
+            ignored_directories, ignored_files, ignored_extensions,
+            base_dir=self.root, skip_hidden_files=skip_hidden_files,
+        )
+        self.catalog = catalog
+        self.follow_symlinks = follow_symlinks
+        self.batch_size = batch_size
+        self._stop_requested = False
+
+    def stop(self):
+        """Request the scan to stop after the current directory"""
+        self._stop_requested = True
+
+    def _relative(self, path: str) -> str:
+        try:
+            rel = os.path.relpath(path, self.base_dir)
+        except ValueError:
+            # Different drive than base_dir: keep the absolute path
+            rel = path
+        if rel.startswith('..'):
+            rel = path
+        return rel.replace('\\', '/')
+
+    def _rules_root(self) -> str:
+        """'root' relative to the directory the rules were compiled for ('' if it is not below it)."""
+        rules_base = self.rules.base_dir
+        if not rules_base:
+            return ""
+        try:
+            rel = os.path.relpath(self.root, rules_base)
+        except ValueError:
+            return ""
+        return "" if rel == '.' or rel.startswith('..') else rel.replace('\\', '/')
+
+    def run(self):
+        """Walk the tree, pruning ignored directories before descending"""
+        try:
+            batch: List[str] = []
+            last_emit = time.monotonic()
+            scanned = 1
+            directory = self.root
+            kept: List[str] = []
+
+            def flush_directory():
+                # One preset per directory below the base directory
+                if kept and os.path.normpath(directory) != os.path.normpath(self.base_dir):
+                    self.preset_found.emit(self._relative(directory), list(kept))
+
+            # Directory entries precede their files; rules match paths relative to their base directory
+            for entry in walk_tree(self.root, self.rules, include_dirs=True, with_stat=False,
+                                   should_stop=lambda: self._stop_requested, catalog=self.catalog,
+                                   follow_symlinks=self.follow_symlinks, rel_root=self._rules_root()):
+                if self._stop_requested:
+                    break
+                if entry.is_dir:
+                    if self.mode == self.MODE_PRESETS:
+                        flush_directory()
+                        kept = []
+                    directory = entry.path
+                    scanned += 1
+                    if scanned % 100 == 0:
+                        self.progress_updated.emit(scanned)
+                    continue
+
+                path = self._relative(entry.path)
+                if self.mode == self.MODE_PRESETS:
+                    kept.append(path)
+                    continue
+                batch.append(path)
+                now = time.monotonic()
+                if len(batch) >= self.batch_size or now - last_emit >= constants.SCAN_EMIT_INTERVAL:
+                    self.files_found.emit(batch)
+                    batch = []
+                    last_emit = now
+
+            if not self._stop_requested:
+                if self.mode == self.MODE_PRESETS:
+                    flush_directory()
+                elif batch:
+                    self.files_found.emit(batch)
+            print(f"Ignore rules: {self.rules.stats()}")
+            if self.catalog is not None:
+                print(f"File catalog: {self.catalog.stats()}")
+            self.scan_finished.emit(self._stop_requested)
+
+        except Exception as e:
+            print(f"Scan error: {e}")
+            self.scan_error.emit(str(e))
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+# settings_cache.py
+
+"""
+JSON cache of parsed and normalized settings.
+
+The cache sits next to settings.toml and records the TOML file's mtime, size
+and BLAKE2 digest together with the working directory (relative paths are
+resolved against it). A cache entry is only used when all of them match, so a
+hit skips TOML parsing and every Path.resolve() call without ever returning
+stale settings. The payload is plain dicts, lists and scalars, so it is stored
+as JSON: reading the cache can never run code, whoever wrote the file.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from typing import Any, Dict, Optional
+
+from gui import constants
+
+CACHE_VERSION = 2
+
+
+def cache_path_for(settings_path: str) -> str:
+    return f"{settings_path}{constants.SETTINGS_CACHE_SUFFIX}"
+
+
+def content_digest(content: bytes) -> str:
+    return hashlib.blake2b(content, digest_size=20).hexdigest()
+
+
+def _key(settings_path: str, content: bytes) -> Dict[str, Any]:
+    stat = os.stat(settings_path)
+    return {
+        "version": CACHE_VERSION,
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "digest": content_digest(content),
+        "cwd": os.getcwd(),
+    }
+
+
+def copy_file_mode(target_path: str, tmp_path: str) -> None:
+    """
+    Give a mkstemp file (always 0600) the mode 'target_path' has, or would get
+    as a new file, before it replaces the target.
+    """
+    if os.path.exists(target_path):
+        shutil.copymode(target_path, tmp_path)
+    else:
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(tmp_path, 0o666 & ~umask)
+
+
+def load_cached_settings(settings_path: str, content: bytes) -> Optional[Dict[str, Any]]:
+    """Return the cached settings for this exact file content, or None on any mismatch."""
+    try:
+        with open(cache_path_for(settings_path), 'r', encoding='utf-8') as f:
+            entry = json.load(f)
+        if not isinstance(entry, dict) or entry.get("key") != _key(settings_path, content):
+            return None
+        data = entry["data"]
+        return data if isinstance(data, dict) else None
+    except Exception:
+        # Missing, unreadable or from another version: fall back to parsing
+        return None
+
+
+def store_cached_settings(settings_path: str, content: bytes, data: Dict[str, Any]) -> None:
+    """Write the normalized settings for 'content' (the bytes currently in settings_path)."""
+    cache_path = cache_path_for(settings_path)
+    try:
+        entry = {"key": _key(settings_path, content), "data": data}
+        fd, tmp_path = tempfile.mkstemp(
+            prefix=f".{os.path.basename(cache_path)}.", suffix=".tmp", dir=os.path.dirname(cache_path) or "."
+        )
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False, separators=(',', ':'))
+            copy_file_mode(cache_path, tmp_path)
+            os.replace(tmp_path, cache_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    except Exception as e:
+        print(f"Error writing settings cache: {e}")
+
+
+__all__ = [
+    "cache_path_for",
+    "copy_file_mode",
+    "load_cached_settings",
+    "store_cached_settings",
+]
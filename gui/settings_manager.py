@@ -3,10 +3,16 @@
 
 import os
 import toml
-from dataclasses import dataclass
-from typing import Dict, Any, Optional, List
+import tempfile
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional, List, Iterable, Iterator
 from pathlib import Path
-from PySide6.QtCore import QObject, Signal
+from PySide6.QtCore import QObject, Signal, QTimer
+
+from gui import constants
+from gui.preset_store import PresetFiles, PresetStore, PRESET_REFERENCE, DEFAULT_STORE_PATH, is_preset_reference
+from gui.settings_snapshot import SettingsSnapshot, loads_settings
+from gui.settings_cache import copy_file_mode, load_cached_settings, store_cached_settings
 
 @dataclass
 class SettingsData:
@@ -17,7 +23,8 @@ class SettingsData:
     file_specific: Dict[str, Any]
     output: Dict[str, str]
     metrics: Dict[str, str]
-    presets: Dict[str, list]
+    presets: Dict[str, Any]  # preset name -> PRESET_REFERENCE, plus 'current_preset'
+    preset_store: Dict[str, str] = field(default_factory=lambda: {"path": DEFAULT_STORE_PATH})
 
 class SettingsManager(QObject):
     """Settings Manager for application configuration"""
@@ -29,6 +36,18 @@ class SettingsManager(QObject):
         super().__init__()
         self._settings_path = Path(settings_path).resolve()
         self._settings: Optional[SettingsData] = None
+        self._preset_store: Optional[PresetStore] = None
+        # In-memory ordered sets of loaded presets, kept in step with the store
+        self._preset_files: Dict[str, PresetFiles] = {}
+
+        # Write-behind persistence: changes mark the settings dirty and a single
+        # debounced save writes them, coalescing bursts of updates into one write
+        self._dirty = False
+        self._save_timer = QTimer(self)
+        self._save_timer.setSingleShot(True)
+        self._save_timer.setInterval(constants.SETTINGS_SAVE_DEBOUNCE_MS)
+        self._save_timer.timeout.connect(self.flush)
+
         self._load_settings()
     
     def _create_default_settings(self) -> SettingsData:
@@ -47,7 +66,8 @@ class SettingsManager(QObject):
                 "ignored_extensions": [".exe", ".dll"],
                 "ignored_files": ["file_to_ignore.txt"]
             },
-            directories={"ignored_directories": ["dir_to_ignore"]},
+            directories={"ignored_directories": ["dir_to_ignore"], "use_ignore_files": True,
+                         "use_file_catalog": True, "follow_symlinks": False},
             file_specific={
                 "use_file_specific": False,
                 "specific_files": [""]
@@ -57,7 +77,7 @@ class SettingsManager(QObject):
                 "csv_file_prefix": "Detailed_Project"
             },
             metrics={"size_unit": "KB"},
-            presets={"default": [], "current_preset": "default"}  # Added current_preset
+            presets={"default": PRESET_REFERENCE, "current_preset": "default"}  # Added current_preset
         )
     
     def _load_settings(self) -> None:
@@ -65,12 +85,26 @@ class SettingsManager(QObject):
         try:
             if not self._settings_path.exists():
                 self._settings = self._create_default_settings()
+                self._migrate_presets()
                 self._save_settings()
                 return
 
-            with self._settings_path.open('r', encoding='utf-8') as f:
-                content = f.read().replace('\\', '/')
-                data = toml.loads(content)
+            raw = self._settings_path.read_bytes()
+            
+            # Fast path: parsed and normalized settings for exactly this file content
+            data = load_cached_settings(str(self._settings_path), raw)
+            if data is not None:
+                try:
+                    self._settings = SettingsData(**data)
+                except TypeError:
+                    # Sections that do not fit SettingsData: parse the TOML instead
+                    self._settings = None
+                else:
+                    self._migrate_presets()
+                    return
+            
+            content = raw.decode('utf-8').replace('\\', '/')
+            data = loads_settings(content)
                 
             # Convert loaded data to SettingsData
             self._settings = SettingsData(**data)
@@ -80,11 +114,35 @@ class SettingsManager(QObject):
                 self._settings.presets['current_preset'] = next(iter(self._settings.presets.keys()), "default")
                 
             self._normalize_paths()
+            self._migrate_presets()
+            if not self._dirty:
+                # A pending save re-caches the migrated settings instead
+                store_cached_settings(str(self._settings_path), raw, self._settings_dict())
             
         except Exception as e:
             print(f"Error loading settings: {e}")
             self._settings = self._create_default_settings()
+            self._migrate_presets()
             self._save_settings()
+
+    def _migrate_presets(self) -> None:
+        """Move inline preset lists into the preset store, leaving references in settings.toml"""
+        store_path = self._settings.preset_store.get("path") or DEFAULT_STORE_PATH
+        if not os.path.isabs(store_path):
+            store_path = str(self._settings_path.parent / store_path)
+        self._preset_store = PresetStore.open(store_path)
+
+        for name, value in list(self._settings.presets.items()):
+            if name == "current_preset":
+                continue
+            if isinstance(value, list):
+                self._preset_store.set_files(name, [item for item in value if isinstance(item, str) and item])
+                self._settings.presets[name] = PRESET_REFERENCE
+                self._dirty = True
+            elif is_preset_reference(value):
+                self._preset_store.create(name)
+        if self._dirty:
+            self._save_timer.start()
     
     def _normalize_paths(self) -> None:
         """Normalize all paths in settings"""
@@ -103,7 +161,7 @@ class SettingsManager(QObject):
         self._settings.paths = normalize(self._settings.paths)
     
     def _save_settings(self) -> None:
-        """Save settings with proper path handling"""
+        """Save settings atomically (temp file + replace) with proper path handling"""
         if not self._settings:
             return
             
@@ -112,16 +170,55 @@ class SettingsManager(QObject):
             self._settings_path.parent.mkdir(parents=True, exist_ok=True)
             
             # Convert SettingsData to dict and save
-            settings_dict = {
-                field: getattr(self._settings, field)
-                for field in self._settings.__annotations__
-            }
+            settings_dict = self._settings_dict()
+            content = toml.dumps(settings_dict).encode('utf-8')
             
-            with self._settings_path.open('w', encoding='utf-8') as f:
-                toml.dump(settings_dict, f)
+            # Write next to the target so os.replace stays on one filesystem
+            fd, tmp_path = tempfile.mkstemp(
+                prefix=f".{self._settings_path.name}.", suffix=".tmp", dir=str(self._settings_path.parent)
+            )
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(content)
+                    f.flush()
+                    os.fsync(f.fileno())
+                # Keep the permissions of the file being replaced (mkstemp creates 0600)
+                copy_file_mode(str(self._settings_path), tmp_path)
+                os.replace(tmp_path, self._settings_path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+            self._dirty = False
+            # The in-memory settings are already normalized; cache them for the next start
+            store_cached_settings(str(self._settings_path), content, settings_dict)
                 
         except Exception as e:
             print(f"Error saving settings: {e}")
+
+    def _settings_dict(self) -> Dict[str, Any]:
+        """SettingsData as a plain dict of sections"""
+        return {
+            field: getattr(self._settings, field)
+            for field in self._settings.__annotations__
+        }
+
+    def _schedule_save(self) -> None:
+        """Mark settings dirty and (re)start the debounce timer"""
+        self._dirty = True
+        self._save_timer.start()
+
+    def flush(self) -> None:
+        """Write pending changes to disk immediately (e.g. on application close)"""
+        self._save_timer.stop()
+        if self._dirty:
+            self._save_settings()
+
+    @property
+    def has_unsaved_changes(self) -> bool:
+        """True while changes are waiting for the debounced save"""
+        return self._dirty
     
     def update_setting(self, section: str, key: str, value: Any) -> None:
         """Update a setting value, create it if missing, and emit change signal"""
@@ -136,7 +233,16 @@ class SettingsManager(QObject):
 
         # Special handling for current_preset to ensure it's a string, not a list
         if section == "presets" and key == "current_preset":
-            section_dict[key] = value
+            if section_dict.get(key) != value:
+                section_dict[key] = value
+                self._schedule_save()
+        # Preset file lists live in the preset store; settings.toml only keeps the reference
+        elif section == "presets":
+            files = value if isinstance(value, list) else [value]
+            if key not in section_dict:
+                self.set_preset_files(key, files)
+            else:
+                self.add_preset_files(key, files)
         # Standard handling for other settings
         elif isinstance(section_dict, dict):
             if key not in section_dict:
@@ -144,12 +250,12 @@ class SettingsManager(QObject):
                 section_dict[key] = value if isinstance(value, list) else [value]
             elif isinstance(section_dict[key], list) and isinstance(value, list):
                 # Append items to an existing list if `value` is a list
-                section_dict[key] = list(set(section_dict[key] + value))  # Remove duplicates
+                section_dict[key] = list(dict.fromkeys(section_dict[key] + value))  # Remove duplicates, keep order
             else:
                 section_dict[key] = value
 
-            # Save the updated settings to the file
-            self._save_settings()
+            # Persist via the debounced write-behind save
+            self._schedule_save()
             self.settings_changed.emit()
         else:
             print(f"Section '{section}' is not a dictionary or does not exist in settings.")
@@ -165,6 +271,11 @@ class SettingsManager(QObject):
         """Property to access settings data"""
         return self._settings
 
+    def snapshot(self) -> SettingsSnapshot:
+        """Frozen, normalized copy of the current in-memory settings for extraction workers"""
+        settings_dict = self._settings_dict() if self._settings else {}
+        return SettingsSnapshot(settings_dict, str(self._settings_path))
+
     def get_setting(self, section: str, key: Optional[str] = None, default: Any = None) -> Any:
         """Safely get a setting value or entire section if key is None"""
         if not self._settings or not hasattr(self._settings, section):
@@ -173,7 +284,11 @@ class SettingsManager(QObject):
         section_dict = getattr(self._settings, section)
         if key is None:
             return section_dict
-        return section_dict.get(key, default)
+        value = section_dict.get(key, default)
+        if section == "presets" and is_preset_reference(value):
+            # Lazily load only the requested preset's files
+            return self._load_preset(key).to_list()
+        return value
     
     def get_section(self, section: str, default: Any = None) -> Any:
         """Retrieve the entire section dictionary"""
@@ -194,12 +309,121 @@ class SettingsManager(QObject):
                 return
                 
             del section_dict[key]
+            if section == "presets":
+                self._preset_store.delete(key)
+                self._preset_files.pop(key, None)
             
             # If we removed the current preset, update current_preset to another preset
             if section == "presets" and section_dict.get("current_preset") == key:
                 next_preset = next(iter([k for k in section_dict.keys() if k != "current_preset"]), "")
                 section_dict["current_preset"] = next_preset
             
-            self._save_settings()
+            self._schedule_save()
             self.settings_changed.emit()
 
+    # ---- Preset helpers ----
+
+    @property
+    def preset_store(self) -> Optional[PresetStore]:
+        """The store holding preset file lists"""
+        return self._preset_store
+
+    def preset_names(self) -> List[str]:
+        """Names of all presets, in settings order"""
+        if not self._settings:
+            return []
+        return [name for name in self._settings.presets if name != "current_preset"]
+
+    def _is_preset(self, preset_name: str) -> bool:
+        return bool(self._settings) and preset_name != "current_preset" and preset_name in self._settings.presets
+
+    def _load_preset(self, preset_name: str) -> PresetFiles:
+        """Ordered set of a preset's files, loaded from the store on first use"""
+        files = self._preset_files.get(preset_name)
+        if files is None:
+            files = PresetFiles(self._preset_store.iter_files(preset_name))
+            self._preset_files[preset_name] = files
+        return files
+
+    def get_preset_files(self, preset_name: str) -> List[str]:
+        """One preset's files, in order"""
+        if not self._is_preset(preset_name):
+            return []
+        return self._load_preset(preset_name).to_list()
+
+    def iter_preset_files(self, preset_name: str) -> Iterator[str]:
+        """Iterate a preset's files in batches without loading the whole list"""
+        if not self._is_preset(preset_name):
+            return iter(())
+        if preset_name in self._preset_files:
+            return iter(self._preset_files[preset_name].to_list())
+        return self._preset_store.iter_files(preset_name)
+
+    def preset_contains(self, preset_name: str, path: str) -> bool:
+        """Membership check, O(path depth) in the preset trie"""
+        if not self._is_preset(preset_name):
+            return False
+        return path in self._load_preset(preset_name)
+
+    def add_preset_files(self, preset_name: str, files: Iterable[str]) -> List[str]:
+        """Append files not yet in the preset (creating it if needed). Returns the files added."""
+        if not self._settings:
+            return []
+        if not self._is_preset(preset_name):
+            self.set_preset_files(preset_name, files)
+            return self._load_preset(preset_name).to_list()
+        added = self._load_preset(preset_name).add_many(files)
+        if added:
+            self._preset_store.add_files(preset_name, added)
+            self.settings_changed.emit()
+        return added
+
+    def add_presets(self, presets: Dict[str, Iterable[str]]) -> None:
+        """Create or extend several presets with one store transaction and one settings write"""
+        if not self._settings or not presets:
+            return
+        pending = {}
+        for name, files in presets.items():
+            if name == "current_preset":
+                continue
+            if self._is_preset(name):
+                pending[name] = self._load_preset(name).add_many(files)
+            else:
+                self._settings.presets[name] = PRESET_REFERENCE
+                self._preset_files[name] = PresetFiles(files)
+                pending[name] = self._preset_files[name]
+        self._preset_store.add_presets(pending)
+        self._schedule_save()
+        self.settings_changed.emit()
+
+    def remove_preset_files(self, preset_name: str, files: Iterable[str]) -> List[str]:
+        """Remove files from the preset in one batch. Returns the files removed."""
+        if not self._is_preset(preset_name):
+            return []
+        removed = self._load_preset(preset_name).remove_many(files)
+        if removed:
+            self._preset_store.remove_files(preset_name, removed)
+            self.settings_changed.emit()
+        return removed
+
+    def remove_preset_folder(self, preset_name: str, folder: str) -> int:
+        """Remove a folder and the files below it (not pattern entries). Returns the number removed."""
+        if not self._is_preset(preset_name):
+            return 0
+        removed = self._load_preset(preset_name).remove_prefix(folder)
+        if removed:
+            self._preset_store.remove_folder(preset_name, folder)
+            self.settings_changed.emit()
+        return removed
+
+    def set_preset_files(self, preset_name: str, files: Iterable[str]) -> None:
+        """Replace a preset's file list"""
+        if not self._settings:
+            return
+        if preset_name not in self._settings.presets:
+            self._settings.presets[preset_name] = PRESET_REFERENCE
+            self._schedule_save()
+        preset_files = PresetFiles(files)
+        self._preset_store.set_files(preset_name, preset_files)
+        self._preset_files[preset_name] = preset_files
+        self.settings_changed.emit()
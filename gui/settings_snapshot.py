@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+# settings_snapshot.py
+
+"""
+Immutable, pre-normalized settings handed from the GUI (or a script) to the
+extractors, so workers neither re-read settings.toml nor re-normalize paths.
+"""
+
+import os
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import Any, Dict, Iterator, Optional
+
+import toml
+
+try:
+    import tomllib  # Python 3.11+, C-accelerated parsing
+except ImportError:
+    tomllib = None
+
+TOML_DECODE_ERRORS = (toml.TomlDecodeError,) + ((tomllib.TOMLDecodeError,) if tomllib else ())
+
+
+def load_settings_file(settings_path: str) -> Dict[str, Any]:
+    """Parse a settings file, preferring the stdlib tomllib parser when available."""
+    if tomllib is not None:
+        with open(settings_path, 'rb') as f:
+            return tomllib.load(f)
+    return toml.load(settings_path)
+
+
+def loads_settings(content: str) -> Dict[str, Any]:
+    """Parse settings from a string, preferring tomllib."""
+    if tomllib is not None:
+        return tomllib.loads(content)
+    return toml.loads(content)
+
+
+def normalize_path_value(value: Any) -> Any:
+    """Normalize a string that looks like a path to forward slashes; leave other values as-is."""
+    if isinstance(value, str) and ('/' in value or '\\' in value):
+        return os.path.normpath(value).replace('\\', '/')
+    return value
+
+
+def normalize_settings_paths(settings_dict: Dict[str, Any]) -> None:
+    """Recursively normalize all paths in a settings dict, in place."""
+    for section in settings_dict:
+        if not isinstance(settings_dict[section], dict):
+            continue
+        for key, value in settings_dict[section].items():
+            if isinstance(value, str):
+                settings_dict[section][key] = normalize_path_value(value)
+            elif isinstance(value, list):
+                settings_dict[section][key] = [normalize_path_value(item) for item in value]
+            elif isinstance(value, dict):
+                normalize_settings_paths(value)
+
+
+def freeze(value: Any) -> Any:
+    """Deep-freeze dicts into read-only mappings and lists into tuples."""
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Inverse of freeze(): plain dicts and lists, e.g. for toml.dump."""
+    if isinstance(value, Mapping):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(item) for item in value]
+    return value
+
+
+class SettingsSnapshot(Mapping):
+    """Read-only, pre-normalized settings; sections behave like dicts, lists are tuples"""
+
+    __slots__ = ('_data', 'settings_path')
+
+    def __init__(self, data: Dict[str, Any], settings_path: Optional[str] = None, normalized: bool = False):
+        data = thaw(data)
+        if not normalized:
+            normalize_settings_paths(data)
+        # Extractors format paths Windows-style unless told otherwise
+        data.setdefault('paths', {}).setdefault('path_style', 'windows')
+        self._data = freeze(data)
+        self.settings_path = os.path.normpath(settings_path).replace('\\', '/') if settings_path else None
+
+    @classmethod
+    def from_file(cls, settings_path: str) -> "SettingsSnapshot":
+        """Parse and normalize a settings file once."""
+        return cls(load_settings_file(settings_path), settings_path)
+
+    def __getitem__(self, key: str) -> Any:
+        return self._data[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __repr__(self) -> str:
+        return f"SettingsSnapshot(sections={list(self._data)}, settings_path={self.settings_path!r})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """A mutable deep copy of the settings."""
+        return thaw(self._data)
+
+
+__all__ = [
+    "TOML_DECODE_ERRORS",
+    "load_settings_file",
+    "loads_settings",
+    "normalize_settings_paths",
+    "SettingsSnapshot",
+    "freeze",
+    "thaw",
+]
@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+# tree_walker.py
+
+"""
+Shared directory walker built on os.scandir.
+
+Each directory is listed once and the DirEntry's type and stat data travel with
+the yielded entry, so callers never stat a file again for its size or mtime.
+(On Windows that data comes with the listing; on POSIX it costs one stat per
+file, so walkers that only need paths pass with_stat=False.)
+With a FileCatalog, unchanged directories are not listed again at all.
+The next directories in walk order are listed ahead in a thread pool (os.scandir
+and stat release the GIL) at every depth, and each directory's entries are
+yielded as soon as it has been listed, in a stable order: files of a directory
+sorted by name, then its subdirectories depth first.
+Symlinked directories are only entered with follow_symlinks; every directory
+is then identified by (st_dev, st_ino) and entered once per walk, which stops
+symlink loops and trees reachable through several links.
+"""
+
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Hashable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+from gui import constants
+from gui.file_catalog import FileCatalog
+from gui.file_identity import file_key
+from gui.ignore_rules import IgnoreRules
+
+# Directories listed ahead of the consumer per pool thread
+_LOOKAHEAD_PER_WORKER = 4
+
+
+class WalkEntry(NamedTuple):
+    path: str        # absolute path (os separators)
+    rel_path: str    # path relative to the walk root (or to rel_root's base), '/' separated
+    is_dir: bool
+    size: int        # -1 when walked with_stat=False
+    mtime_ns: int
+    stat: Optional[os.stat_result] = None  # files walked with_stat (for st_dev/st_ino)
+
+
+class _VisitedDirectories:
+    """Identity (file_key) of the directories entered so far in one walk"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._seen: Set[Hashable] = set()
+        self.skipped = 0
+
+    def enter(self, directory: str) -> bool:
+        """False if 'directory' (after resolving links) was already entered or cannot be stat'ed."""
+        try:
+            stat = os.stat(directory)
+        except OSError:
+            return False
+        # Without inode numbers (some network and FUSE filesystems) the resolved path is the identity
+        key = file_key(directory, stat)
+        with self._lock:
+            if key in self._seen:
+                self.skipped += 1
+                return False
+            self._seen.add(key)
+        return True
+
+
+def _scan_cataloged(directory: str, rel_dir: str, rules: Optional[IgnoreRules], include_dirs: bool,
+                    with_stat: bool, catalog: FileCatalog) -> Tuple[List[WalkEntry], List[WalkEntry]]:
+    """Like _scan_directory, with names from the catalog (already sorted)."""
+    files: List[WalkEntry] = []
+    dirs: List[WalkEntry] = []
+    prefix = f"{rel_dir}/" if rel_dir else ""
+    file_names, dir_names = catalog.listdir(directory)
+    for name in dir_names:
+        rel_path = prefix + name
+        if rules is not None and rules.skip_dir(rel_path):
+            continue
+        path = os.path.join(directory, name)
+        mtime = -1
+        if include_dirs and with_stat:
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                continue
+        dirs.append(WalkEntry(path, rel_path, True, 0, mtime))
+    for name in file_names:
+        rel_path = prefix + name
+        if rules is not None and rules.skip_file(rel_path):
+            continue
+        path = os.path.join(directory, name)
+        if with_stat:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            files.append(WalkEntry(path, rel_path, False, stat.st_size, stat.st_mtime_ns, stat))
+        else:
+            files.append(WalkEntry(path, rel_path, False, -1, -1))
+    return files, dirs
+
+
+def _scan_directory(directory: str, rel_dir: str, rules: Optional[IgnoreRules], include_dirs: bool,
+                    with_stat: bool, catalog: Optional[FileCatalog] = None,
+                    follow_symlinks: bool = False) -> Tuple[List[WalkEntry], List[WalkEntry]]:
+    """List one directory: (kept files, kept subdirectories), each sorted by name."""
+    if catalog is not None:
+        return _scan_cataloged(directory, rel_dir, rules, include_dirs, with_stat, catalog)
+    files: List[WalkEntry] = []
+    dirs: List[WalkEntry] = []
+    prefix = f"{rel_dir}/" if rel_dir else ""
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                rel_path = prefix + entry.name
+                try:
+                    if entry.is_dir(follow_symlinks=follow_symlinks):
+                        if rules is not None and rules.skip_dir(rel_path):
+                            continue
+                        stat = entry.stat() if include_dirs and with_stat else None
+                        dirs.append(WalkEntry(entry.path, rel_path, True,
+                                              0, stat.st_mtime_ns if stat else -1))
+                    elif entry.is_file():
+                        if rules is not None and rules.skip_file(rel_path):
+                            continue
+                        if with_stat:
+                            stat = entry.stat()
+                            files.append(WalkEntry(entry.path, rel_path, False, stat.st_size, stat.st_mtime_ns,
+                                                   stat))
+                        else:
+                            files.append(WalkEntry(entry.path, rel_path, False, -1, -1))
+                except OSError:
+                    # Vanished or unreadable entry
+                    continue
+    except OSError as e:
+        print(f"Error scanning directory {directory}: {e}")
+    files.sort(key=lambda item: item.rel_path)
+    dirs.sort(key=lambda item: item.rel_path)
+    return files, dirs
+
+
+def walk_tree(root: str, rules: Optional[IgnoreRules] = None, include_dirs: bool = False,
+              with_stat: bool = True, max_workers: Optional[int] = None,
+              should_stop: Optional[Callable[[], bool]] = None,
+              catalog: Optional[FileCatalog] = None, follow_symlinks: bool = False,
+              rel_root: str = "") -> Iterator[WalkEntry]:
+    """
+    Yield the regular files below 'root' (and directories with include_dirs),
+    pruned by 'rules' before descending. Paths in 'rules' are matched relative to 'root',
+    or to the rules' base directory when 'rel_root' gives root's path below it.
+    Directory listings come from 'catalog' when given; with follow_symlinks,
+    symlinked directories are entered (each physical directory once) and the
+    catalog, which only records real directories, is not used.
+    """
+    root = os.path.abspath(root)
+    visited = None
+    if follow_symlinks:
+        visited = _VisitedDirectories()
+        visited.enter(root)
+        catalog = None
+    workers = max_workers or constants.WALK_MAX_WORKERS
+    pool = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+    lookahead = workers * _LOOKAHEAD_PER_WORKER
+    pending: Dict[str, Future] = {}
+
+    def scan(directory: WalkEntry) -> Tuple[List[WalkEntry], List[WalkEntry]]:
+        return _scan_directory(directory.path, directory.rel_path, rules, include_dirs, with_stat, catalog,
+                               follow_symlinks)
+
+    try:
+        rel_root = rel_root.replace('\\', '/').strip('/')
+        files, dirs = _scan_directory(root, rel_root, rules, include_dirs, with_stat, catalog, follow_symlinks)
+        yield from files
+        # Depth-first stack; the next directory to yield is on top
+        stack = list(reversed(dirs))
+        while stack:
+            if should_stop is not None and should_stop():
+                break
+            if pool is not None:
+                # List the next directories in walk order on the pool while this thread yields
+                for ahead in reversed(stack[-lookahead:]):
+                    if ahead.path not in pending:
+                        pending[ahead.path] = pool.submit(scan, ahead)
+            current = stack.pop()
+            future = pending.pop(current.path, None)
+            # Claimed in walk order, so the first link to a directory wins regardless of threads
+            if visited is not None and not visited.enter(current.path):
+                if future is not None:
+                    future.cancel()
+                continue
+            if include_dirs:
+                yield current
+            files, dirs = future.result() if future is not None else scan(current)
+            yield from files
+            stack.extend(reversed(dirs))
+    finally:
+        if pool is not None:
+            for future in pending.values():
+                future.cancel()
+            pool.shutdown(wait=True)
+        if catalog is not None:
+            catalog.flush()
+        if visited is not None and visited.skipped:
+            print(f"Skipped {visited.skipped} directories already walked through another link")
+
+
+__all__ = [
+    "WalkEntry",
+    "walk_tree",
+]
@@ -3,6 +3,7 @@
 
 import sys
 import os
+import multiprocessing
 from PySide6.QtWidgets import QApplication
 from gui.main_window import MainWindow
 from gui.theme_manager import ThemeManager
@@ -29,4 +30,6 @@ def main():
     sys.exit(app.exec())
 
 if __name__ == "__main__":
+    # Required for worker processes (parallel reverse parsing) in frozen builds
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+# test_binary_classifier.py
+
+from gui.binary_classifier import BinaryClassifier
+
+
+def test_text_extensions_are_still_sniffed(tmp_path):
+    classifier = BinaryClassifier()
+    utf16 = tmp_path / "setup.ps1"
+    utf16.write_bytes("Write-Host 'hi'\r\n".encode('utf-16'))
+    utf16_no_ascii = tmp_path / "notes.txt"
+    utf16_no_ascii.write_bytes("你好世界".encode('utf-16'))
+    plain = tmp_path / "notes.md"
+    plain.write_text("BZh is how bzip2 files start\n")
+    assert classifier.is_binary(str(utf16))
+    assert classifier.is_binary(str(utf16_no_ascii))
+    assert not classifier.is_binary(str(plain))
+
+
+def test_binary_extensions_are_never_opened(tmp_path):
+    classifier = BinaryClassifier()
+    assert classifier.is_binary(str(tmp_path / "missing.png"))
+    assert classifier.sniffed == 0
+
+
+def test_unknown_extension_uses_magic_numbers(tmp_path):
+    classifier = BinaryClassifier()
+    archive = tmp_path / "payload"
+    archive.write_bytes(b"PK\x03\x04rest")
+    assert classifier.is_binary(str(archive))
+
+
+def test_sniffed_verdicts_are_cached_until_the_file_changes(tmp_path):
+    classifier = BinaryClassifier()
+    path = tmp_path / "data"
+    path.write_bytes(b"plain text")
+    assert not classifier.is_binary(str(path))
+    assert not classifier.is_binary(str(path))
+    assert (classifier.sniffed, classifier.cache_hits) == (1, 1)
+    path.write_bytes(b"now \0 binary")
+    assert classifier.is_binary(str(path))
+    assert classifier.sniffed == 2
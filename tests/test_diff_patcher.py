@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+# test_diff_patcher.py
+
+from gui.diff_patcher import apply_patches_to_file, parse_unified_diff
+
+DIFF = (
+    "--- a/mod.py\n"
+    "+++ b/mod.py\n"
+    "@@ -3,1 +3,1 @@\n"
+    "-c = 3\n"
+    "+c = 4\n"
+)
+
+
+def test_unchanged_lines_keep_their_bytes(tmp_path):
+    target = tmp_path / "mod.py"
+    source = "a = '\u2028'\r\nb = '\x0c'\nc = 3\nd = 4"
+    target.write_bytes(source.encode('utf-8'))
+    report = apply_patches_to_file(str(target), parse_unified_diff(DIFF))
+    assert report.applied == 1
+    assert target.read_bytes().decode('utf-8') == "a = '\u2028'\r\nb = '\x0c'\nc = 4\nd = 4"
+
+
+NEW_FILE_DIFF = (
+    "--- /dev/null\n"
+    "+++ b/new.py\n"
+    "@@ -0,0 +1,2 @@\n"
+    "+x\n"
+    "+y\n"
+)
+
+
+def test_new_file_diff_applied_twice_is_a_no_op(tmp_path):
+    target = tmp_path / "new.py"
+    first = apply_patches_to_file(str(target), parse_unified_diff(NEW_FILE_DIFF))
+    second = apply_patches_to_file(str(target), parse_unified_diff(NEW_FILE_DIFF))
+    assert first.created and first.applied == 1
+    assert second.applied == 0 and second.already_applied == 1 and second.ok
+    assert target.read_text() == "x\ny\n"
+
+
+def test_new_file_diff_against_different_file_is_rejected(tmp_path):
+    target = tmp_path / "new.py"
+    target.write_text("other\n")
+    report = apply_patches_to_file(str(target), parse_unified_diff(NEW_FILE_DIFF), write_rejects=False)
+    assert len(report.rejected) == 1
+    assert target.read_text() == "other\n"
+
+
+def test_pure_insertion_applied_twice_is_a_no_op(tmp_path):
+    target = tmp_path / "mod.py"
+    target.write_text("a\nb\n")
+    diff = "--- a/mod.py\n+++ b/mod.py\n@@ -2,0 +2,1 @@\n+inserted\n"
+    apply_patches_to_file(str(target), parse_unified_diff(diff))
+    once = target.read_text()
+    report = apply_patches_to_file(str(target), parse_unified_diff(diff))
+    assert once.count("inserted") == 1
+    assert report.already_applied == 1 and target.read_text() == once
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+# test_file_catalog.py
+
+import os
+
+from gui.file_catalog import FileCatalog
+from gui.tree_walker import walk_tree
+
+
+def _set_mtime(path, seconds):
+    os.utime(path, ns=(seconds * 1_000_000_000, seconds * 1_000_000_000))
+
+
+def test_listing_is_reused_until_the_directory_changes(tmp_path):
+    base = tmp_path / "project"
+    (base / "pkg").mkdir(parents=True)
+    (base / "pkg" / "a.py").write_text("")
+    _set_mtime(base / "pkg", 100)
+    db_path = str(tmp_path / "catalog.db")
+    catalog = FileCatalog(str(base), db_path)
+    assert catalog.listdir(str(base / "pkg")) == (["a.py"], [])
+    catalog.flush()
+
+    # A new file with the old directory mtime is not seen: the stored listing is used, even by a new session
+    (base / "pkg" / "b.py").write_text("")
+    _set_mtime(base / "pkg", 100)
+    catalog = FileCatalog(str(base), db_path)
+    assert catalog.listdir(str(base / "pkg")) == (["a.py"], [])
+    assert catalog.hits == 1
+
+    _set_mtime(base / "pkg", 200)
+    assert catalog.listdir(str(base / "pkg")) == (["a.py", "b.py"], [])
+    assert catalog.misses == 1
+
+
+def test_cataloged_walk_matches_a_plain_walk(tmp_path):
+    base = tmp_path / "project"
+    for rel_path in ("a.py", "pkg/b.py", "pkg/sub/c.py", "docs/d.md"):
+        (base / rel_path).parent.mkdir(parents=True, exist_ok=True)
+        (base / rel_path).write_text("")
+    catalog = FileCatalog(str(base), str(tmp_path / "catalog.db"))
+    plain = [entry.rel_path for entry in walk_tree(str(base), include_dirs=True)]
+    for _ in range(2):
+        assert [entry.rel_path for entry in walk_tree(str(base), include_dirs=True, catalog=catalog)] == plain
+    assert catalog.hits and catalog.misses == 4
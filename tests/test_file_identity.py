@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+# test_file_identity.py
+
+import os
+
+import pytest
+
+from gui.file_identity import duplicate_policy, file_key, find_duplicate_files
+from gui.file_reader import FileReader
+from gui.tree_walker import walk_tree
+
+
+@pytest.mark.skipif(not hasattr(os, 'symlink'), reason="needs symlinks")
+def test_hardlinks_and_symlinks_map_to_the_first_path(tmp_path):
+    original = tmp_path / "a.py"
+    original.write_text("x = 1\n")
+    os.link(original, tmp_path / "hard.py")
+    os.symlink(original, tmp_path / "soft.py")
+    (tmp_path / "other.py").write_text("x = 1\n")
+    paths = [str(tmp_path / name) for name in ("a.py", "hard.py", "a.py", "soft.py", "other.py", "gone.py")]
+    result = find_duplicate_files(paths, FileReader().check)
+    assert result.paths == [paths[0], paths[1], paths[3], paths[4], paths[5]]
+    assert result.duplicates == {paths[1]: paths[0], paths[3]: paths[0]}
+    assert result.stats[paths[5]] is None
+
+
+def test_file_key_falls_back_to_the_resolved_path(tmp_path):
+    path = tmp_path / "a.py"
+    path.write_text("")
+    stat = os.stat(path)
+    assert file_key(str(path), stat) == (stat.st_dev, stat.st_ino)
+    no_inode = os.stat_result((stat.st_mode, 0) + tuple(stat)[2:])
+    assert file_key(str(tmp_path / "." / "a.py"), no_inode) == os.path.normcase(os.path.realpath(path))
+
+
+@pytest.mark.skipif(not hasattr(os, 'symlink'), reason="needs symlinks")
+@pytest.mark.parametrize("inode_numbers", [True, False])
+def test_symlink_loops_are_walked_once(tmp_path, monkeypatch, inode_numbers):
+    (tmp_path / "src" / "pkg").mkdir(parents=True)
+    (tmp_path / "src" / "pkg" / "m.py").write_text("")
+    os.symlink(tmp_path / "src", tmp_path / "src" / "pkg" / "loop")
+    os.symlink(tmp_path / "src" / "pkg", tmp_path / "src" / "alias")
+    if not inode_numbers:
+        # Filesystems such as some FUSE and network mounts report st_ino == 0
+        real_stat = os.stat
+
+        def stat_without_inode(path, *args, **kwargs):
+            stat = real_stat(path, *args, **kwargs)
+            return os.stat_result((stat.st_mode, 0) + tuple(stat)[2:])
+
+        monkeypatch.setattr(os, 'stat', stat_without_inode)
+    walked = [entry.rel_path for entry in walk_tree(str(tmp_path / "src"), follow_symlinks=True)]
+    assert walked == ["alias/m.py"]
+
+
+def test_duplicate_policy_from_settings():
+    assert duplicate_policy({'files': {'duplicate_files': 'SKIP'}}) == 'skip'
+    assert duplicate_policy({'files': {'duplicate_files': 'bogus'}}) == 'reference'
+    assert duplicate_policy({}) == 'reference'
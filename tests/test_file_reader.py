@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+# test_file_reader.py
+
+import os
+import threading
+
+import pytest
+
+from gui.file_reader import (
+    FileReader, ReadPolicy, READ_OK, READ_SKIPPED_LARGE, READ_SKIPPED_SPECIAL, READ_STREAMED, READ_TIMEOUT,
+    READ_TRUNCATED,
+)
+
+BODY = "".join(f"line {index} å\r\n" for index in range(200)).encode('utf-8') + b"\xff end"
+TEXT = BODY.decode('utf-8', errors='ignore').replace('\r\n', '\n')
+
+
+def _reader(policy, **kwargs):
+    return FileReader(ReadPolicy(max_size=1024, large_file_policy=policy, head_size=100, tail_size=50,
+                                 chunk_size=64, read_timeout=0, **kwargs))
+
+
+def test_large_file_policies(tmp_path):
+    path = tmp_path / "big.txt"
+    path.write_bytes(BODY)
+    assert _reader("skip").read_text(str(path)).status == READ_SKIPPED_LARGE
+
+    truncated = _reader("truncate").read_text(str(path))
+    assert truncated.status == READ_TRUNCATED
+    assert truncated.text.startswith("line 0 å\nline 1 å\n") and truncated.text.endswith("line 199 å\n end")
+    assert f"bytes omitted from a {len(BODY)} byte file" in truncated.text
+
+    reader = _reader("stream")
+    streamed = reader.read_text(str(path), streaming=True)
+    assert streamed.status == READ_STREAMED and streamed.lines == TEXT.count('\n')
+    assert "".join(reader.iter_text(str(path))) == TEXT
+    # Callers that need one string get the truncated form
+    assert reader.read_text(str(path)).status == READ_TRUNCATED
+
+
+def test_small_file_is_decoded_like_text_mode(tmp_path):
+    path = tmp_path / "small.txt"
+    path.write_bytes(BODY[:500])
+    result = _reader("skip").read_text(str(path))
+    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+        assert (result.status, result.text) == (READ_OK, f.read())
+
+
+@pytest.mark.skipif(not hasattr(os, 'mkfifo'), reason="needs FIFOs")
+def test_fifo_is_skipped_and_a_hung_read_times_out(tmp_path):
+    fifo = tmp_path / "pipe"
+    os.mkfifo(fifo)
+    reader = FileReader(ReadPolicy(read_timeout=0.2))
+    assert reader.read_text(str(fifo)).status == READ_SKIPPED_SPECIAL
+    # Claiming the FIFO is a regular file makes open() block until a writer appears
+    assert reader.read_text(str(fifo), size=10).status == READ_TIMEOUT
+    # Release the stuck reader thread
+    writer = threading.Thread(target=lambda: open(fifo, 'wb').close(), daemon=True)
+    writer.start()
+    writer.join(5)
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+# test_ignore_rules.py
+
+from gui.ignore_rules import IgnoreRules, compile_glob
+
+
+def test_names_globs_and_paths():
+    rules = IgnoreRules(
+        ignored_directories=['__pycache__', 'build*', 'gui/generated'],
+        ignored_files=['*.log', 'secret.txt'],
+        ignored_extensions=['EXE', '.dll'],
+    )
+    assert rules.skip_dir('pkg/__pycache__')
+    assert rules.skip_dir('build-out')
+    assert rules.skip_dir('gui/generated') and rules.skip_dir('gui/generated/deep')
+    assert not rules.skip_dir('other/gui/generated')
+    assert rules.skip_file('a/b/run.log') and rules.skip_file('secret.txt') and rules.skip_file('tool.exe')
+    assert not rules.skip_file('a/b/run.log.py')
+
+
+def test_absolute_skip_paths_are_relative_to_base(tmp_path):
+    rules = IgnoreRules(skip_paths=[str(tmp_path / 'vendor'), '/elsewhere/x'], base_dir=str(tmp_path))
+    assert rules.skip_dir('vendor/lib')
+    assert rules.skip_file('vendor/lib/a.py')
+    assert not rules.skip_dir('elsewhere/x')
+
+
+def test_glob_segments():
+    regex = compile_glob('src/**/test_?.py')
+    assert regex.match('src/test_a.py') and regex.match('src/a/b/test_b.py')
+    assert not regex.match('src/test_ab.py') and not compile_glob('*.py').match('a/b.py')
+
+
+def _rules_with_ignore_files(tmp_path, files):
+    for rel_path, content in files.items():
+        path = tmp_path / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    return IgnoreRules(base_dir=str(tmp_path), use_ignore_files=True)
+
+
+def test_nested_gitignore_negation_and_precedence(tmp_path):
+    rules = _rules_with_ignore_files(tmp_path, {
+        '.gitignore': "*.log\n",
+        'sub/.gitignore': "!keep.log\nlocal/\n",
+        'sub/deep/.ignore': "*.tmp\n!*.log\n",
+    })
+    assert rules.skip_file('run.log') and rules.skip_file('sub/run.log')
+    assert not rules.skip_file('sub/keep.log')       # re-included by the deeper file
+    assert not rules.skip_file('sub/deep/any.log')   # deepest file wins
+    assert rules.skip_file('sub/deep/x.tmp') and not rules.skip_file('x.tmp')
+    assert rules.skip_dir('sub/local') and not rules.skip_dir('local')
+
+
+def test_gitignore_anchoring(tmp_path):
+    rules = _rules_with_ignore_files(tmp_path, {
+        '.gitignore': "/build/\ndocs/*.md\n",
+        'sub/.gitignore': "/only_here.py\n",
+    })
+    assert rules.skip_dir('build') and not rules.skip_dir('sub/build')
+    assert rules.skip_file('docs/a.md') and not rules.skip_file('sub/docs/a.md')
+    assert rules.skip_file('sub/only_here.py') and not rules.skip_file('sub/x/only_here.py')
+    assert not rules.skip_file('only_here.py')
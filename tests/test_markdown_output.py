@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+# test_markdown_output.py
+
+import os
+
+import pytest
+
+from gui.file_reader import FileReader, ReadPolicy, READ_OK, READ_PASSTHROUGH
+from gui.markdown_output import MarkdownDocument
+
+
+@pytest.mark.skipif(os.linesep != '\n', reason="passthrough output is only used where text mode keeps '\\n'")
+def test_passthrough_bodies_are_copied_byte_for_byte(tmp_path):
+    body = ("# -*- coding: utf-8 -*-\nname = 'åäö ✓'\n" * 5000).encode('utf-8')
+    source = tmp_path / "mod.py"
+    source.write_bytes(body)
+    reader = FileReader(ReadPolicy(chunk_size=4096, read_timeout=0))
+    result = reader.read_text(str(source), passthrough=True)
+    assert (result.status, result.lines) == (READ_PASSTHROUGH, body.count(b'\n'))
+
+    document = MarkdownDocument("# Project\n\n```py\n")
+    document.append_file(str(source), result.size, result.lines)
+    document.append("```\n")
+    output = tmp_path / "out.md"
+    document.save(str(output), reader)
+    assert output.read_bytes() == b"# Project\n\n```py\n" + body + b"```\n"
+    assert str(document) == output.read_bytes().decode('utf-8')
+
+
+def test_files_that_decoding_would_change_are_not_passed_through(tmp_path):
+    reader = FileReader(ReadPolicy(read_timeout=0))
+    for name, data in (("crlf.py", b"a = 1\r\n"), ("latin1.py", b"a = '\xe5'\n")):
+        path = tmp_path / name
+        path.write_bytes(data)
+        assert reader.read_text(str(path), passthrough=True).status == READ_OK
+
+
+def test_streamed_bodies_are_decoded_in_chunks(tmp_path):
+    source = tmp_path / "big.log"
+    source.write_bytes(b"row \xff\r\n" * 3000)
+    reader = FileReader(ReadPolicy(max_size=1024, large_file_policy="stream", chunk_size=1000, read_timeout=0))
+    result = reader.read_text(str(source), passthrough=True, streaming=True)
+    document = MarkdownDocument()
+    document.append_file(str(source), result.size, result.lines, text=True)
+    output = tmp_path / "out.md"
+    document.save(str(output), reader)
+    with open(output, 'r', encoding='utf-8') as f:
+        assert f.read() == "row \n" * 3000
+    assert result.lines == 3000
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+# test_patch_engine.py
+
+from gui.patch_engine import apply_definition_updates, apply_definition_updates_to_file
+
+
+def test_form_feed_in_string_does_not_shift_spans():
+    source = (
+        "def f():\n"
+        "    return 'a\x0cb'\n"
+        "\n"
+        "def g():\n"
+        "    return 2\n"
+    )
+    updated, result = apply_definition_updates(source, {"g": "def g():\n    return 3\n"})
+    assert result.applied == ["g"]
+    assert updated == (
+        "def f():\n"
+        "    return 'a\x0cb'\n"
+        "\n"
+        "def g():\n"
+        "    return 3\n"
+    )
+
+
+def test_unicode_line_separator_is_kept():
+    source = "x = '\u2028'\r\ndef g():\r\n    return 2\r\n"
+    updated, result = apply_definition_updates(source, {"g": "def g():\n    return 3"})
+    assert result.applied == ["g"]
+    assert updated == "x = '\u2028'\r\ndef g():\r\n    return 3\r\n"
+
+
+def test_file_with_utf8_bom_keeps_it(tmp_path):
+    target = tmp_path / "mod.py"
+    target.write_bytes(b"\xef\xbb\xbfdef g():\n    return 2\n")
+    result = apply_definition_updates_to_file(str(target), {"g": "def g():\n    return 3\n"})
+    assert result.applied == ["g"]
+    assert target.read_bytes() == b"\xef\xbb\xbfdef g():\n    return 3\n"
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+# test_path_trie.py
+
+from gui.path_trie import PathTrie
+from gui.preset_store import PresetStore
+
+
+def test_iteration_keeps_insertion_order():
+    trie = PathTrie(['src/**/*.py', '!src/tests/**', 'src/tests/keep.py', 'b/x.py', 'a.py', 'b/y.py'])
+    assert list(trie) == ['src/**/*.py', '!src/tests/**', 'src/tests/keep.py', 'b/x.py', 'a.py', 'b/y.py']
+
+
+def test_prefix_removal_and_readd():
+    trie = PathTrie(['b/x.py', 'a.py', 'b', 'b/y.py'])
+    assert list(trie.iter_prefix('b')) == ['b/x.py', 'b', 'b/y.py']
+    assert trie.remove_prefix('b') == 3
+    trie.add('b/x.py')
+    assert list(trie) == ['a.py', 'b/x.py']
+    assert len(trie) == 2
+
+
+def test_prefix_removal_keeps_pattern_entries():
+    trie = PathTrie(['src/**/*.py', 'src/a.py', 'src/gen/', 'src/lib/b.py', 'docs/c.md'])
+    assert trie.remove_prefix('src') == 2
+    assert list(trie) == ['src/**/*.py', 'src/gen/', 'docs/c.md']
+
+
+def test_store_folder_removal_matches_trie(tmp_path):
+    store = PresetStore(str(tmp_path / "presets.db"))
+    store.set_files('p', ['src/**/*.py', 'src/a.py', 'src/gen/', 'src/lib/b.py', 'srcx/d.py'])
+    assert store.remove_folder('p', 'src') == 2
+    assert store.get_files('p') == ['src/**/*.py', 'src/gen/', 'srcx/d.py']
+    store.close()
@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+# test_path_validation.py
+
+from gui import constants
+from gui.path_validation import validate_paths
+
+
+def test_batched_and_single_checks_agree(tmp_path):
+    many = [f"pkg/m{index}.py" for index in range(constants.VALIDATION_LIST_THRESHOLD + 1)]
+    for rel_path in many[:-1] + ["lone.py"]:
+        (tmp_path / rel_path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / rel_path).write_text("")
+    entries = ["lone.py", "gone.py", "src/**/*.py", "x"] + many
+    report = validate_paths(entries, str(tmp_path))
+    assert report.valid == ["lone.py", "src/**/*.py"] + many[:-1]
+    assert [entry for entry, _ in report.missing] == ["gone.py", many[-1]]
+    assert report.invalid == ["x"]
+    assert report.dynamic == 1
+    assert report.directories_listed == 1
+
+
+def test_missing_files_are_grouped_by_directory(tmp_path):
+    report = validate_paths(["a/one.py", "a/two.py", "b/three.py"], str(tmp_path))
+    grouped = report.missing_by_directory()
+    assert sorted(grouped[str(tmp_path / "a")]) == ["one.py", "two.py"]
+    assert "3 missing" in report.summary()
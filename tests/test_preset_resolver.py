@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+# test_preset_resolver.py
+
+import os
+
+from gui.preset_resolver import PresetResolver
+
+
+def _touch(path, mtime_ns=None):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("")
+    if mtime_ns is not None:
+        os.utime(path.parent, ns=(mtime_ns, mtime_ns))
+
+
+def test_entries_apply_in_order_with_negation(tmp_path):
+    for name in ("src/a.py", "src/tests/test_a.py", "src/tests/keep.py", "src/data.txt", "docs/x.md"):
+        _touch(tmp_path / name)
+    entries = ["src/**/*.py", "!src/tests/", "src/tests/keep.py", "docs/", "!**/*.md", "README.md"]
+    assert PresetResolver().resolve(entries, str(tmp_path)) == ["src/a.py", "src/tests/keep.py", "README.md"]
+
+
+def test_new_files_invalidate_a_cached_resolution(tmp_path):
+    _touch(tmp_path / "src/a.py", mtime_ns=1_000_000_000)
+    resolver = PresetResolver()
+    assert resolver.resolve(["src/"], str(tmp_path)) == ["src/a.py"]
+    _touch(tmp_path / "src/b.py", mtime_ns=2_000_000_000)
+    assert resolver.resolve(["src/"], str(tmp_path)) == ["src/a.py", "src/b.py"]
+    (tmp_path / "src/a.py").unlink()
+    os.utime(tmp_path / "src", ns=(3_000_000_000, 3_000_000_000))
+    assert resolver.resolve(["src/"], str(tmp_path)) == ["src/b.py"]
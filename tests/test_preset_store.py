@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+# test_preset_store.py
+
+from gui.preset_store import PRESET_REFERENCE, PresetStore, resolve_preset_files, select_presets
+
+
+def test_files_keep_order_and_survive_reopen(tmp_path):
+    db_path = str(tmp_path / "presets.db")
+    store = PresetStore(db_path)
+    store.set_files('p', ['b.py', 'a.py', 'b.py'])
+    assert store.add_files('p', ['a.py', 'c/d.py']) == ['c/d.py']
+    assert store.remove_files('p', ['a.py', 'missing.py']) == 1
+    store.close()
+
+    store = PresetStore(db_path)
+    assert store.names() == ['p']
+    assert list(store.iter_files('p', batch_size=1)) == ['b.py', 'c/d.py']
+    assert store.contains('p', 'c/d.py') and not store.contains('p', 'a.py')
+    store.close()
+
+
+def test_settings_reference_resolves_through_the_store(tmp_path):
+    settings_path = str(tmp_path / "settings.toml")
+    settings = {'presets': {'stored': PRESET_REFERENCE, 'inline': ['x.py', 'y.py', 'x.py']}}
+    store = PresetStore.for_settings(settings, settings_path)
+    store.set_files('stored', ['src/a.py'])
+    assert resolve_preset_files(settings, settings_path, 'stored') == ['src/a.py']
+    assert resolve_preset_files(settings, settings_path, 'inline') == ['x.py', 'y.py']
+    assert resolve_preset_files(settings, settings_path, 'unknown') is None
+    store.close()
+
+
+def test_select_presets_defaults_to_current_and_keeps_requested_order():
+    settings = {'presets': {'current_preset': 'b', 'a': [], 'b': [], 'c': []}}
+    assert select_presets(settings) == ['b']
+    assert select_presets(settings, ['c', 'missing', 'a', 'c']) == ['c', 'a']
+    assert select_presets({'presets': {'current_preset': 'gone', 'a': [], 'b': []}}) == ['a', 'b']
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+# test_read_scheduler.py
+
+import os
+import threading
+
+from gui import read_scheduler
+from gui.file_reader import FileReader
+from gui.read_scheduler import ReadScheduler
+
+
+def _files(tmp_path, count, size=100):
+    paths = []
+    for index in range(count):
+        path = tmp_path / f"f{index}.txt"
+        path.write_bytes(b"x" * size)
+        paths.append(str(path))
+    return paths
+
+
+def test_files_are_hinted_in_inode_order(tmp_path):
+    paths = _files(tmp_path, 5)
+    (tmp_path / "sub").mkdir()
+    files = [(path, None) for path in reversed(paths)] + [(str(tmp_path / "sub"), None), ("missing", None)]
+    ordered = ReadScheduler(FileReader(), files)._ordered()
+    assert [path for path, _ in ordered] == sorted(paths, key=lambda path: os.stat(path).st_ino)
+
+
+def test_hints_stay_within_the_window(tmp_path, monkeypatch):
+    paths = _files(tmp_path, 4, size=100)
+    hinted = []
+    step = threading.Semaphore(0)
+
+    def record(path, ranges):
+        hinted.append(path)
+        step.release()
+
+    monkeypatch.setattr(read_scheduler, "_prefetch", record)
+    scheduler = ReadScheduler(FileReader(), [(path, os.stat(path)) for path in paths], window=250)
+    order = [path for path, _ in scheduler._ordered()]
+    scheduler.start()
+    assert step.acquire(timeout=5) and step.acquire(timeout=5)
+    # Two files fill the 250 byte window; the third waits for a read
+    assert not step.acquire(timeout=0.2)
+    assert hinted == order[:2]
+    scheduler.consumed(order[0])
+    assert step.acquire(timeout=5)
+    assert hinted == order[:3]
+    scheduler.stop()
+
+
+def test_disabled_scheduler_does_nothing(tmp_path):
+    scheduler = ReadScheduler(FileReader(), [(path, None) for path in _files(tmp_path, 2)], enabled=False)
+    scheduler.start()
+    scheduler.consumed("anything")
+    scheduler.stop()
+    assert scheduler.hinted == 0
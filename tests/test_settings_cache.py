@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+# test_settings_cache.py
+
+import os
+
+from gui.settings_cache import cache_path_for, load_cached_settings, store_cached_settings
+
+
+def test_cache_hits_only_for_the_same_content(tmp_path):
+    settings_path = tmp_path / "settings.toml"
+    settings_path.write_bytes(b"[paths]\nbase_dir = '.'\n")
+    content = settings_path.read_bytes()
+    data = {'paths': {'base_dir': str(tmp_path)}}
+    store_cached_settings(str(settings_path), content, data)
+    assert load_cached_settings(str(settings_path), content) == data
+
+    # Same size, new content and mtime: the key no longer matches
+    settings_path.write_bytes(b"[paths]\nbase_dir = '/'\n")
+    os.utime(settings_path, ns=(1_000_000_000, 1_000_000_000))
+    assert load_cached_settings(str(settings_path), settings_path.read_bytes()) is None
+
+
+def test_corrupt_or_foreign_cache_is_ignored(tmp_path):
+    settings_path = tmp_path / "settings.toml"
+    settings_path.write_bytes(b"[paths]\n")
+    cache_path = cache_path_for(str(settings_path))
+    for payload in (b"\x80\x04not json", b"[1, 2]", b'{"key": null, "data": {}}'):
+        with open(cache_path, 'wb') as f:
+            f.write(payload)
+        assert load_cached_settings(str(settings_path), b"[paths]\n") is None
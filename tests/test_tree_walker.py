@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+# test_tree_walker.py
+
+from gui import tree_walker
+from gui.tree_walker import walk_tree
+
+
+def _make_tree(root):
+    for package in range(5):
+        for module in range(4):
+            directory = root / "src" / f"pkg{package}" / f"mod{module}"
+            directory.mkdir(parents=True)
+            (directory / "a.py").write_text("")
+    (root / "README.md").write_text("")
+
+
+def test_parallel_walk_keeps_depth_first_order(tmp_path):
+    _make_tree(tmp_path)
+    serial = [entry.rel_path for entry in walk_tree(str(tmp_path), include_dirs=True, max_workers=1)]
+    parallel = [entry.rel_path for entry in walk_tree(str(tmp_path), include_dirs=True, max_workers=4)]
+    assert parallel == serial
+    assert serial[:4] == ["README.md", "src", "src/pkg0", "src/pkg0/mod0"]
+
+
+def test_entries_are_yielded_before_the_tree_is_listed(tmp_path, monkeypatch):
+    # A single top-level directory (everything under src/) must still stream
+    _make_tree(tmp_path)
+    scanned = []
+    scan = tree_walker._scan_directory
+
+    def recording_scan(directory, *args, **kwargs):
+        scanned.append(directory)
+        return scan(directory, *args, **kwargs)
+
+    monkeypatch.setattr(tree_walker, "_scan_directory", recording_scan)
+    walk = walk_tree(str(tmp_path), max_workers=2)
+    assert next(walk).rel_path == "README.md"
+    assert next(walk).rel_path == "src/pkg0/mod0/a.py"
+    # 27 directories in all; only the next few in walk order have been listed
+    assert len(scanned) < 27
+    walk.close()